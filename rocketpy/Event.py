@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Giovani Hidalgo Ceotto"
+__copyright__ = "Copyright 20XX, RocketPy Team"
+__license__ = "MIT"
+
+from scipy import optimize
+
+
+class Event:
+    """Keeps information about a flight event, which happens when an event
+    function of time and state vector crosses zero during a simulation.
+    Events are checked by Flight after each integration step and their
+    exact time is found using the dense output of the solver.
+
+    Attributes
+    ----------
+        Event.function : callable
+            Event function, which takes as input the time in seconds and
+            the state vector [x, y, z, vx, vy, vz, e0, e1, e2, e3, w1, w2,
+            w3] and returns a float. The event happens when it changes
+            from negative to non negative values or the other way around.
+        Event.direction : int
+            Direction of the crossing. If positive, only crossings to non
+            negative values count. If negative, only crossings to negative
+            values count. If 0, both count.
+        Event.terminal : bool
+            Whether the simulation terminates at the event.
+        Event.callback : callable, None
+            Function called when the event happens, which takes as input
+            the Flight being simulated, the event time and the state vector
+            at the event time.
+        Event.derivative : callable, None
+            If not None, derivative of the state vector used after the
+            event, which starts a new flight phase. See Flight.uDot.
+        Event.once : bool
+            Whether the event can only happen once per simulation.
+        Event.level : bool
+            Whether the event also happens when the event function is
+            already past zero in the event direction at the start of a
+            flight phase. The event is then triggered at the start time.
+        Event.name : string
+            Event name, used only to display data.
+    """
+
+    def __init__(
+        self,
+        function,
+        direction=0,
+        terminal=False,
+        callback=None,
+        derivative=None,
+        once=False,
+        level=False,
+        name="Event",
+    ):
+        """Initializes Event class.
+
+        Parameters
+        ----------
+        function : callable
+            Event function of time and state vector, which crosses zero
+            when the event happens.
+        direction : int, optional
+            Direction of the crossing. If positive, only crossings to non
+            negative values count. If negative, only crossings to negative
+            values count. Default is 0, which counts both.
+        terminal : bool, optional
+            Whether the simulation terminates at the event. Default is
+            False.
+        callback : callable, optional
+            Function called when the event happens, with the Flight being
+            simulated, the event time and the state vector at the event
+            time as input. Default is None.
+        derivative : callable, optional
+            Derivative of the state vector used after the event, which
+            starts a new flight phase. Default is None, which keeps the
+            current flight phase.
+        once : bool, optional
+            Whether the event can only happen once per simulation. Default
+            is False.
+        level : bool, optional
+            Whether the event also happens when the event function is
+            already past zero in the event direction at the start of a
+            flight phase, such as negative for a negative direction. Needs
+            a non zero direction. Default is False.
+        name : string, optional
+            Event name. Default is "Event".
+
+        Returns
+        -------
+        None
+        """
+        self.function = function
+        self.direction = direction
+        self.terminal = terminal
+        self.callback = callback
+        self.derivative = derivative
+        self.once = once
+        self.level = level
+        self.name = name
+
+        return None
+
+    def __repr__(self):
+        return "{Event: " + self.name + "}"
+
+    def isTriggered(self, previousValue, value):
+        """Checks if the event happened between two consecutive values of
+        the event function.
+
+        Parameters
+        ----------
+        previousValue : float
+            Value of the event function at the start of the step.
+        value : float
+            Value of the event function at the end of the step.
+
+        Returns
+        -------
+        isTriggered : bool
+            True if the event function crossed zero in the event direction.
+        """
+        if (previousValue < 0) == (value < 0):
+            return False
+        return self.direction == 0 or (self.direction > 0) == (value >= 0)
+
+    def initialValue(self, t, u):
+        """Evaluates the event function at the start of a flight phase. If
+        the event is a level event already past zero in its direction, the
+        opposite value is returned instead, so that the event is triggered
+        by the first step of the phase.
+
+        Parameters
+        ----------
+        t : float
+            Start time of the flight phase, in seconds.
+        u : list
+            State vector at the start of the flight phase.
+
+        Returns
+        -------
+        value : float
+            Value of the event function to be compared with the one at the
+            end of the first step.
+        """
+        value = self.function(t, u)
+        if self.level and self.isTriggered(-value, value):
+            return -value
+        return value
+
+    def findTime(self, interpolator, t0, t1):
+        """Finds the time when the event happened inside an integration
+        step, which is the root of the event function evaluated on the
+        dense output of the solver. As done by scipy.integrate.solve_ivp,
+        the time returned is the end of the final root bracket on the side
+        of t1, so the event function has already crossed zero there and
+        the event is not triggered again if the solution is rolled back
+        to it. A level event already past zero at t0 happens at t0.
+
+        Parameters
+        ----------
+        interpolator : callable
+            Dense output of the solver for the step, which returns the state
+            vector at a given time.
+        t0 : float
+            Time at the start of the step, in seconds.
+        t1 : float
+            Time at the end of the step, in seconds. The event function must
+            have crossed zero between t0 and t1.
+
+        Returns
+        -------
+        t : float
+            Event time in seconds.
+        """
+
+        def eventFunction(t):
+            return self.function(t, interpolator(t))
+
+        value0, value1 = eventFunction(t0), eventFunction(t1)
+        if (value0 < 0) == (value1 < 0):
+            if self.level and self.isTriggered(-value0, value0):
+                # Level event already past zero at the start of the step
+                return t0
+            # The crossing seen in the step end points is lost in the round
+            # off of the dense output, so one of its end values lies within
+            # round off of zero. The crossing happens at that end.
+            return t0 if abs(value0) <= abs(value1) else t1
+        t = optimize.brentq(eventFunction, t0, t1, xtol=1e-12)
+        # Move forward until the event function is on the side of t1
+        step = 1e-12
+        while t < t1 and (eventFunction(t) < 0) != (value1 < 0):
+            t = min(t + step, t1)
+            step *= 2
+        return t
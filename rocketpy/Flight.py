@@ -14,7 +14,8 @@ import numpy as np
 import simplekml
 from scipy import integrate
 
-from .Function import Function
+from .Event import Event
+from .Function import Function, FunctionSet, growArray
 
 
 class Flight:
@@ -135,15 +136,19 @@ class Flight:
             e2Init, e3Init, w1Init, w2Init, w3Init]
         Flight.tInitial : int, float
             Initial simulation time in seconds. Usually 0.
-        Flight.solution : list
+        Flight.solution : array
             Solution array which keeps results from each numerical
-            integration.
+            integration. Each row is given by [t, x, y, z, vx, vy, vz,
+            e0, e1, e2, e3, w1, w2, w3].
         Flight.t : float
             Current integration time.
         Flight.y : list
             Current integration state vector u.
         Flight.postProcessed : bool
             Defines if solution data has been post processed.
+        Flight.lazyOutputs : dict
+            Outputs of Flight.postProcess not calculated yet, mapped to
+            the method which calculates them when first accessed.
 
         Solution monitor attributes:
         Flight.initialSolution : list
@@ -188,6 +193,13 @@ class Flight:
             impacts the ground.
         Flight.parachuteEvents : array
             List that stores parachute events triggered during flight.
+        Flight.events : list
+            Events detected during flight, see help(Event). Includes the
+            out of rail, apogee and impact events, followed by user
+            defined events.
+        Flight.triggeredEvents : list
+            List of [t, event] pairs that stores events triggered during
+            flight, in order of occurrence.
         Flight.functionEvaluations : array
             List that stores number of derivative function evaluations
             during numerical integration in cumulative manner.
@@ -523,6 +535,7 @@ class Flight:
         atol=6 * [1e-3] + 4 * [1e-6] + 3 * [1e-3],
         timeOvershoot=True,
         verbose=False,
+        events=None,
     ):
         """Run a trajectory simulation.
 
@@ -578,6 +591,10 @@ class Flight:
             time in some cases. Default is True.
         verbose : bool, optional
             If true, verbose mode is activated. Default is False.
+        events : list, optional
+            List of user defined events to be detected during the
+            simulation, such as maximum dynamic pressure or reaching Mach 1.
+            See help(Event) for more information. Default is None.
 
         Returns
         -------
@@ -603,6 +620,7 @@ class Flight:
         self.initialSolution = initialSolution
         self.timeOvershoot = timeOvershoot
         self.terminateOnApogee = terminateOnApogee
+        self.events = [] if events is None else list(events)
 
         # Modifying Rail Length for a better out of rail condition
         upperRButton = max(self.rocket.railButtons[0])
@@ -611,6 +629,42 @@ class Flight:
         self.effective1RL = self.env.rL - abs(nozzle - upperRButton)
         self.effective2RL = self.env.rL - abs(nozzle - lowerRButton)
 
+        # Quantities evaluated together at each time step share interval lookups.
+        # The sets follow changes to their Functions, see FunctionSet, and post
+        # processing reads these quantities from the same sets.
+        self.motorFunctions = FunctionSet(
+            [
+                self.rocket.motor.inertiaZ,
+                self.rocket.motor.inertiaI,
+                self.rocket.motor.inertiaZDot,
+                self.rocket.motor.inertiaIDot,
+                self.rocket.motor.massDot,
+                self.rocket.motor.mass,
+                self.rocket.motor.thrust,
+            ]
+        )
+        self.atmosphereFunctions = FunctionSet(
+            [
+                self.env.windVelocityX,
+                self.env.windVelocityY,
+                self.env.speedOfSound,
+                self.env.density,
+            ]
+        )
+        self.windFunctions = FunctionSet(
+            [self.env.windVelocityX, self.env.windVelocityY]
+        )
+        self.atmosphereOutputFunctions = FunctionSet(
+            [
+                self.env.windVelocityX,
+                self.env.windVelocityY,
+                self.env.density,
+                self.env.dynamicViscosity,
+                self.env.pressure,
+                self.env.speedOfSound,
+            ]
+        )
+
         # Flight initialization
         self.__init_post_process_variables()
         # Initialize solution monitors
@@ -627,15 +681,20 @@ class Flight:
         self.impactVelocity = 0
         self.impactState = np.array([0])
         self.parachuteEvents = []
+        self.triggeredEvents = []
         self.postProcessed = False
         self.latitude = 0  # Function(0)
         self.longitude = 0  # Function(0)
-        # Initialize solver monitors
-        self.functionEvaluations = []
-        self.functionEvaluationsPerTimeStep = []
-        self.timeSteps = []
-        # Initialize solution state
-        self.solution = []
+        # Initialize solution state and solver monitors, stored as views of
+        # buffers which grow during integration, see Function.growArray
+        self.__buffers = {
+            "solution": np.empty((256, 14)),
+            "functionEvaluations": np.empty(256, dtype=int),
+            "functionEvaluationsPerTimeStep": np.empty(256, dtype=int),
+            "timeSteps": np.empty(256),
+        }
+        for name, buffer in self.__buffers.items():
+            setattr(self, name, buffer[:0])
         if self.initialSolution is None:
             # Initialize time and state variables
             self.tInitial = 0
@@ -668,17 +727,55 @@ class Flight:
             ]
             # Set initial derivative for rail phase
             self.initialDerivative = self.uDotRail1
+            # Detect when the upper rail button leaves the rail
+            builtInEvents = [
+                Event(
+                    lambda t, u: u[0] ** 2
+                    + u[1] ** 2
+                    + (u[2] - self.env.elevation) ** 2
+                    - self.effective1RL**2,
+                    direction=1,
+                    callback=Flight.__recordRailExit,
+                    derivative=self.uDot,
+                    once=True,
+                    name="Out of Rail",
+                )
+            ]
         else:
             # Initial solution given, ignore rail phase
             # TODO: Check if rocket is actually out of rail. Otherwise, start at rail
             self.outOfRailState = self.initialSolution[1:]
             self.outOfRailTime = self.initialSolution[0]
             self.initialDerivative = self.uDot
+            builtInEvents = []
+
+        # Detect apogee and impact, before user defined events
+        builtInEvents += [
+            Event(
+                lambda t, u: u[5],
+                direction=-1,
+                terminal=terminateOnApogee,
+                callback=Flight.__recordApogee,
+                once=True,
+                name="Apogee",
+            ),
+            Event(
+                lambda t, u: u[2] - self.env.elevation,
+                direction=-1,
+                terminal=True,
+                callback=Flight.__recordImpact,
+                level=True,
+                name="Impact",
+            ),
+        ]
+        self.events = builtInEvents + self.events
+        # Events not triggered yet, with their function value at the last step
+        self.__activeEvents = [[event, None] for event in self.events]
 
         self.tInitial = self.initialSolution[0]
-        self.solution.append(self.initialSolution)
+        growArray(self, "solution", self.__buffers)[-1] = self.initialSolution
         self.t = self.solution[-1][0]
-        self.y = self.solution[-1][1:]
+        self.y = self.solution[-1][1:].copy()
 
         # Calculate normal and lateral surface wind
         windU = self.env.windVelocityX(self.env.elevation)
@@ -709,8 +806,12 @@ class Flight:
             for callback in phase.callbacks:
                 callback(self)
 
+            # Evaluate event functions at the start of this flight phase
+            for activeEvent in self.__activeEvents:
+                activeEvent[1] = activeEvent[0].initialValue(self.t, self.y)
+
             # Create solver for this flight phase
-            self.functionEvaluations.append(0)
+            growArray(self, "functionEvaluations", self.__buffers)[-1] = 0
             phase.solver = integrate.LSODA(
                 phase.derivative,
                 t0=phase.t,
@@ -810,13 +911,17 @@ class Flight:
                     # Step
                     phase.solver.step()
                     # Save step result
-                    self.solution += [[phase.solver.t, *phase.solver.y]]
+                    buffers = self.__buffers
+                    solution = growArray(self, "solution", buffers)
+                    solution[-1, 0] = phase.solver.t
+                    solution[-1, 1:] = phase.solver.y
                     # Step step metrics
-                    self.functionEvaluationsPerTimeStep.append(
-                        phase.solver.nfev - self.functionEvaluations[-1]
+                    nfev = phase.solver.nfev
+                    growArray(self, "functionEvaluationsPerTimeStep", buffers)[-1] = (
+                        nfev - self.functionEvaluations[-1]
                     )
-                    self.functionEvaluations.append(phase.solver.nfev)
-                    self.timeSteps.append(phase.solver.step_size)
+                    growArray(self, "functionEvaluations", buffers)[-1] = nfev
+                    growArray(self, "timeSteps", buffers)[-1] = phase.solver.step_size
                     # Update time and state
                     self.t = phase.solver.t
                     self.y = phase.solver.y
@@ -831,185 +936,8 @@ class Flight:
                     # print('\t\t\tAltitude: ', phase.solver.y[2])
                     # print('\t\t\tEvals: ', self.functionEvaluationsPerTimeStep[-1])
 
-                    # Check for first out of rail event
-                    if len(self.outOfRailState) == 1 and (
-                        self.y[0] ** 2
-                        + self.y[1] ** 2
-                        + (self.y[2] - self.env.elevation) ** 2
-                        >= self.effective1RL**2
-                    ):
-                        # Rocket is out of rail
-                        # Check exactly when it went out using root finding
-                        # States before and after
-                        # t0 -> 0
-                        # print('\nEVENT DETECTED')
-                        # print('Rocket is Out of Rail!')
-                        # Disconsider elevation
-                        self.solution[-2][3] -= self.env.elevation
-                        self.solution[-1][3] -= self.env.elevation
-                        # Get points
-                        y0 = (
-                            sum([self.solution[-2][i] ** 2 for i in [1, 2, 3]])
-                            - self.effective1RL**2
-                        )
-                        yp0 = 2 * sum(
-                            [
-                                self.solution[-2][i] * self.solution[-2][i + 3]
-                                for i in [1, 2, 3]
-                            ]
-                        )
-                        t1 = self.solution[-1][0] - self.solution[-2][0]
-                        y1 = (
-                            sum([self.solution[-1][i] ** 2 for i in [1, 2, 3]])
-                            - self.effective1RL**2
-                        )
-                        yp1 = 2 * sum(
-                            [
-                                self.solution[-1][i] * self.solution[-1][i + 3]
-                                for i in [1, 2, 3]
-                            ]
-                        )
-                        # Put elevation back
-                        self.solution[-2][3] += self.env.elevation
-                        self.solution[-1][3] += self.env.elevation
-                        # Cubic Hermite interpolation (ax**3 + bx**2 + cx + d)
-                        D = float(phase.solver.step_size)
-                        d = float(y0)
-                        c = float(yp0)
-                        b = float((3 * y1 - yp1 * D - 2 * c * D - 3 * d) / (D**2))
-                        a = float(-(2 * y1 - yp1 * D - c * D - 2 * d) / (D**3)) + 1e-5
-                        # Find roots
-                        d0 = b**2 - 3 * a * c
-                        d1 = 2 * b**3 - 9 * a * b * c + 27 * d * a**2
-                        c1 = ((d1 + (d1**2 - 4 * d0**3) ** (0.5)) / 2) ** (1 / 3)
-                        t_roots = []
-                        for k in [0, 1, 2]:
-                            c2 = c1 * (-1 / 2 + 1j * (3**0.5) / 2) ** k
-                            t_roots.append(-(1 / (3 * a)) * (b + c2 + d0 / c2))
-                        # Find correct root
-                        valid_t_root = []
-                        for t_root in t_roots:
-                            if 0 < t_root.real < t1 and abs(t_root.imag) < 0.001:
-                                valid_t_root.append(t_root.real)
-                        if len(valid_t_root) > 1:
-                            raise ValueError(
-                                "Multiple roots found when solving for rail exit time."
-                            )
-                        # Determine final state when upper button is going out of rail
-                        self.t = valid_t_root[0] + self.solution[-2][0]
-                        interpolator = phase.solver.dense_output()
-                        self.y = interpolator(self.t)
-                        self.solution[-1] = [self.t, *self.y]
-                        self.outOfRailTime = self.t
-                        self.outOfRailState = self.y
-                        self.outOfRailVelocity = (
-                            self.y[3] ** 2 + self.y[4] ** 2 + self.y[5] ** 2
-                        ) ** (0.5)
-                        # Create new flight phase
-                        self.flightPhases.addPhase(
-                            self.t, self.uDot, index=phase_index + 1
-                        )
-                        # Prepare to leave loops and start new flight phase
-                        phase.timeNodes.flushAfter(node_index)
-                        phase.timeNodes.addNode(self.t, [], [])
-                        phase.solver.status = "finished"
-
-                    # Check for apogee event
-                    if len(self.apogeeState) == 1 and self.y[5] < 0:
-                        # print('\nPASSIVE EVENT DETECTED')
-                        # print('Rocket Has Reached Apogee!')
-                        # Apogee reported
-                        # Assume linear vz(t) to detect when vz = 0
-                        vz0 = self.solution[-2][6]
-                        t0 = self.solution[-2][0]
-                        vz1 = self.solution[-1][6]
-                        t1 = self.solution[-1][0]
-                        t_root = -(t1 - t0) * vz0 / (vz1 - vz0) + t0
-                        # Fetch state at t_root
-                        interpolator = phase.solver.dense_output()
-                        self.apogeeState = interpolator(t_root)
-                        # Store apogee data
-                        self.apogeeTime = t_root
-                        self.apogeeX = self.apogeeState[0]
-                        self.apogeeY = self.apogeeState[1]
-                        self.apogee = self.apogeeState[2]
-                        if self.terminateOnApogee:
-                            # print('Terminate on Apogee Activated!')
-                            self.t = t_root
-                            self.tFinal = self.t
-                            self.state = self.apogeeState
-                            # Roll back solution
-                            self.solution[-1] = [self.t, *self.state]
-                            # Set last flight phase
-                            self.flightPhases.flushAfter(phase_index)
-                            self.flightPhases.addPhase(self.t)
-                            # Prepare to leave loops and start new flight phase
-                            phase.timeNodes.flushAfter(node_index)
-                            phase.timeNodes.addNode(self.t, [], [])
-                            phase.solver.status = "finished"
-                    # Check for impact event
-                    if self.y[2] < self.env.elevation:
-                        # print('\nPASSIVE EVENT DETECTED')
-                        # print('Rocket Has Reached Ground!')
-                        # Impact reported
-                        # Check exactly when it went out using root finding
-                        # States before and after
-                        # t0 -> 0
-                        # Disconsider elevation
-                        self.solution[-2][3] -= self.env.elevation
-                        self.solution[-1][3] -= self.env.elevation
-                        # Get points
-                        y0 = self.solution[-2][3]
-                        yp0 = self.solution[-2][6]
-                        t1 = self.solution[-1][0] - self.solution[-2][0]
-                        y1 = self.solution[-1][3]
-                        yp1 = self.solution[-1][6]
-                        # Put elevation back
-                        self.solution[-2][3] += self.env.elevation
-                        self.solution[-1][3] += self.env.elevation
-                        # Cubic Hermite interpolation (ax**3 + bx**2 + cx + d)
-                        D = float(phase.solver.step_size)
-                        d = float(y0)
-                        c = float(yp0)
-                        b = float((3 * y1 - yp1 * D - 2 * c * D - 3 * d) / (D**2))
-                        a = float(-(2 * y1 - yp1 * D - c * D - 2 * d) / (D**3))
-                        # Find roots
-                        d0 = b**2 - 3 * a * c
-                        d1 = 2 * b**3 - 9 * a * b * c + 27 * d * a**2
-                        c1 = ((d1 + (d1**2 - 4 * d0**3) ** (0.5)) / 2) ** (1 / 3)
-                        t_roots = []
-                        for k in [0, 1, 2]:
-                            c2 = c1 * (-1 / 2 + 1j * (3**0.5) / 2) ** k
-                            t_roots.append(-(1 / (3 * a)) * (b + c2 + d0 / c2))
-                        # Find correct root
-                        valid_t_root = []
-                        for t_root in t_roots:
-                            if 0 < t_root.real < t1 and abs(t_root.imag) < 0.001:
-                                valid_t_root.append(t_root.real)
-                        if len(valid_t_root) > 1:
-                            raise ValueError(
-                                "Multiple roots found when solving for impact time."
-                            )
-                        # Determine impact state at t_root
-                        self.t = valid_t_root[0] + self.solution[-2][0]
-                        interpolator = phase.solver.dense_output()
-                        self.y = interpolator(self.t)
-                        # Roll back solution
-                        self.solution[-1] = [self.t, *self.y]
-                        # Save impact state
-                        self.impactState = self.y
-                        self.xImpact = self.impactState[0]
-                        self.yImpact = self.impactState[1]
-                        self.zImpact = self.impactState[2]
-                        self.impactVelocity = self.impactState[5]
-                        self.tFinal = self.t
-                        # Set last flight phase
-                        self.flightPhases.flushAfter(phase_index)
-                        self.flightPhases.addPhase(self.t)
-                        # Prepare to leave loops and start new flight phase
-                        phase.timeNodes.flushAfter(node_index)
-                        phase.timeNodes.addNode(self.t, [], [])
-                        phase.solver.status = "finished"
+                    # Check for out of rail, apogee, impact and user defined events
+                    self.__detectEvents(phase, phase_index, node_index)
 
                     # List and feed overshootable time nodes
                     if self.timeOvershoot:
@@ -1017,7 +945,7 @@ class Flight:
                         overshootableNodes = TimeNodes()
                         # Add overshootable parachute time nodes
                         overshootableNodes.addParachutes(
-                            self.parachutes, self.solution[-2][0], self.t
+                            self.parachutes, phase.solver.t_old, self.t
                         )
                         # Add last time node (always skipped)
                         overshootableNodes.addNode(self.t, [], [])
@@ -1105,9 +1033,117 @@ class Flight:
                                         self.parachuteEvents.append([self.t, parachute])
 
         self.tFinal = self.t
+        # Release the spare capacity of the buffers used during integration
+        for name in self.__buffers:
+            setattr(self, name, self.__dict__[name].copy())
+        del self.__buffers
         if verbose:
             print("Simulation Completed at Time: {:3.4f} s".format(self.t))
 
+    def __detectEvents(self, phase, phase_index, node_index):
+        """Checks if events happened during the last integration step.
+        Triggered events are handled in order of occurrence, with times
+        found by Event.findTime using the dense output of the solver. If
+        an event is terminal or has a derivative, the solution is rolled
+        back to the event time and the current flight phase finishes, so
+        that later events of the step are discarded. If the event time is
+        the start of the step, the step is dropped instead.
+
+        Parameters
+        ----------
+        phase : Flight.FlightPhases.FlightPhase
+            Current flight phase.
+        phase_index : int
+            Index of the current flight phase.
+        node_index : int
+            Index of the current time node of the flight phase.
+
+        Return
+        ------
+        None
+        """
+        triggered = []
+        for activeEvent in self.__activeEvents:
+            event, previousValue = activeEvent
+            activeEvent[1] = event.function(self.t, self.y)
+            if event.isTriggered(previousValue, activeEvent[1]):
+                triggered.append(event)
+        if len(triggered) == 0:
+            return None
+
+        t0 = self.solution[-2][0]
+        interpolator = phase.solver.dense_output()
+        times = [event.findTime(interpolator, t0, self.t) for event in triggered]
+        for t, event in sorted(zip(times, triggered), key=lambda item: item[0]):
+            u = interpolator(t)
+            self.triggeredEvents.append([t, event])
+            if event.once:
+                self.__activeEvents = [
+                    activeEvent
+                    for activeEvent in self.__activeEvents
+                    if activeEvent[0] is not event
+                ]
+            if event.callback is not None:
+                event.callback(self, t, u)
+            if event.terminal or event.derivative is not None:
+                # Roll back solution
+                self.t = t
+                if t > self.solution[-2][0]:
+                    self.y = u
+                    self.solution[-1] = [t, *u]
+                else:
+                    # Event at the start of the step, drop the step
+                    self.y = self.solution[-2][1:].copy()
+                    self.solution = self.solution[:-1]
+                    self.functionEvaluations = self.functionEvaluations[:-1]
+                    self.functionEvaluationsPerTimeStep = (
+                        self.functionEvaluationsPerTimeStep[:-1]
+                    )
+                    self.timeSteps = self.timeSteps[:-1]
+                if event.terminal:
+                    # Set last flight phase
+                    self.tFinal = t
+                    if t > phase.t:
+                        self.flightPhases.flushAfter(phase_index)
+                    else:
+                        # Drop the flight phase, which ends at its start
+                        self.flightPhases.flushAfter(phase_index - 1)
+                    self.flightPhases.addPhase(t)
+                else:
+                    # Create new flight phase
+                    self.flightPhases.addPhase(
+                        t, event.derivative, index=phase_index + 1
+                    )
+                # Prepare to leave loops and start new flight phase
+                phase.timeNodes.flushAfter(node_index)
+                phase.timeNodes.addNode(t, [], [])
+                phase.solver.status = "finished"
+                break
+
+        return None
+
+    def __recordRailExit(self, t, u):
+        """Stores out of rail data, see Flight.__detectEvents."""
+        self.outOfRailTime = t
+        self.outOfRailState = u
+        self.outOfRailVelocity = (u[3] ** 2 + u[4] ** 2 + u[5] ** 2) ** (0.5)
+
+    def __recordApogee(self, t, u):
+        """Stores apogee data, see Flight.__detectEvents."""
+        self.apogeeState = u
+        self.apogeeTime = t
+        self.apogeeX = u[0]
+        self.apogeeY = u[1]
+        self.apogee = u[2]
+
+    def __recordImpact(self, t, u):
+        """Stores impact data, see Flight.__detectEvents."""
+        self.impactState = u
+        self.xImpact = u[0]
+        self.yImpact = u[1]
+        self.zImpact = u[2]
+        self.impactVelocity = u[5]
+
     def __init_post_process_variables(self):
         """Initialize post-process variables."""
         # Initialize all variables created during Flight.postProcess()
@@ -1215,8 +1251,8 @@ class Flight:
         """
         # Check if post processing mode is on
         if postProcessing:
-            # Use uDot post processing code
-            return self.uDot(t, u, True)
+            # Record flight data with uDot post processing code
+            self.uDot(t, u, True)
 
         # Retrieve integration data
         x, y, z, vx, vy, vz, e0, e1, e2, e3, omega1, omega2, omega3 = u
@@ -1226,17 +1262,20 @@ class Flight:
         M = self.rocket.totalMass.getValueOpt(t)
 
         # Get freestream speed
+        (
+            windVelocityX,
+            windVelocityY,
+            speedOfSound,
+            rho,
+        ) = self.atmosphereFunctions.getValueOpt(z)
         freestreamSpeed = (
-            (self.env.windVelocityX.getValueOpt(z) - vx) ** 2
-            + (self.env.windVelocityY.getValueOpt(z) - vy) ** 2
-            + (vz) ** 2
+            (windVelocityX - vx) ** 2 + (windVelocityY - vy) ** 2 + (vz) ** 2
         ) ** 0.5
-        freestreamMach = freestreamSpeed / self.env.speedOfSound.getValueOpt(z)
+        freestreamMach = freestreamSpeed / speedOfSound
         dragCoeff = self.rocket.powerOnDrag.getValueOpt(freestreamMach)
 
         # Calculate Forces
-        Thrust = self.rocket.motor.thrust.getValueOpt(t)
-        rho = self.env.density.getValueOpt(z)
+        Thrust = self.motorFunctions.getValueOpt(t)[-1]
         R3 = -0.5 * rho * (freestreamSpeed**2) * self.rocket.area * (dragCoeff)
 
         # Calculate Linear acceleration
@@ -1306,16 +1345,16 @@ class Flight:
         if t < self.rocket.motor.burnOutTime:
             # Motor burning
             # Retrieve important motor quantities
-            # Inertias
-            Tz = self.rocket.motor.inertiaZ.getValueOpt(t)
-            Ti = self.rocket.motor.inertiaI.getValueOpt(t)
-            TzDot = self.rocket.motor.inertiaZDot.getValueOpt(t)
-            TiDot = self.rocket.motor.inertiaIDot.getValueOpt(t)
-            # Mass
-            MtDot = self.rocket.motor.massDot.getValueOpt(t)
-            Mt = self.rocket.motor.mass.getValueOpt(t)
-            # Thrust
-            Thrust = self.rocket.motor.thrust.getValueOpt(t)
+            # Inertias, mass and thrust
+            (
+                Tz,
+                Ti,
+                TzDot,
+                TiDot,
+                MtDot,
+                Mt,
+                Thrust,
+            ) = self.motorFunctions.getValueOpt(t)
             # Off center moment
             M1 += self.rocket.thrustEccentricityX * Thrust
             M2 -= self.rocket.thrustEccentricityY * Thrust
@@ -1359,12 +1398,16 @@ class Flight:
 
         # Calculate Forces and Moments
         # Get freestream speed
-        windVelocityX = self.env.windVelocityX.getValueOpt(z)
-        windVelocityY = self.env.windVelocityY.getValueOpt(z)
+        (
+            windVelocityX,
+            windVelocityY,
+            speedOfSound,
+            rho,
+        ) = self.atmosphereFunctions.getValueOpt(z)
         freestreamSpeed = (
             (windVelocityX - vx) ** 2 + (windVelocityY - vy) ** 2 + (vz) ** 2
         ) ** 0.5
-        freestreamMach = freestreamSpeed / self.env.speedOfSound.getValueOpt(z)
+        freestreamMach = freestreamSpeed / speedOfSound
 
         # Determine aerodynamics forces
         # Determine Drag Force
@@ -1372,7 +1415,6 @@ class Flight:
             dragCoeff = self.rocket.powerOnDrag.getValueOpt(freestreamMach)
         else:
             dragCoeff = self.rocket.powerOffDrag.getValueOpt(freestreamMach)
-        rho = self.env.density.getValueOpt(z)
         R3 = -0.5 * rho * (freestreamSpeed**2) * self.rocket.area * (dragCoeff)
         # Off center moment
         M1 += self.rocket.cpEccentricityY * R3
@@ -1390,8 +1432,7 @@ class Flight:
             compVzB = vzB
             # Wind velocity at component
             compZ = z + compCp
-            compWindVx = self.env.windVelocityX.getValueOpt(compZ)
-            compWindVy = self.env.windVelocityY.getValueOpt(compZ)
+            compWindVx, compWindVy = self.windFunctions.getValueOpt(compZ)
             # Component freestream velocity in body frame
             compWindVxB = a11 * compWindVx + a21 * compWindVy
             compWindVyB = a12 * compWindVx + a22 * compWindVy
@@ -1503,20 +1544,16 @@ class Flight:
         ]
 
         if postProcessing:
-            # Dynamics variables
-            self.R1.append([t, R1])
-            self.R2.append([t, R2])
-            self.R3.append([t, R3])
-            self.M1.append([t, M1])
-            self.M2.append([t, M2])
-            self.M3.append([t, M3])
-            # Atmospheric Conditions
-            self.windVelocityX.append([t, self.env.windVelocityX(z)])
-            self.windVelocityY.append([t, self.env.windVelocityY(z)])
-            self.density.append([t, self.env.density(z)])
-            self.dynamicViscosity.append([t, self.env.dynamicViscosity(z)])
-            self.pressure.append([t, self.env.pressure(z)])
-            self.speedOfSound.append([t, self.env.speedOfSound(z)])
+            # Dynamics variables and atmospheric conditions
+            self.__postProcessingRow[:] = [
+                R1,
+                R2,
+                R3,
+                M1,
+                M2,
+                M3,
+                *self.atmosphereOutputFunctions.getValueOpt(z),
+            ]
 
         return uDot
 
@@ -1547,7 +1584,9 @@ class Flight:
         CdS = self.parachuteCdS
         ka = 1
         R = 1.5
-        rho = self.env.density.getValueOpt(u[2])
+        windVelocityX, windVelocityY, _, rho = self.atmosphereFunctions.getValueOpt(
+            u[2]
+        )
         to = 1.2
         ma = ka * rho * (4 / 3) * np.pi * R**3
         mp = self.rocket.mass
@@ -1558,9 +1597,6 @@ class Flight:
         Rdot = 0
         # Get relevant state data
         x, y, z, vx, vy, vz, e0, e1, e2, e3, omega1, omega2, omega3 = u
-        # Get wind data
-        windVelocityX = self.env.windVelocityX.getValueOpt(z)
-        windVelocityY = self.env.windVelocityY.getValueOpt(z)
         freestreamSpeed = (
             (windVelocityX - vx) ** 2 + (windVelocityY - vy) ** 2 + (vz) ** 2
         ) ** 0.5
@@ -1579,20 +1615,16 @@ class Flight:
         az = (Dz - 9.8 * mp) / (mp + ma)
 
         if postProcessing:
-            # Dynamics variables
-            self.R1.append([t, Dx])
-            self.R2.append([t, Dy])
-            self.R3.append([t, Dz])
-            self.M1.append([t, 0])
-            self.M2.append([t, 0])
-            self.M3.append([t, 0])
-            # Atmospheric Conditions
-            self.windVelocityX.append([t, self.env.windVelocityX(z)])
-            self.windVelocityY.append([t, self.env.windVelocityY(z)])
-            self.density.append([t, self.env.density(z)])
-            self.dynamicViscosity.append([t, self.env.dynamicViscosity(z)])
-            self.pressure.append([t, self.env.pressure(z)])
-            self.speedOfSound.append([t, self.env.speedOfSound(z)])
+            # Dynamics variables and atmospheric conditions
+            self.__postProcessingRow[:] = [
+                Dx,
+                Dy,
+                Dz,
+                0,
+                0,
+                0,
+                *self.atmosphereOutputFunctions.getValueOpt(z),
+            ]
 
         return [vx, vy, vz, ax, ay, az, 0, 0, 0, 0, 0, 0, 0]
 
@@ -1602,17 +1634,221 @@ class Flight:
         calculation of secondary values such as energy and conversion
         of lists to Function objects to facilitate plotting.
 
+        Outputs are not calculated here, but in groups of related outputs
+        when one of them is first accessed, so that reading only a few of
+        them, such as Flight.maxSpeed, is cheap. Calling this method again
+        discards outputs calculated before.
+
         Parameters
         ----------
-        None
+        interpolation : string, optional
+            Interpolation method of the state vector, acceleration, force
+            and atmospheric Functions. Default is "spline".
+        extrapolation : string, optional
+            Extrapolation method of the state vector Functions. Default is
+            "natural".
 
         Return
         ------
         None
         """
-        # Process first type of outputs - state vector
+        # Register which method calculates each output, see Flight.__getattr__
+        self.__postProcessSettings = (interpolation, extrapolation)
+        self.lazyOutputs = {}
+        self.__calculatingOutputs = []
+        for calculate, outputs in [
+            (
+                self.__postProcessStateVector,
+                [
+                    "x",
+                    "y",
+                    "z",
+                    "vx",
+                    "vy",
+                    "vz",
+                    "e0",
+                    "e1",
+                    "e2",
+                    "e3",
+                    "w1",
+                    "w2",
+                    "w3",
+                ],
+            ),
+            (
+                self.__postProcessSteps,
+                [
+                    "ax",
+                    "ay",
+                    "az",
+                    "alpha1",
+                    "alpha2",
+                    "alpha3",
+                    "R1",
+                    "R2",
+                    "R3",
+                    "M1",
+                    "M2",
+                    "M3",
+                    "windVelocityX",
+                    "windVelocityY",
+                    "density",
+                    "dynamicViscosity",
+                    "pressure",
+                    "speedOfSound",
+                ],
+            ),
+            (
+                self.__postProcessSpeed,
+                ["speed", "maxSpeed", "maxSpeedTime", "horizontalSpeed", "pathAngle"],
+            ),
+            (
+                self.__postProcessAcceleration,
+                ["acceleration", "maxAcceleration", "maxAccelerationTime"],
+            ),
+            (
+                self.__postProcessAttitude,
+                [
+                    "attitudeVectorX",
+                    "attitudeVectorY",
+                    "attitudeVectorZ",
+                    "attitudeAngle",
+                    "lateralAttitudeAngle",
+                    "psi",
+                    "phi",
+                    "theta",
+                ],
+            ),
+            (
+                self.__postProcessRailButtonForces,
+                [
+                    "railButton1NormalForce",
+                    "railButton1ShearForce",
+                    "railButton2NormalForce",
+                    "railButton2ShearForce",
+                    "maxRailButton1NormalForce",
+                    "maxRailButton1ShearForce",
+                    "maxRailButton2NormalForce",
+                    "maxRailButton2ShearForce",
+                ],
+            ),
+            (
+                self.__postProcessAerodynamicForces,
+                [
+                    "aerodynamicLift",
+                    "aerodynamicDrag",
+                    "aerodynamicBendingMoment",
+                    "aerodynamicSpinMoment",
+                ],
+            ),
+            (
+                self.__postProcessEnergy,
+                [
+                    "rotationalEnergy",
+                    "translationalEnergy",
+                    "kineticEnergy",
+                    "potentialEnergy",
+                    "totalEnergy",
+                    "thrustPower",
+                    "dragPower",
+                ],
+            ),
+            (
+                self.__postProcessFrequencyResponses,
+                [
+                    "omega1FrequencyResponse",
+                    "omega2FrequencyResponse",
+                    "omega3FrequencyResponse",
+                    "attitudeFrequencyResponse",
+                ],
+            ),
+            (
+                self.__postProcessFluidMechanics,
+                [
+                    "streamVelocityX",
+                    "streamVelocityY",
+                    "streamVelocityZ",
+                    "freestreamSpeed",
+                    "apogeeFreestreamSpeed",
+                    "MachNumber",
+                    "maxMachNumber",
+                    "maxMachNumberTime",
+                    "ReynoldsNumber",
+                    "maxReynoldsNumber",
+                    "maxReynoldsNumberTime",
+                    "dynamicPressure",
+                    "maxDynamicPressure",
+                    "maxDynamicPressureTime",
+                    "totalPressure",
+                    "maxtotalPressure",
+                    "maxtotalPressureTime",
+                ],
+            ),
+            (
+                self.__postProcessAngleOfAttack,
+                ["angleOfAttack"],
+            ),
+            (
+                self.__postProcessLatLon,
+                ["latitude", "longitude"],
+            ),
+        ]:
+            for output in outputs:
+                self.__dict__.pop(output, None)
+                self.lazyOutputs[output] = calculate
+
+        # Static Margin
+        self.staticMargin = self.rocket.staticMargin
+
+        # Transform parachute sensor feed into functions
+        for parachute in self.rocket.parachutes:
+            parachute.cleanPressureSignalFunction = Function(
+                parachute.cleanPressureSignal,
+                "Time (s)",
+                "Pressure - Without Noise (Pa)",
+                "linear",
+            )
+            parachute.noisyPressureSignalFunction = Function(
+                parachute.noisyPressureSignal,
+                "Time (s)",
+                "Pressure - With Noise (Pa)",
+                "linear",
+            )
+            parachute.noiseSignalFunction = Function(
+                parachute.noiseSignal, "Time (s)", "Pressure Noise (Pa)", "linear"
+            )
+
+        # Register post processing
+        self.postProcessed = True
+
+        return None
+
+    def __getattr__(self, name):
+        """Calculates an output of Flight.postProcess when it is first
+        accessed, together with the other outputs of its group. Outputs
+        needed by the group are accessed in turn, so they are calculated
+        first if necessary. The group stays in Flight.lazyOutputs until its
+        calculation succeeds, so errors are raised again on later accesses.
+        """
+        calculate = self.__dict__.get("lazyOutputs", {}).get(name)
+        if calculate is None or calculate in self.__calculatingOutputs:
+            raise AttributeError("'Flight' object has no attribute '{}'".format(name))
+        self.__calculatingOutputs.append(calculate)
+        try:
+            calculate()
+        finally:
+            self.__calculatingOutputs.remove(calculate)
+        for output in [
+            key for key, value in self.lazyOutputs.items() if value == calculate
+        ]:
+            del self.lazyOutputs[output]
+        return self.__dict__[name]
+
+    def __postProcessStateVector(self):
+        """Calculates the state vector Functions from the solution."""
+        interpolation, extrapolation = self.__postProcessSettings
         # Transform solution array into Functions
-        sol = np.array(self.solution)
+        sol = self.solution
         self.x = Function(
             sol[:, [0, 1]], "Time (s)", "X (m)", interpolation, extrapolation
         )
@@ -1653,12 +1889,21 @@ class Flight:
             sol[:, [0, 13]], "Time (s)", "ω3 (rad/s)", interpolation, extrapolation
         )
 
-        # Process second type of outputs - accelerations
-        # Initialize acceleration arrays
-        self.ax, self.ay, self.az = [], [], []
-        self.alpha1, self.alpha2, self.alpha3 = [], [], []
-        # Go through each time step and calculate accelerations
-        # Get flight phases
+    def __postProcessSteps(self):
+        """Calculates the accelerations, forces and atmospheric values at
+        each time step of the solution."""
+        interpolation = self.__postProcessSettings[0]
+        # Process second and third types of outputs - accelerations, and
+        # forces and atmospheric values calculated during integration. Each
+        # time step is visited once, calling the derivative of its flight
+        # phase in post processing mode, which records forces and atmospheric
+        # values in a row of postProcessingValues.
+        sol = self.solution
+        time = sol[:, 0]
+        accelerations = np.empty((len(sol), 6))
+        postProcessingValues = np.empty((len(sol), 12))
+        hasAcceleration = np.zeros(len(sol), dtype=bool)
+        hasValues = np.zeros(len(sol), dtype=bool)
         for phase_index, phase in self.timeIterator(self.flightPhases):
             initTime = phase.t
             finalTime = self.flightPhases[phase_index + 1].t
@@ -1666,53 +1911,55 @@ class Flight:
             # Call callback functions
             for callback in phase.callbacks:
                 callback(self)
-            # Loop through time steps in flight phase
-            for step in self.solution:  # Can be optimized
-                if initTime < step[0] <= finalTime:
-                    # Get derivatives
-                    uDot = currentDerivative(step[0], step[1:])
-                    # Get accelerations
-                    ax, ay, az = uDot[3:6]
-                    alpha1, alpha2, alpha3 = uDot[10:]
-                    # Save accelerations
-                    self.ax.append([step[0], ax])
-                    self.ay.append([step[0], ay])
-                    self.az.append([step[0], az])
-                    self.alpha1.append([step[0], alpha1])
-                    self.alpha2.append([step[0], alpha2])
-                    self.alpha3.append([step[0], alpha3])
+            # Steps with initTime < time <= finalTime, plus the initial step
+            # for forces and atmospheric values
+            start, end = np.searchsorted(time, [initTime, finalTime], side="right")
+            if initTime == 0:
+                start = np.searchsorted(time, 0, side="left")
+            for i in range(start, end):
+                self.__postProcessingRow = postProcessingValues[i]
+                uDot = currentDerivative(time[i], sol[i, 1:], postProcessing=True)
+                accelerations[i] = uDot[3:6] + uDot[10:]
+                hasAcceleration[i] = time[i] > initTime
+                hasValues[i] = True
+        self.__postProcessingRow = None
         # Convert accelerations to functions
-        self.ax = Function(self.ax, "Time (s)", "Ax (m/s2)", interpolation)
-        self.ay = Function(self.ay, "Time (s)", "Ay (m/s2)", interpolation)
-        self.az = Function(self.az, "Time (s)", "Az (m/s2)", interpolation)
-        self.alpha1 = Function(self.alpha1, "Time (s)", "α1 (rad/s2)", interpolation)
-        self.alpha2 = Function(self.alpha2, "Time (s)", "α2 (rad/s2)", interpolation)
-        self.alpha3 = Function(self.alpha3, "Time (s)", "α3 (rad/s2)", interpolation)
-
-        # Process third type of outputs - temporary values calculated during integration
-        # Initialize force and atmospheric arrays
-        self.R1, self.R2, self.R3, self.M1, self.M2, self.M3 = [], [], [], [], [], []
-        self.pressure, self.density, self.dynamicViscosity, self.speedOfSound = (
-            [],
-            [],
-            [],
-            [],
-        )
-        self.windVelocityX, self.windVelocityY = [], []
-        # Go through each time step and calculate forces and atmospheric values
-        # Get flight phases
-        for phase_index, phase in self.timeIterator(self.flightPhases):
-            initTime = phase.t
-            finalTime = self.flightPhases[phase_index + 1].t
-            currentDerivative = phase.derivative
-            # Call callback functions
-            for callback in phase.callbacks:
-                callback(self)
-            # Loop through time steps in flight phase
-            for step in self.solution:  # Can be optimized
-                if initTime < step[0] <= finalTime or (initTime == 0 and step[0] == 0):
-                    # Call derivatives in post processing mode
-                    uDot = currentDerivative(step[0], step[1:], postProcessing=True)
+        accelerations = np.column_stack((time, accelerations))[hasAcceleration]
+        self.ax = Function(
+            accelerations[:, [0, 1]], "Time (s)", "Ax (m/s2)", interpolation
+        )
+        self.ay = Function(
+            accelerations[:, [0, 2]], "Time (s)", "Ay (m/s2)", interpolation
+        )
+        self.az = Function(
+            accelerations[:, [0, 3]], "Time (s)", "Az (m/s2)", interpolation
+        )
+        self.alpha1 = Function(
+            accelerations[:, [0, 4]], "Time (s)", "α1 (rad/s2)", interpolation
+        )
+        self.alpha2 = Function(
+            accelerations[:, [0, 5]], "Time (s)", "α2 (rad/s2)", interpolation
+        )
+        self.alpha3 = Function(
+            accelerations[:, [0, 6]], "Time (s)", "α3 (rad/s2)", interpolation
+        )
+        (
+            self.R1,
+            self.R2,
+            self.R3,
+            self.M1,
+            self.M2,
+            self.M3,
+            self.windVelocityX,
+            self.windVelocityY,
+            self.density,
+            self.dynamicViscosity,
+            self.pressure,
+            self.speedOfSound,
+        ) = [
+            np.column_stack((time, column))[hasValues]
+            for column in postProcessingValues.T
+        ]
         # Convert forces and atmospheric arrays to functions
         self.R1 = Function(self.R1, "Time (s)", "R1 (N)", interpolation)
         self.R2 = Function(self.R2, "Time (s)", "R2 (N)", interpolation)
@@ -1745,8 +1992,8 @@ class Flight:
             self.speedOfSound, "Time (s)", "Speed of Sound (m/s)", interpolation
         )
 
-        # Process fourth type of output - values calculated from previous outputs
-
+    def __postProcessSpeed(self):
+        """Calculates speed and path angle."""
         # Kinematics functions and values
         # Velocity Magnitude
         self.speed = (self.vx**2 + self.vy**2 + self.vz**2) ** 0.5
@@ -1754,12 +2001,6 @@ class Flight:
         maxSpeedTimeIndex = np.argmax(self.speed[:, 1])
         self.maxSpeed = self.speed[maxSpeedTimeIndex, 1]
         self.maxSpeedTime = self.speed[maxSpeedTimeIndex, 0]
-        # Acceleration
-        self.acceleration = (self.ax**2 + self.ay**2 + self.az**2) ** 0.5
-        self.acceleration.setOutputs("Acceleration Magnitude (m/s²)")
-        maxAccelerationTimeIndex = np.argmax(self.acceleration[:, 1])
-        self.maxAcceleration = self.acceleration[maxAccelerationTimeIndex, 1]
-        self.maxAccelerationTime = self.acceleration[maxAccelerationTimeIndex, 0]
         # Path Angle
         self.horizontalSpeed = (self.vx**2 + self.vy**2) ** 0.5
         pathAngle = (180 / np.pi) * np.arctan2(
@@ -1767,6 +2008,17 @@ class Flight:
         )
         pathAngle = np.column_stack([self.vz[:, 0], pathAngle])
         self.pathAngle = Function(pathAngle, "Time (s)", "Path Angle (°)")
+
+    def __postProcessAcceleration(self):
+        """Calculates acceleration magnitude and its maximum value."""
+        self.acceleration = (self.ax**2 + self.ay**2 + self.az**2) ** 0.5
+        self.acceleration.setOutputs("Acceleration Magnitude (m/s²)")
+        maxAccelerationTimeIndex = np.argmax(self.acceleration[:, 1])
+        self.maxAcceleration = self.acceleration[maxAccelerationTimeIndex, 1]
+        self.maxAccelerationTime = self.acceleration[maxAccelerationTimeIndex, 0]
+
+    def __postProcessAttitude(self):
+        """Calculates the attitude vector, attitude angles and Euler angles."""
         # Attitude Angle
         self.attitudeVectorX = 2 * (self.e1 * self.e3 + self.e0 * self.e2)  # a13
         self.attitudeVectorY = 2 * (self.e2 * self.e3 - self.e0 * self.e1)  # a23
@@ -1806,6 +2058,7 @@ class Flight:
         self.lateralAttitudeAngle = Function(
             lateralAttitudeAngle, "Time (s)", "Lateral Attitude Angle (°)"
         )
+
         # Euler Angles
         psi = (180 / np.pi) * (
             np.arctan2(self.e3[:, 1], self.e0[:, 1])
@@ -1829,7 +2082,8 @@ class Flight:
         theta = np.column_stack([self.e1[:, 0], theta])  # Nutation angle
         self.theta = Function(theta, "Time (s)", "Nutation Angle - θ (°)")
 
-        # Dynamics functions and variables
+    def __postProcessRailButtonForces(self):
+        """Calculates rail button forces and their maximum values."""
         # Rail Button Forces
         alpha = self.rocket.railButtons.angularPosition * (
             np.pi / 180
@@ -1886,6 +2140,9 @@ class Flight:
             self.maxRailButton2ShearForce = np.amax(
                 self.railButton2ShearForce[:outOfRailTimeIndex]
             )
+
+    def __postProcessAerodynamicForces(self):
+        """Calculates aerodynamic forces and moments."""
         # Aerodynamic Lift and Drag
         self.aerodynamicLift = (self.R1**2 + self.R2**2) ** 0.5
         self.aerodynamicLift.setOutputs("Aerodynamic Lift Force (N)")
@@ -1895,26 +2152,29 @@ class Flight:
         self.aerodynamicBendingMoment.setOutputs("Aerodynamic Bending Moment (N m)")
         self.aerodynamicSpinMoment = self.M3
         self.aerodynamicSpinMoment.setOutputs("Aerodynamic Spin Moment (N m)")
+
+    def __postProcessEnergy(self):
+        """Calculates kinetic, potential and total energy, and thrust and
+        drag power."""
         # Energy
         b = -self.rocket.distanceRocketPropellant
         totalMass = self.rocket.totalMass
         mu = self.rocket.reducedMass
         Rz = self.rocket.inertiaZ
         Ri = self.rocket.inertiaI
-        Tz = self.rocket.motor.inertiaZ
-        Ti = self.rocket.motor.inertiaI
-        I1, I2, I3 = (Ri + Ti + mu * b**2), (Ri + Ti + mu * b**2), (Rz + Tz)
-        # Redefine I1, I2 and I3 grid
+        # Motor quantities as used during the integration, on the solution grid
         grid = self.vx[:, 0]
-        I1 = Function(np.column_stack([grid, I1(grid)]), "Time (s)")
-        I2 = Function(np.column_stack([grid, I2(grid)]), "Time (s)")
-        I3 = Function(np.column_stack([grid, I3(grid)]), "Time (s)")
+        Tz, Ti, _, _, _, _, thrust = self.motorFunctions.getValue(grid)
+        I1 = I2 = Ri + Ti + np.asarray(mu(grid)) * b**2
+        I3 = Rz + Tz
+        # Redefine I1, I2 and I3 grid
+        I1 = Function(np.column_stack([grid, I1]), "Time (s)")
+        I2 = Function(np.column_stack([grid, I2]), "Time (s)")
+        I3 = Function(np.column_stack([grid, I3]), "Time (s)")
         # Redefine total mass grid
         totalMass = Function(np.column_stack([grid, totalMass(grid)]), "Time (s)")
         # Redefine thrust grid
-        thrust = Function(
-            np.column_stack([grid, self.rocket.motor.thrust(grid)]), "Time (s)"
-        )
+        thrust = Function(np.column_stack([grid, thrust]), "Time (s)")
         # Get some nicknames
         vx, vy, vz = self.vx, self.vy, self.vz
         w1, w2, w3 = self.w1, self.w2, self.w3
@@ -1938,7 +2198,9 @@ class Flight:
         self.dragPower = self.R3 * self.speed
         self.dragPower.setOutputs("Drag Power (W)")
 
-        # Stability and Control variables
+    def __postProcessFrequencyResponses(self):
+        """Calculates the frequency responses of angular velocities and
+        attitude angle."""
         # Angular velocities frequency response - Fourier Analysis
         # Omega 1 - w1
         Fs = 100.0
@@ -2018,9 +2280,10 @@ class Flight:
             "Frequency (Hz)",
             "Attitude Angle Fourier Amplitude",
         )
-        # Static Margin
-        self.staticMargin = self.rocket.staticMargin
 
+    def __postProcessFluidMechanics(self):
+        """Calculates freestream velocity, Mach and Reynolds numbers and
+        dynamic and total pressures."""
         # Fluid Mechanics variables
         # Freestream Velocity
         self.streamVelocityX = self.windVelocityX - self.vx
@@ -2065,6 +2328,9 @@ class Flight:
         maxtotalPressureTimeIndex = np.argmax(self.totalPressure[:, 1])
         self.maxtotalPressureTime = self.totalPressure[maxtotalPressureTimeIndex, 0]
         self.maxtotalPressure = self.totalPressure[maxDynamicPressureTimeIndex, 1]
+
+    def __postProcessAngleOfAttack(self):
+        """Calculates the angle of attack."""
         # Angle of Attack
         angleOfAttack = []
         for i in range(len(self.attitudeVectorX[:, 1])):
@@ -2093,6 +2359,8 @@ class Flight:
             angleOfAttack, "Time (s)", "Angle Of Attack (°)", "linear"
         )
 
+    def __postProcessLatLon(self):
+        """Calculates latitude and longitude from x and y positions."""
         # Converts x and y positions to lat and lon
         # We are currently considering the earth as a sphere.
         bearing = []
@@ -2186,31 +2454,6 @@ class Flight:
         self.latitude = Function(latitude, "Time (s)", "Latitude (°)", "linear")
         self.longitude = Function(longitude, "Time (s)", "Longitude (°)", "linear")
 
-        # Post process other quantities
-
-        # Transform parachute sensor feed into functions
-        for parachute in self.rocket.parachutes:
-            parachute.cleanPressureSignalFunction = Function(
-                parachute.cleanPressureSignal,
-                "Time (s)",
-                "Pressure - Without Noise (Pa)",
-                "linear",
-            )
-            parachute.noisyPressureSignalFunction = Function(
-                parachute.noisyPressureSignal,
-                "Time (s)",
-                "Pressure - With Noise (Pa)",
-                "linear",
-            )
-            parachute.noiseSignalFunction = Function(
-                parachute.noiseSignal, "Time (s)", "Pressure Noise (Pa)", "linear"
-            )
-
-        # Register post processing
-        self.postProcessed = True
-
-        return None
-
     def info(self):
         """Prints out a summary of the data available about the Flight.
 
@@ -3561,7 +3804,7 @@ class Flight:
 
         # Loop through variables, get points and names (for the header)
         for variable in variables:
-            variableFunction = self.__dict__[variable]
+            variableFunction = getattr(self, variable)
             variablePoints = variableFunction(timePoints)
             exportedMatrix += [variablePoints]
             exportedHeader += ", " + variableFunction.__outputs__[0]
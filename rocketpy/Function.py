@@ -4,11 +4,120 @@ __author__ = "Giovani Hidalgo Ceotto, Lucas Kierulff Balabram"
 __copyright__ = "Copyright 20XX, RocketPy Team"
 __license__ = "MIT"
 
+import hashlib
+import json
+import math
+import os
+import weakref
+from bisect import bisect_left
 from inspect import signature
+from itertools import product
 
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy import integrate, linalg
+from scipy import integrate, linalg, spatial
+
+try:
+    from numba import njit
+except ImportError:
+    has_numba = False
+else:
+    has_numba = True
+
+
+def evaluateCubicTablePoint(x, xData, coeffs, extrapolations, yFirst, yLast, out):
+    """Evaluate, at a scalar x, the piecewise cubics of one or more columns
+    of data which share the same points xData, and store the results in out.
+    Written for numba, which compiles it if available, see
+    Function.jitKernels.
+
+    Parameters
+    ----------
+    x : float
+        Point where the columns are to be evaluated.
+    xData : ndarray
+        Increasing array of the n data points.
+    coeffs : ndarray
+        Array of shape (n - 1, m, 4) of the cubic coefficients of each
+        interval and column, in the layout of Function.__interpolateSpline__.
+    extrapolations : ndarray
+        Array of m ints, 0 for zero, 1 for natural and 2 for constant
+        extrapolation of each column.
+    yFirst : ndarray
+        Array of the m values of the columns at the first data point.
+    yLast : ndarray
+        Array of the m values of the columns at the last data point.
+    out : ndarray
+        Array of m floats where the results are stored.
+
+    Returns
+    -------
+    None
+    """
+    n = len(xData)
+    inside = xData[0] <= x <= xData[n - 1]
+    i = min(max(np.searchsorted(xData, x) - 1, 0), n - 2)
+    dx = x - xData[i]
+    for j in range(len(out)):
+        if x == xData[n - 1]:
+            out[j] = yLast[j]
+        elif inside or extrapolations[j] == 1:
+            a = coeffs[i, j]
+            out[j] = ((a[3] * dx + a[2]) * dx + a[1]) * dx + a[0]
+        elif extrapolations[j] == 0:
+            out[j] = 0.0
+        else:
+            out[j] = yFirst[j] if x < xData[0] else yLast[j]
+
+
+def evaluateCubicTable(x, xData, coeffs, extrapolations, yFirst, yLast, out):
+    """Evaluate, at each point of a 1-D array x, the piecewise cubics of one
+    or more columns of data, see evaluateCubicTablePoint. The results are
+    stored in out, an array of shape (len(x), m)."""
+    for k in range(len(x)):
+        evaluateCubicTablePoint(
+            x[k], xData, coeffs, extrapolations, yFirst, yLast, out[k]
+        )
+
+
+def growArray(owner, name, buffers, rows=1):
+    """Extend the array stored in attribute name of owner by rows
+    uninitialized rows. The result is a view of buffers[name], which is
+    reallocated with twice the needed capacity when full, so that repeated
+    growth takes amortized constant time. Rows already added can be edited
+    in place through the array.
+
+    Parameters
+    ----------
+    owner : object
+        Object holding the array, such as a Function or a Flight.
+    name : string
+        Name of the attribute.
+    buffers : dict
+        Buffers of the arrays of owner, by attribute name. A buffer is
+        created if name is missing or if the array is not a view of it.
+    rows : int, optional
+        Number of rows to be added. Default is 1.
+
+    Returns
+    -------
+    array : ndarray
+        Extended array, also stored in attribute name.
+    """
+    array = getattr(owner, name)
+    buffer = buffers.get(name)
+    n = len(array) + rows
+    if buffer is None or array.base is not buffer or len(buffer) < n:
+        buffer = np.empty((2 * n,) + array.shape[1:], dtype=array.dtype)
+        buffer[: len(array)] = array
+        buffers[name] = buffer
+    setattr(owner, name, buffer[:n])
+    return buffer[:n]
+
+
+if has_numba:
+    evaluateCubicTablePoint = njit(cache=True)(evaluateCubicTablePoint)
+    evaluateCubicTable = njit(cache=True)(evaluateCubicTable)
 
 
 class Function:
@@ -17,6 +126,60 @@ class Function:
     extrapolation, plotting and algebra.
     """
 
+    # Functions have a fixed set of attributes, which saves the memory of a
+    # __dict__ per instance
+    __slots__ = (
+        "source",
+        "getValueOpt",
+        "last_interval",
+        "__inputs__",
+        "__outputs__",
+        "__domDim__",
+        "__imgDim__",
+        "__interpolation__",
+        "__extrapolation__",
+        "__splineCoefficients__",
+        "__akimaCoefficients__",
+        "__polynomialCoefficients__",
+        "__gridSpacing__",
+        "__gridStep__",
+        "__gridAxes__",
+        "__gridValues__",
+        "__gridDerivatives__",
+        "__shepardNeighbors__",
+        "__shepardRadius__",
+        "__shepardTree__",
+        "__appendBuffers__",
+        "__kernelCache__",
+        "__dependents__",
+    )
+
+    # Number of trailing intervals whose natural spline coefficients are
+    # recalculated when points are appended. The influence of new points on
+    # the spline decays by a factor of about 0.27 per interval.
+    appendSplineWindow = 32
+
+    # Operations between Functions defined by arrays on different grids are
+    # performed on the union of the grids if unionGrid is True. Otherwise,
+    # they result in lazily evaluated Functions. Union grid points closer
+    # than unionGridTolerance to the previous point are dropped.
+    unionGrid = True
+    unionGridTolerance = 0
+
+    # Sources read from CSV files are cached as binary .npy files inside
+    # sourceCacheDirectory, if it is not None, and reused while the CSV file
+    # keeps its modification time and size. Cached and .npy sources are
+    # memory mapped, instead of read into memory, if memoryMapSources is True.
+    sourceCacheDirectory = None
+    memoryMapSources = False
+
+    # If jitKernels is True and numba is installed, FunctionSets and arrays
+    # of points of 1-D Functions interpolated by spline, akima or linear
+    # methods are evaluated by compiled kernels. Otherwise, Python and numpy
+    # are used. Single points of a Function are always evaluated by Python,
+    # which is faster than calling a compiled kernel.
+    jitKernels = False
+
     def __init__(
         self,
         source,
@@ -37,8 +200,10 @@ class Function:
             constant function. If ndarray, its points will be used for
             interpolation. An ndarray should be as [(x0, y0, z0), (x1, y1, z1),
             (x2, y2, z2), ...] where x0 and y0 are inputs and z0 is output. If
-            string, imports file named by the string and treats it as csv.
-            The file is converted into ndarray and should not have headers.
+            string, imports file named by the string and treats it as csv,
+            unless it ends with .npy, in which case it is loaded as a binary
+            numpy array. The file is converted into ndarray. See
+            Function.sourceCacheDirectory to cache csv files as binary files.
         inputs : string, sequence of strings, optional
             The name of the inputs of the function. Will be used for
             representation and graphing (axis names). 'Scalar' is default.
@@ -50,8 +215,11 @@ class Function:
         interpolation : string, optional
             Interpolation method to be used if source type is ndarray.
             For 1-D functions, linear, polynomial, akima and spline are
-            supported. For N-D functions, only shepard is supported.
-            Default for 1-D functions is spline.
+            supported. For N-D functions, shepard is supported. If the points
+            of an N-D function form a rectilinear grid, linear (multilinear)
+            and spline (tensor product cubic spline) are also supported.
+            Default for 1-D functions is spline and for N-D functions is
+            shepard.
         extrapolation : string, optional
             Extrapolation method to be used if source type is ndarray.
             Options are 'natural', which keeps interpolation, 'constant',
@@ -71,6 +239,9 @@ class Function:
         self.__extrapolation__ = extrapolation
         # Initialize last_interval
         self.last_interval = 0
+        # Shepard interpolation uses all points by default
+        self.__shepardNeighbors__ = None
+        self.__shepardRadius__ = None
         # Set source
         self.setSource(source)
         # Return
@@ -121,8 +292,10 @@ class Function:
             constant function. If ndarray, its points will be used for
             interpolation. An ndarray should be as [(x0, y0, z0), (x1, y1, z1),
             (x2, y2, z2), ...] where x0 and y0 are inputs and z0 is output. If
-            string, imports file named by the string and treats it as csv.
-            The file is converted into ndarray and should not have headers.
+            string, imports file named by the string and treats it as csv,
+            unless it ends with .npy, in which case it is loaded as a binary
+            numpy array. The file is converted into ndarray. See
+            Function.sourceCacheDirectory to cache csv files as binary files.
 
         Returns
         -------
@@ -130,20 +303,7 @@ class Function:
         """
         # Import CSV if source is a string and convert values to ndarray
         if isinstance(source, str):
-            # Read file and check for headers
-            f = open(source, "r")
-            firstLine = f.readline()
-            # If headers are found...
-            if firstLine[0] in ['"', "'"]:
-                # Headers available
-                firstLine = firstLine.replace('"', " ").replace("'", " ")
-                firstLine = firstLine.split(" , ")
-                self.setInputs(firstLine[0])
-                self.setOutputs(firstLine[1:])
-                source = np.loadtxt(source, delimiter=",", skiprows=1, dtype=float)
-            # if headers are not found
-            else:
-                source = np.loadtxt(source, delimiter=",", dtype=float)
+            source = self.__loadSource__(source)
         # Convert to ndarray if source is a list
         if isinstance(source, (list, tuple)):
             source = np.array(source, dtype=np.float64)
@@ -158,8 +318,12 @@ class Function:
         if callable(source):
             # Set source
             self.source = source
-            # Set geValueOpt2
-            self.getValueOpt = source
+            # Set geValueOpt2, expressions have a fused scalar evaluator
+            if isinstance(source, FunctionExpression):
+                self.getValueOpt = source.evaluate
+            else:
+                self.getValueOpt = source
+            self.__notifyDependents__()
             # Set arguments name and domain dimensions
             parameters = signature(source).parameters
             self.__domDim__ = len(parameters)
@@ -186,7 +350,11 @@ class Function:
                     return None
             # Do things if domDim is 1
             if self.__domDim__ == 1:
-                source = source[source[:, 0].argsort()]
+                # Sorted memory mapped sources are not copied into memory
+                if not isinstance(source, np.memmap) or np.any(
+                    source[1:, 0] < source[:-1, 0]
+                ):
+                    source = source[source[:, 0].argsort()]
                 # Finally set data source as source
                 self.source = source
                 # Set default interpolation for point source if it hasn't
@@ -201,12 +369,72 @@ class Function:
                 self.source = source
                 if self.__interpolation__ is None:
                     self.setInterpolation("shepard")
+                else:
+                    # Updates grid data if necessary
+                    self.setInterpolation(self.__interpolation__)
             # Update extrapolation method
             if self.__extrapolation__ is None:
                 self.setExtrapolation()
         # Return self
         return self
 
+    def __loadSource__(self, path):
+        """Load the array stored in a CSV or .npy file. If the first line of
+        a CSV file holds headers in quotes, they are set as the inputs and
+        outputs of the Function. If Function.sourceCacheDirectory is set,
+        the values of CSV files are cached as .npy files, keyed on the path,
+        modification time and size of the CSV file, so that they are parsed
+        only once.
+
+        Parameters
+        ----------
+        path : string
+            Path of the file.
+
+        Returns
+        -------
+        source : ndarray
+            Array of floats with one row per data point.
+        """
+        mmapMode = "c" if Function.memoryMapSources else None
+        if path.endswith(".npy"):
+            return np.load(path, mmap_mode=mmapMode)
+        with open(path, "r") as f:
+            # Read file and check for headers
+            firstLine = f.readline()
+            hasHeaders = firstLine[0] in ['"', "'"]
+            # If headers are found...
+            if hasHeaders:
+                # Headers available
+                firstLine = firstLine.replace('"', " ").replace("'", " ")
+                firstLine = firstLine.split(" , ")
+                self.setInputs(firstLine[0])
+                self.setOutputs(firstLine[1:])
+            # Look for a cached copy of the values
+            cachePath = None
+            if Function.sourceCacheDirectory is not None:
+                status = os.stat(f.fileno())
+                key = "{}|{}|{}".format(
+                    os.path.abspath(path), status.st_mtime_ns, status.st_size
+                )
+                cachePath = os.path.join(
+                    Function.sourceCacheDirectory,
+                    hashlib.sha1(key.encode()).hexdigest() + ".npy",
+                )
+                if os.path.exists(cachePath):
+                    return np.load(cachePath, mmap_mode=mmapMode)
+            # Parse values in a single pass, skipping headers if found
+            if not hasHeaders:
+                f.seek(0)
+            source = np.loadtxt(f, delimiter=",", dtype=float, ndmin=2)
+        if cachePath is not None:
+            # Write to a temporary file first, so no process reads it partially
+            os.makedirs(Function.sourceCacheDirectory, exist_ok=True)
+            temporaryPath = "{}.{}.tmp.npy".format(cachePath[:-4], os.getpid())
+            np.save(temporaryPath, source)
+            os.replace(temporaryPath, cachePath)
+        return source
+
     def setInterpolation(self, method="spline"):
         """Set interpolation method and process data is method requires.
 
@@ -215,7 +443,8 @@ class Function:
         method : string, optional
             Interpolation method to be used if source type is ndarray.
             For 1-D functions, linear, polynomial, akima and spline is
-            supported. For N-D functions, only shepard is supported.
+            supported. For N-D functions, shepard is supported, as well as
+            linear and spline if the points form a rectilinear grid.
             Default is 'spline'.
 
         Returns
@@ -225,16 +454,36 @@ class Function:
         # Set interpolation method
         self.__interpolation__ = method
         # Spline, akima and polynomial need data processing
-        # Shepard, and linear do not
-        if method == "spline":
+        # Shepard, and linear do not, unless linear is used on a N-D grid
+        if self.__domDim__ > 1:
+            if method in ["linear", "spline"]:
+                self.__interpolateGrid__()
+            elif method != "shepard":
+                raise ValueError(
+                    "Only shepard, linear and spline interpolation methods are "
+                    "supported for N-D Functions."
+                )
+        elif method == "spline":
             self.__interpolateSpline__()
         elif method == "polynomial":
             self.__interpolatePolynomial__()
         elif method == "akima":
             self.__interpolateAkima__()
+        # Shepard looks for the nearest data points in a KD-tree
+        if method == "shepard":
+            self.__shepardTree__ = spatial.cKDTree(self.source[:, :-1])
 
-        # Set geValueOpt
-        self.setGetValueOpt()
+        # Single precision sources keep single precision coefficients
+        if self.source.dtype == np.float32:
+            self.setDataType(np.float32)
+
+        # Check if intervals can be found without searching the grid
+        self.__detectGridSpacing__()
+
+        # Set geValueOpt, which is built when first called
+        self.__kernelCache__ = None
+        self.getValueOpt = self.__buildGetValueOpt__
+        self.__notifyDependents__()
 
         # Returns self
         return self
@@ -257,9 +506,73 @@ class Function:
         """
         # Set extrapolation method
         self.__extrapolation__ = method
+        # Rebuild getValueOpt with the new extrapolation when first called
+        if isinstance(getattr(self, "source", None), np.ndarray):
+            self.__kernelCache__ = None
+            self.getValueOpt = self.__buildGetValueOpt__
+            self.__notifyDependents__()
         # Return self
         return self
 
+    def setDataType(self, dtype=np.float64):
+        """Set the floating point type in which the source array and the
+        interpolation coefficients of a Function defined by array are
+        stored. Storing them as np.float32 halves their memory, keeping about
+        7 significant digits, which is enough for plots or envelopes.
+        Evaluations still return float64 values.
+
+        Parameters
+        ----------
+        dtype : numpy floating point type, optional
+            Either np.float64, which is default, or np.float32.
+
+        Returns
+        -------
+        self : Function
+        """
+        if callable(self.source):
+            return self
+        self.source = self.source.astype(dtype, copy=False)
+        for name in [
+            "__splineCoefficients__",
+            "__akimaCoefficients__",
+            "__polynomialCoefficients__",
+            "__gridValues__",
+            "__gridDerivatives__",
+        ]:
+            if hasattr(self, name):
+                setattr(self, name, getattr(self, name).astype(dtype, copy=False))
+        if hasattr(self, "__gridAxes__"):
+            self.__gridAxes__ = [axis.astype(dtype) for axis in self.__gridAxes__]
+        self.__kernelCache__ = None
+        self.getValueOpt = self.__buildGetValueOpt__
+        self.__notifyDependents__()
+        return self
+
+    def setShepardNeighbors(self, neighbors=None, radius=None):
+        """Limit the data points used by shepard interpolation to the nearest
+        ones of each evaluation point, which are found through a KD-tree.
+        This makes the evaluation of Functions defined by many scattered
+        points much faster, and the interpolation more local.
+
+        Parameters
+        ----------
+        neighbors : int, optional
+            Maximum number of nearest data points used at each evaluation
+            point. If None, which is default, the number is not limited.
+        radius : float, optional
+            Only data points closer than radius to each evaluation point are
+            used. If none is, the nearest data point value is returned. If
+            None, which is default, the distance is not limited.
+
+        Returns
+        -------
+        self : Function
+        """
+        self.__shepardNeighbors__ = neighbors
+        self.__shepardRadius__ = radius
+        return self
+
     def setGetValueOpt(self):
         """Crates a method that evaluates interpolations rather quickly
         when compared to other options available, such as just calling
@@ -273,7 +586,6 @@ class Function:
         # Retrieve general info
         xData = self.source[:, 0]
         yData = self.source[:, 1]
-        xmin, xmax = xData[0], xData[-1]
         if self.__extrapolation__ == "zero":
             extrapolation = 0  # Extrapolation is zero
         elif self.__extrapolation__ == "natural":
@@ -281,81 +593,103 @@ class Function:
         else:
             extrapolation = 2  # Extrapolation is constant
 
-        # Crete method to interpolate this info for each interpolation type
-        if self.__interpolation__ == "spline":
-            coeffs = self.__splineCoefficients__
+        # N-D Functions defined on rectilinear grids
+        if self.__domDim__ > 1 and self.__interpolation__ in ["linear", "spline"]:
+            axes = [axis.tolist() for axis in self.__gridAxes__]
+            values = self.__gridValues__
+            strides = [stride // values.itemsize for stride in values.strides]
+            if self.__interpolation__ == "linear":
+                tables = [values.ravel().tolist()]
+            else:
+                tables = self.__gridDerivatives__.reshape(2 ** len(axes), -1).tolist()
 
-            def getValueOpt(x):
-                xInterval = np.searchsorted(xData, x)
-                # Interval found... interpolate... or extrapolate
-                if xmin <= x <= xmax:
-                    # Interpolate
-                    xInterval = xInterval if xInterval != 0 else 1
-                    a = coeffs[:, xInterval - 1]
-                    x = x - xData[xInterval - 1]
-                    y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
-                else:
-                    # Extrapolate
-                    if extrapolation == 0:  # Extrapolation == zero
-                        y = 0
-                    elif extrapolation == 1:  # Extrapolation == natural
-                        a = coeffs[:, 0] if x < xmin else coeffs[:, -1]
-                        x = x - xData[0] if x < xmin else x - xData[-2]
-                        y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
-                    else:  # Extrapolation is set to constant
-                        y = yData[0] if x < xmin else yData[-1]
-                return y
+            def getValueOpt(*args):
+                # Each term holds a flat index, a derivative table and a weight
+                terms = [(0, 0, 1)]
+                for k, x in enumerate(args):
+                    axis = axes[k]
+                    if not axis[0] <= x <= axis[-1]:
+                        if extrapolation == 0:  # Extrapolation == zero
+                            return 0
+                        elif extrapolation == 2:  # Extrapolation is constant
+                            x = axis[0] if x < axis[0] else axis[-1]
+                    i = bisect_left(axis, x, 1, len(axis) - 1) - 1
+                    h = axis[i + 1] - axis[i]
+                    t = (x - axis[i]) / h
+                    left, right = i * strides[k], (i + 1) * strides[k]
+                    if len(tables) == 1:
+                        basis = [(left, 0, 1 - t), (right, 0, t)]
+                    else:
+                        # Cubic Hermite basis for values and derivatives
+                        bit = 1 << k
+                        basis = [
+                            (left, 0, (1 + 2 * t) * (1 - t) ** 2),
+                            (right, 0, t * t * (3 - 2 * t)),
+                            (left, bit, h * t * (1 - t) ** 2),
+                            (right, bit, h * t * t * (t - 1)),
+                        ]
+                    terms = [
+                        (index + offset, table + derivative, weight * w)
+                        for index, table, weight in terms
+                        for offset, derivative, w in basis
+                    ]
+                return sum(
+                    weight * tables[table][index] for index, table, weight in terms
+                )
 
             self.getValueOpt = getValueOpt
+            return self
 
-        elif self.__interpolation__ == "linear":
+        # Python lists make scalar indexing and arithmetic much cheaper
+        xList, yList = xData.tolist(), yData.tolist()
+        xmin, xmax = xList[0], xList[-1]
+        lastInterval = len(xList) - 2
+        findInterval = self.__intervalFinder__()
+
+        # Crete method to interpolate this info for each interpolation type
+        if self.__interpolation__ in ["spline", "akima"]:
+            if self.__interpolation__ == "spline":
+                coeffs = self.__splineCoefficients__.tolist()
+            else:
+                coeffs = self.__akimaCoefficients__.tolist()
 
             def getValueOpt(x):
-                xInterval = np.searchsorted(xData, x)
                 # Interval found... interpolate... or extrapolate
                 if xmin <= x <= xmax:
                     # Interpolate
-                    dx = float(xData[xInterval] - xData[xInterval - 1])
-                    dy = float(yData[xInterval] - yData[xInterval - 1])
-                    y = (x - xData[xInterval - 1]) * (dy / dx) + yData[xInterval - 1]
+                    i = findInterval(x)
                 else:
                     # Extrapolate
                     if extrapolation == 0:  # Extrapolation == zero
-                        y = 0
+                        return 0
                     elif extrapolation == 1:  # Extrapolation == natural
-                        xInterval = 1 if x < xmin else -1
-                        dx = float(xData[xInterval] - xData[xInterval - 1])
-                        dy = float(yData[xInterval] - yData[xInterval - 1])
-                        y = (x - xData[xInterval - 1]) * (dy / dx) + yData[
-                            xInterval - 1
-                        ]
+                        i = 0 if x < xmin else lastInterval
                     else:  # Extrapolation is set to constant
-                        y = yData[0] if x < xmin else yData[-1]
-                return y
+                        return yList[0] if x < xmin else yList[-1]
+                a0, a1, a2, a3 = coeffs[i]
+                x = x - xList[i]
+                return ((a3 * x + a2) * x + a1) * x + a0
 
             self.getValueOpt = getValueOpt
 
-        elif self.__interpolation__ == "akima":
-            coeffs = np.array(self.__akimaCoefficients__)
+        elif self.__interpolation__ == "linear":
 
             def getValueOpt(x):
-                xInterval = np.searchsorted(xData, x)
                 # Interval found... interpolate... or extrapolate
                 if xmin <= x <= xmax:
                     # Interpolate
-                    xInterval = xInterval if xInterval != 0 else 1
-                    a = coeffs[4 * xInterval - 4 : 4 * xInterval]
-                    y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
+                    i = findInterval(x)
                 else:
                     # Extrapolate
                     if extrapolation == 0:  # Extrapolation == zero
-                        y = 0
+                        return 0
                     elif extrapolation == 1:  # Extrapolation == natural
-                        a = coeffs[:4] if x < xmin else coeffs[-4:]
-                        y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
+                        i = 0 if x < xmin else lastInterval
                     else:  # Extrapolation is set to constant
-                        y = yData[0] if x < xmin else yData[-1]
-                return y
+                        return yList[0] if x < xmin else yList[-1]
+                dx = xList[i + 1] - xList[i]
+                dy = yList[i + 1] - yList[i]
+                return (x - xList[i]) * (dy / dx) + yList[i]
 
             self.getValueOpt = getValueOpt
 
@@ -384,31 +718,89 @@ class Function:
             self.getValueOpt = getValueOpt
 
         elif self.__interpolation__ == "shepard":
-            xData = self.source[:, 0:-1]  # Support for N-Dimensions
-            len_yData = len(yData)  # A little speed up
 
             def getValueOpt(*args):
-                x = np.array([[float(x) for x in list(args)]])
-                numeratorSum = 0
-                denominatorSum = 0
-                for i in range(len_yData):
-                    sub = xData[i] - x
-                    distance = np.linalg.norm(sub)
-                    if distance == 0:
-                        numeratorSum = yData[i]
-                        denominatorSum = 1
-                        break
-                    else:
-                        weight = distance ** (-3)
-                        numeratorSum = numeratorSum + yData[i] * weight
-                        denominatorSum = denominatorSum + weight
-                return numeratorSum / denominatorSum
+                return self.__getValueShepard__(np.array([args], dtype=np.float64))[0]
 
             self.getValueOpt = getValueOpt
 
         # Returns self
         return self
 
+    def __buildGetValueOpt__(self, *args):
+        """Build Function.getValueOpt, see Function.setGetValueOpt, and
+        evaluate it. It takes the place of getValueOpt until it is first
+        called, since the Python lists held by getValueOpt take much more
+        memory than the source array, and many Functions are only evaluated
+        at arrays of points."""
+        if self.getValueOpt == self.__buildGetValueOpt__:
+            self.setGetValueOpt()
+        return self.getValueOpt(*args)
+
+    def __notifyDependents__(self):
+        """Tell the FunctionSets which hold this Function that it has
+        changed, so that they build their tables again, see FunctionSet."""
+        for reference in getattr(self, "__dependents__", []):
+            functionSet = reference()
+            if functionSet is not None:
+                functionSet.__invalidate__()
+
+    def __intervalFinder__(self):
+        """Create a function which finds the interval of the source grid of
+        a 1-D Function in which a scalar lies. Given x inside the domain, it
+        returns index i such that x[i] <= x <= x[i + 1]. It is used by the
+        getValueOpt methods and keeps its own last interval cache.
+
+        Returns
+        -------
+        findInterval : function
+        """
+        xList = self.source[:, 0].tolist()
+        xmin = xList[0]
+        lastInterval = len(xList) - 2
+        # Interval of the last query, used as a hint for the next one
+        hint = [0]
+        # Uniform and log-uniform grids allow intervals to be computed
+        gridSpacing, gridStep = self.__gridSpacing__, self.__gridStep__
+        logXmin = math.log(xmin) if gridSpacing == "logarithmic" else 0
+
+        def findUniformInterval(x):
+            """Return index i such that xList[i] <= x <= xList[i + 1], for x
+            inside the domain, computed directly from the grid step. The index
+            is corrected by one if round off put x in a neighbor interval."""
+            if gridSpacing == "uniform":
+                i = int((x - xmin) / gridStep)
+            else:
+                i = int((math.log(x) - logXmin) / gridStep)
+            if i > lastInterval:
+                i = lastInterval
+            if x < xList[i]:
+                i -= 1
+            elif x > xList[i + 1]:
+                i += 1
+            return i
+
+        def findInterval(x):
+            """Return index i such that xList[i] <= x <= xList[i + 1], for x
+            inside the domain. The interval of the previous query and its
+            neighbors are tried first. If they fail, a binary search is done
+            only on the side of the hint where x lies."""
+            i = hint[0]
+            if x < xList[i]:
+                if i > 0 and xList[i - 1] <= x:
+                    i -= 1
+                else:
+                    i = max(bisect_left(xList, x, 0, i) - 1, 0)
+            elif x > xList[i + 1]:
+                if i < lastInterval and x <= xList[i + 2]:
+                    i += 1
+                else:
+                    i = bisect_left(xList, x, i + 2, lastInterval + 2) - 1
+            hint[0] = i
+            return i
+
+        return findInterval if gridSpacing is None else findUniformInterval
+
     def setDiscrete(
         self,
         lower=0,
@@ -435,8 +827,8 @@ class Function:
         interpolation : string
             Interpolation method to be used if source type is ndarray.
             For 1-D functions, linear, polynomial, akima and spline is
-            supported. For N-D functions, only shepard is supported.
-            Default is 'spline'.
+            supported. For 2-D functions, sampled on a grid, shepard, linear
+            and spline are supported. Default is 'spline'.
         extrapolation : string, optional
             Extrapolation method to be used if source type is ndarray.
             Options are 'natural', which keeps interpolation, 'constant',
@@ -470,7 +862,273 @@ class Function:
             # Evaluate function at all mesh nodes and convert it to matrix
             Zs = np.array(self.getValue(mesh))
             self.source = np.concatenate(([Xs], [Ys], [Zs])).transpose()
-            self.__interpolation__ = "shepard"
+            self.setExtrapolation(extrapolation)
+            self.setInterpolation(interpolation)
+        return self
+
+    def setDiscreteAdaptive(
+        self,
+        lower=0,
+        upper=10,
+        atol=1e-6,
+        rtol=1e-6,
+        interpolation="spline",
+        extrapolation="constant",
+        samples=9,
+        maxSamples=10000,
+        oneByOne=True,
+    ):
+        """Transform a 1-D Function defined by a callable into a Function
+        defined by array, sampling the callable at points which are placed
+        adaptively, so that the interpolation error stays below a tolerance
+        with as few points as possible. Sampling starts with a uniform grid.
+        Then, every interval in which the interpolation at the midpoint
+        differs from the callable by more than atol + rtol * abs(value) is
+        split at its midpoint, until no interval needs to be split or the
+        maximum number of samples is reached. The original Function object
+        is replaced by the new one.
+
+        Parameters
+        ----------
+        lower : scalar, optional
+            Value where sampling range will start. Default is 0.
+        upper : scalar, optional
+            Value where sampling range will end. Default is 10.
+        atol : float, optional
+            Absolute tolerance of the interpolation error. Default is 1e-6.
+        rtol : float, optional
+            Relative tolerance of the interpolation error. Default is 1e-6.
+        interpolation : string, optional
+            Interpolation method to be used. Linear, akima and spline are
+            supported. Default is 'spline'.
+        extrapolation : string, optional
+            Extrapolation method to be used. Options are 'natural', which
+            keeps interpolation, 'constant', which returns the value of the
+            function at the edge of the interval, and 'zero', which returns
+            zero for all points outside of source range. Default is
+            'constant'.
+        samples : int, optional
+            Number of samples of the initial uniform grid. Default is 9.
+        maxSamples : int, optional
+            Maximum number of samples. Refinement stops once it is reached,
+            even if the tolerance is not met. Default is 10000.
+        oneByOne : boolean, optional
+            If True, evaluate Function in each sample point separately. If
+            False, evaluates Function in vectorized form. Default is True.
+
+        Returns
+        -------
+        self : Function
+        """
+        if self.__domDim__ != 1 or not callable(self.source):
+            raise ValueError(
+                "Adaptive sampling is only available for 1-D Functions "
+                "defined by callables."
+            )
+
+        def evaluate(x):
+            y = self.getValue(x.tolist()) if oneByOne else self.getValue(x)
+            return np.array(y, dtype=np.float64).reshape(x.shape)
+
+        Xs = np.linspace(lower, upper, samples)
+        Ys = evaluate(Xs)
+        # Intervals which have not been checked against the tolerance yet
+        unchecked = np.ones(len(Xs) - 1, dtype=bool)
+        while len(Xs) < maxSamples:
+            table = Function(np.column_stack((Xs, Ys)), interpolation=interpolation)
+            midXs = (Xs[:-1][unchecked] + Xs[1:][unchecked]) / 2
+            midYs = evaluate(midXs)
+            error = np.abs(table.getValue(midXs) - midYs)
+            split = np.flatnonzero(error > atol + rtol * np.abs(midYs))
+            if len(split) == 0:
+                if np.all(unchecked):
+                    break
+                # Splines change globally as points are added, so all
+                # intervals are checked again before finishing
+                unchecked = np.ones(len(Xs) - 1, dtype=bool)
+                continue
+            # Add the midpoints of the intervals which need to be split
+            split = split[: maxSamples - len(Xs)]
+            isNew = np.repeat([False, True], [len(Xs), len(split)])
+            order = np.argsort(np.concatenate((Xs, midXs[split])), kind="stable")
+            Xs = np.concatenate((Xs, midXs[split]))[order]
+            Ys = np.concatenate((Ys, midYs[split]))[order]
+            # Only the halves of the intervals which were split are checked
+            isNew = isNew[order]
+            unchecked = isNew[:-1] | isNew[1:]
+        self.source = np.column_stack((Xs, Ys))
+        self.setExtrapolation(extrapolation)
+        self.setInterpolation(interpolation)
+        return self
+
+    def append(self, points):
+        """Append points to the end of a 1-D Function defined by an array,
+        such as samples of a growing time series. The source array and the
+        interpolation coefficients are kept in buffers whose capacity doubles
+        when full, and only the coefficients of the last intervals are
+        recalculated: one for linear, two for akima and
+        Function.appendSplineWindow for spline interpolation, which matches
+        the natural spline of all points up to round off. Appending a point
+        therefore takes amortized constant time, except for polynomial
+        interpolation, which is recalculated.
+
+        Parameters
+        ----------
+        points : list, ndarray
+            Point (x, y), or list of points, to be appended. Their x values
+            must be increasing and larger than the last one of the source.
+
+        Returns
+        -------
+        self : Function
+        """
+        if callable(self.source) or self.__domDim__ != 1:
+            raise ValueError("Points can only be appended to 1-D array sources.")
+        points = np.array(points, dtype=np.float64, ndmin=2)
+        xData = np.concatenate(([self.source[-1, 0]], points[:, 0]))
+        if points.shape[1] != 2 or not np.all(np.diff(xData) > 0):
+            raise ValueError(
+                "Appended points must be (x, y) pairs, with x increasing "
+                "from the last point of the source."
+            )
+        n = len(self.source)
+        if not hasattr(self, "__appendBuffers__"):
+            self.__appendBuffers__ = {}
+        buffers = self.__appendBuffers__
+        growArray(self, "source", buffers, len(points))[n:] = points
+        if self.__interpolation__ == "spline":
+            growArray(self, "__splineCoefficients__", buffers, len(points))
+            self.__interpolateSpline__(max(n - 2 - self.appendSplineWindow, 0))
+        elif self.__interpolation__ == "akima":
+            growArray(self, "__akimaCoefficients__", buffers, len(points))
+            self.__interpolateAkima__(max(n - 2, 0))
+        elif self.__interpolation__ == "polynomial":
+            self.__interpolatePolynomial__()
+        # Check if appended points keep the grid spacing
+        if self.__gridSpacing__ is None:
+            if n < 3:
+                self.__detectGridSpacing__()
+        else:
+            # Appended points must lie on the grid of the previous ones
+            xData = self.source[:, 0]
+            if self.__gridSpacing__ == "logarithmic":
+                xData = np.log(xData)
+            step = self.__gridStep__
+            grid = xData[0] + np.arange(n, len(xData)) * step
+            if not np.all(np.abs(xData[n:] - grid) <= 1e-6 * step):
+                self.__gridSpacing__, self.__gridStep__ = None, None
+        self.__kernelCache__ = None
+        self.getValueOpt = self.__buildGetValueOpt__
+        self.__notifyDependents__()
+        return self
+
+    def simplify(self, atol=1e-6, rtol=1e-6):
+        """Return a Function defined by a subset of the data points of a 1-D
+        Function defined by an array, as small as possible, which differs
+        from it by less than atol + rtol * abs(value), plus the round off of
+        the interpolation relative to its largest value. It starts with the
+        first and last points only, and repeatedly inserts, in every interval
+        in which the error is too large, the data point where it is largest,
+        which is Douglas-Peucker simplification for linear interpolation.
+        The error is checked at all data points, which bounds it everywhere
+        for linear interpolation, and also at the midpoints between them for
+        spline and akima interpolation. The result keeps the interpolation
+        and extrapolation methods.
+
+        Parameters
+        ----------
+        atol : float, optional
+            Absolute tolerance of the error. Default is 1e-6.
+        rtol : float, optional
+            Relative tolerance of the error. Default is 1e-6.
+
+        Returns
+        -------
+        result : Function
+            Simplified Function, defined by array.
+        """
+        if callable(self.source) or self.__interpolation__ not in [
+            "spline",
+            "akima",
+            "linear",
+        ]:
+            raise ValueError(
+                "Only 1-D Functions defined by arrays and interpolated by "
+                "spline, akima or linear methods can be simplified."
+            )
+        xData = self.source[:, 0]
+        n = len(xData)
+        # Points where the error is checked, and the data point which is
+        # inserted if the error there is too large
+        if self.__interpolation__ == "linear":
+            checkXs = xData
+            candidates = np.arange(n)
+            midpoints = np.zeros(n, dtype=bool)
+        else:
+            checkXs = np.empty(2 * n - 1)
+            checkXs[0::2] = xData
+            checkXs[1::2] = (xData[:-1] + xData[1:]) / 2
+            candidates = (np.arange(2 * n - 1) + 1) // 2
+            midpoints = np.arange(2 * n - 1) % 2 == 1
+        checkYs = self.getValue(checkXs)
+        # Round off of the interpolation is always allowed, so that zero
+        # tolerances still drop points which are exactly interpolated
+        roundOff = 16 * np.finfo(np.float64).eps * np.max(np.abs(checkYs))
+        allowed = atol + rtol * np.abs(checkYs) + roundOff
+        kept = np.zeros(n, dtype=bool)
+        kept[[0, -1]] = True
+        while True:
+            table = Function(self.source[kept], interpolation=self.__interpolation__)
+            excess = np.abs(table.getValue(checkXs) - checkYs) - allowed
+            # Midpoints next to a kept point insert their other neighbor
+            points = candidates - (kept[candidates] & midpoints)
+            excess[kept[points]] = -np.inf
+            # Largest error of each interval between kept points
+            intervals = np.searchsorted(np.flatnonzero(kept), points)
+            order = np.lexsort((excess, intervals))
+            largest = order[np.append(np.diff(intervals[order]) != 0, True)]
+            largest = largest[excess[largest] > 0]
+            if len(largest) == 0:
+                break
+            kept[points[largest]] = True
+        return Function(
+            self.source[kept],
+            self.__inputs__,
+            self.__outputs__,
+            self.__interpolation__,
+            self.__extrapolation__,
+        )
+
+    def __detectGridSpacing__(self):
+        """Check if the x values of a 1-D source are uniformly or
+        logarithmically spaced. If so, the interval in which any point lies
+        can be calculated directly, instead of searched for. The result is
+        stored in Function.__gridSpacing__, which is 'uniform',
+        'logarithmic' or None, and Function.__gridStep__, which is the
+        spacing of x or of log(x).
+
+        Returns
+        -------
+        self : Function
+        """
+        self.__gridSpacing__, self.__gridStep__ = None, None
+        if self.__domDim__ != 1 or len(self.source) < 3:
+            return self
+        xData = self.source[:, 0]
+        indexes = np.arange(len(xData))
+        # Points may differ slightly from the grid due to round off in its
+        # construction. The deviation of each point, not of each step, is
+        # bounded, so that computed intervals are off by at most one.
+        step = (xData[-1] - xData[0]) / (len(xData) - 1)
+        grid = xData[0] + indexes * step
+        if step > 0 and np.all(np.abs(xData - grid) <= 1e-6 * step):
+            self.__gridSpacing__, self.__gridStep__ = "uniform", float(step)
+        elif xData[0] > 0:
+            logXData = np.log(xData)
+            step = (logXData[-1] - logXData[0]) / (len(xData) - 1)
+            grid = logXData[0] + indexes * step
+            if step > 0 and np.all(np.abs(logXData - grid) <= 1e-6 * step):
+                self.__gridSpacing__, self.__gridStep__ = "logarithmic", float(step)
         return self
 
     # Define all get methods
@@ -532,32 +1190,32 @@ class Function:
                 return self.source(args[0])
             else:
                 return self.source(*args)
-        # Returns value for shepard interpolation
-        elif self.__interpolation__ == "shepard":
-            if isinstance(args[0], (list, tuple)):
-                x = list(args[0])
+        # Returns value for shepard interpolation and N-D Functions defined
+        # on rectilinear grids
+        elif self.__interpolation__ == "shepard" or self.__domDim__ > 1:
+            if len(args) == 1:
+                # A point or a sequence of points
+                points = np.asarray(args[0], dtype=np.float64)
+                isArray = isinstance(args[0], np.ndarray)
+                if self.__domDim__ == 1:
+                    points = points[..., np.newaxis]
             else:
-                x = [[float(x) for x in list(args)]]
-            ans = x
-            xData = self.source[:, 0:-1]
-            yData = self.source[:, -1]
-            for i in range(len(x)):
-                numeratorSum = 0
-                denominatorSum = 0
-                for o in range(len(yData)):
-                    sub = xData[o] - x[i]
-                    distance = (sub.dot(sub)) ** (0.5)
-                    # print(xData[o], x[i], distance)
-                    if distance == 0:
-                        numeratorSum = yData[o]
-                        denominatorSum = 1
-                        break
-                    else:
-                        weight = distance ** (-3)
-                        numeratorSum = numeratorSum + yData[o] * weight
-                        denominatorSum = denominatorSum + weight
-                ans[i] = numeratorSum / denominatorSum
-            return ans if len(ans) > 1 else ans[0]
+                # One scalar or array per input
+                points = np.stack(np.broadcast_arrays(*args), axis=-1)
+                points = points.astype(np.float64)
+                isArray = any(isinstance(arg, np.ndarray) for arg in args)
+            if self.__interpolation__ == "shepard":
+                ans = self.__getValueShepard__(points.reshape(-1, self.__domDim__))
+            else:
+                ans = self.__getValueGrid__(points.reshape(-1, self.__domDim__))
+            ans = ans.reshape(points.shape[:-1])
+            if isArray:
+                return ans
+            elif ans.ndim == 0:
+                return ans[()]
+            else:
+                ans = ans.tolist()
+                return ans if len(ans) > 1 else ans[0]
         # Returns value for polynomial interpolation function type
         elif self.__interpolation__ == "polynomial":
             if isinstance(args[0], (int, float)):
@@ -580,77 +1238,250 @@ class Function:
             return ans if len(ans) > 1 else ans[0]
         # Returns value for spline, akima or linear interpolation function type
         elif self.__interpolation__ in ["spline", "akima", "linear"]:
-            if isinstance(args[0], (int, float, complex)):
-                args = [list(args)]
-            x = [arg for arg in args[0]]
-            xData = self.source[:, 0]
-            yData = self.source[:, 1]
+            x = args[0]
+            points = np.asarray(x)
+            points = points.astype(np.result_type(points, float), copy=False)
+            ans = self.__getValueArray__(points)
+            if isinstance(x, np.ndarray):
+                return ans
+            elif np.ndim(x) == 0:
+                return ans[()]
+            else:
+                ans = ans.tolist()
+                return ans if len(ans) > 1 else ans[0]
+
+    def __findIntervals__(self, x):
+        """Find the intervals of the source grid of a 1-D Function in which
+        each point of array x lies. Points outside the domain are assigned
+        to the first or last interval.
+
+        Parameters
+        ----------
+        x : ndarray
+            Array of floats of any shape. Complex points are located by their
+            real part.
+
+        Returns
+        -------
+        xIntervals : ndarray
+            Array of ints with the same shape as x, such that
+            xData[xIntervals] <= x <= xData[xIntervals + 1] inside the domain.
+        """
+        x = np.real(x)
+        xData = self.source[:, 0]
+        xmin = xData[0]
+        if self.__gridSpacing__ is None:
             xIntervals = np.searchsorted(xData, x)
-            xmin, xmax = xData[0], xData[-1]
+            xIntervals = np.clip(xIntervals, 1, len(xData) - 1) - 1
+        else:
+            if self.__gridSpacing__ == "uniform":
+                xIntervals = (x - xmin) / self.__gridStep__
+            else:
+                xIntervals = np.log(np.fmax(x, xmin) / xmin) / self.__gridStep__
+            lastInterval = len(xData) - 2
+            xIntervals = np.fmax(np.fmin(np.floor(xIntervals), lastInterval), 0)
+            xIntervals = xIntervals.astype(int)
+            # Correct intervals shifted by round off
+            xIntervals -= (x < xData[xIntervals]) & (xIntervals > 0)
+            xIntervals += (x > xData[xIntervals + 1]) & (xIntervals < lastInterval)
+        return xIntervals
+
+    def __getValueArray__(self, x):
+        """Evaluate a 1-D Function interpolated by spline, akima or linear
+        methods at all points of an array at once. The interval of every point
+        is found with a single search over the data, the coefficients of all
+        intervals are gathered at once and extrapolation is applied through
+        masks, so that no Python code runs per element.
+
+        Parameters
+        ----------
+        x : ndarray
+            Array of floats or complex numbers where the Function is to be
+            evaluated. May have any shape, including 0-D.
+
+        Returns
+        -------
+        y : ndarray
+            Array with the same shape as x holding the Function values.
+        """
+        if self.__useKernels__() and not np.iscomplexobj(x):
+            points = x.reshape(-1)
+            y = np.empty((len(points), 1))
+            evaluateCubicTable(points, *self.__kernelArguments__(), y)
+            return y.reshape(x.shape)
+        xData = self.source[:, 0]
+        yData = self.source[:, 1]
+        xmin, xmax = xData[0], xData[-1]
+        # Find intervals, points outside the domain use the edge intervals
+        xIntervals = self.__findIntervals__(x)
+        # Interpolate using the coefficients of each interval
+        if self.__interpolation__ == "linear":
+            xl, yl = xData[xIntervals], yData[xIntervals]
+            slope = (yData[xIntervals + 1] - yl) / (xData[xIntervals + 1] - xl)
+            y = (x - xl) * slope + yl
+        else:
             if self.__interpolation__ == "spline":
-                coeffs = self.__splineCoefficients__
-                for i in range(len(x)):
-                    if x[i] == xmin or x[i] == xmax:
-                        x[i] = yData[xIntervals[i]]
-                    elif xmin < x[i] < xmax or (self.__extrapolation__ == "natural"):
-                        if not xmin < x[i] < xmax:
-                            a = coeffs[:, 0] if x[i] < xmin else coeffs[:, -1]
-                            x[i] = x[i] - xData[0] if x[i] < xmin else x[i] - xData[-2]
-                        else:
-                            a = coeffs[:, xIntervals[i] - 1]
-                            x[i] = x[i] - xData[xIntervals[i] - 1]
-                        x[i] = a[3] * x[i] ** 3 + a[2] * x[i] ** 2 + a[1] * x[i] + a[0]
-                    else:
-                        # Extrapolate
-                        if self.__extrapolation__ == "zero":
-                            x[i] = 0
-                        else:  # Extrapolation is set to constant
-                            x[i] = yData[0] if x[i] < xmin else yData[-1]
-            elif self.__interpolation__ == "linear":
-                for i in range(len(x)):
-                    # Interval found... interpolate... or extrapolate
-                    inter = xIntervals[i]
-                    if xmin <= x[i] <= xmax:
-                        # Interpolate
-                        dx = float(xData[inter] - xData[inter - 1])
-                        dy = float(yData[inter] - yData[inter - 1])
-                        x[i] = (x[i] - xData[inter - 1]) * (dy / dx) + yData[inter - 1]
-                    else:
-                        # Extrapolate
-                        if self.__extrapolation__ == "zero":  # Extrapolation == zero
-                            x[i] = 0
-                        elif (
-                            self.__extrapolation__ == "natural"
-                        ):  # Extrapolation == natural
-                            inter = 1 if x[i] < xmin else -1
-                            dx = float(xData[inter] - xData[inter - 1])
-                            dy = float(yData[inter] - yData[inter - 1])
-                            x[i] = (x[i] - xData[inter - 1]) * (dy / dx) + yData[
-                                inter - 1
-                            ]
-                        else:  # Extrapolation is set to constant
-                            x[i] = yData[0] if x[i] < xmin else yData[-1]
+                a = self.__splineCoefficients__[xIntervals].T
             else:
-                coeffs = self.__akimaCoefficients__
-                for i in range(len(x)):
-                    if x[i] == xmin or x[i] == xmax:
-                        x[i] = yData[xIntervals[i]]
-                    elif xmin < x[i] < xmax or (self.__extrapolation__ == "natural"):
-                        if not (xmin < x[i] < xmax):
-                            a = coeffs[:4] if x[i] < xmin else coeffs[-4:]
-                        else:
-                            a = coeffs[4 * xIntervals[i] - 4 : 4 * xIntervals[i]]
-                        x[i] = a[3] * x[i] ** 3 + a[2] * x[i] ** 2 + a[1] * x[i] + a[0]
-                    else:
-                        # Extrapolate
-                        if self.__extrapolation__ == "zero":
-                            x[i] = 0
-                        else:  # Extrapolation is set to constant
-                            x[i] = yData[0] if x[i] < xmin else yData[-1]
-            if isinstance(args[0], np.ndarray):
-                return np.array(x)
+                a = self.__akimaCoefficients__[xIntervals].T
+            dx = x - xData[xIntervals]
+            y = ((a[3] * dx + a[2]) * dx + a[1]) * dx + a[0]
+            y = np.where(x == xmax, yData[-1], y)
+        # Extrapolate, natural extrapolation keeps the edge polynomials
+        if self.__extrapolation__ == "zero":
+            y = np.where((x < xmin) | (x > xmax), 0, y)
+        elif self.__extrapolation__ != "natural":
+            y = np.where(x < xmin, yData[0], y)
+            y = np.where(x > xmax, yData[-1], y)
+        return y
+
+    def __useKernels__(self):
+        """Check if the Function is evaluated by the compiled kernels, see
+        Function.jitKernels."""
+        return (
+            self.jitKernels
+            and has_numba
+            and self.__domDim__ == 1
+            and isinstance(self.source, np.ndarray)
+            and self.__interpolation__ in ["spline", "akima", "linear"]
+        )
+
+    def __kernelArguments__(self):
+        """Return the data arguments of evaluateCubicTablePoint and
+        evaluateCubicTable for a single column Function. They are built once
+        and cached until the data or methods of the Function change."""
+        if getattr(self, "__kernelCache__", None) is None:
+            xData = np.ascontiguousarray(self.source[:, 0], dtype=np.float64)
+            yData = self.source[:, 1].astype(np.float64)
+            coeffs = self.__cubicCoefficients__().astype(np.float64)
+            extrapolation = {"zero": 0, "natural": 1}.get(self.__extrapolation__, 2)
+            self.__kernelCache__ = (
+                xData,
+                coeffs.reshape(-1, 1, 4),
+                np.array([extrapolation]),
+                yData[:1],
+                yData[-1:],
+            )
+        return self.__kernelCache__
+
+    def __getValueGrid__(self, points):
+        """Evaluate a N-D Function defined on a rectilinear grid, interpolated
+        by linear or spline methods, at many points at once. Each input is
+        located in its grid axis with a single search, and the result is
+        accumulated over the corners of the grid cell of each point.
+
+        Parameters
+        ----------
+        points : ndarray
+            Array of floats of shape (m, N), where N is the domain dimension.
+
+        Returns
+        -------
+        y : ndarray
+            Array of shape (m,) holding the Function values.
+        """
+        if self.__interpolation__ == "linear":
+            tables = self.__gridValues__[np.newaxis]
+        else:
+            tables = self.__gridDerivatives__
+        outside = np.zeros(len(points), dtype=bool)
+        bases = []
+        for k, axis in enumerate(self.__gridAxes__):
+            x = points[:, k]
+            outside |= (x < axis[0]) | (x > axis[-1])
+            if self.__extrapolation__ not in ["natural", "zero"]:
+                x = np.clip(x, axis[0], axis[-1])
+            i = np.clip(np.searchsorted(axis, x), 1, len(axis) - 1) - 1
+            h = axis[i + 1] - axis[i]
+            t = (x - axis[i]) / h
+            if self.__interpolation__ == "linear":
+                bases.append([(i, 0, 1 - t), (i + 1, 0, t)])
             else:
-                return x if len(x) > 1 else x[0]
+                # Cubic Hermite basis for values and derivatives
+                bit = 1 << k
+                bases.append(
+                    [
+                        (i, 0, (1 + 2 * t) * (1 - t) ** 2),
+                        (i + 1, 0, t * t * (3 - 2 * t)),
+                        (i, bit, h * t * (1 - t) ** 2),
+                        (i + 1, bit, h * t * t * (t - 1)),
+                    ]
+                )
+        # Sum the contributions of every corner of the grid cells
+        y = np.zeros(len(points))
+        for terms in product(*bases):
+            index = tuple(term[0] for term in terms)
+            table = sum(term[1] for term in terms)
+            weight = np.prod([term[2] for term in terms], axis=0)
+            y += weight * tables[table][index]
+        if self.__extrapolation__ == "zero":
+            y[outside] = 0
+        return y
+
+    def __getValueShepard__(self, points):
+        """Evaluate a Function interpolated by the shepard method at many
+        points at once. The value at each point is the average of the data
+        values weighted by the inverse of the cube of their distances to the
+        point. If the number of neighbors or a radius were set, only the
+        nearest data points, found through a KD-tree, are used. See
+        Function.setShepardNeighbors.
+
+        Parameters
+        ----------
+        points : ndarray
+            Array of floats of shape (m, N), where N is the domain dimension.
+
+        Returns
+        -------
+        y : ndarray
+            Array of shape (m,) holding the Function values.
+        """
+        xData = self.source[:, :-1]
+        # Data values padded with a zero, the index of missing neighbors
+        yData = np.append(self.source[:, -1], 0)
+        neighbors, radius = self.__shepardNeighbors__, self.__shepardRadius__
+        if neighbors is None and radius is None:
+            # Use all data points, in chunks to limit memory usage
+            y = np.empty(len(points))
+            chunk = max(1, 2**20 // len(xData))
+            for start in range(0, len(points), chunk):
+                sub = points[start : start + chunk, np.newaxis, :] - xData
+                distances = np.sqrt(np.einsum("ijk,ijk->ij", sub, sub))
+                indexes = np.broadcast_to(np.arange(len(xData)), distances.shape)
+                y[start : start + chunk] = Function.__shepardAverage__(
+                    distances, indexes, yData
+                )
+            return y
+        tree = self.__shepardTree__
+        if neighbors is None:
+            # Query as many neighbors as the most crowded ball holds
+            counts = tree.query_ball_point(points, radius, return_length=True)
+            neighbors = max(1, np.max(counts, initial=0))
+        neighbors = min(neighbors, len(xData))
+        distances, indexes = tree.query(
+            points,
+            k=range(1, neighbors + 1),
+            distance_upper_bound=np.inf if radius is None else radius,
+        )
+        y = Function.__shepardAverage__(distances, indexes, yData)
+        # Points with no data point within radius use the nearest one
+        empty = np.isinf(distances[:, 0])
+        if np.any(empty):
+            y[empty] = yData[tree.query(points[empty])[1]]
+        return y
+
+    @staticmethod
+    def __shepardAverage__(distances, indexes, yData):
+        """Average data values weighted by inverse cubed distances. Each row
+        of distances and indexes refers to one evaluation point. Points which
+        coincide with a data point take its value."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.where(distances > 0, distances ** (-3.0), 0)
+            y = np.sum(weights * yData[indexes], axis=1) / np.sum(weights, axis=1)
+        nearest = np.argmin(distances, axis=1)
+        rows = np.arange(len(distances))
+        exact = distances[rows, nearest] == 0
+        return np.where(exact, yData[indexes[rows, nearest]], y)
 
     def getValueOpt_deprecated(self, *args):
         """THE CODE BELOW IS HERE FOR DOCUMENTATION PURPOSES ONLY. IT WAS
@@ -704,7 +1535,7 @@ class Function:
             if xmin <= x <= xmax:
                 # Interpolate
                 xInterval = xInterval if xInterval != 0 else 1
-                a = coeffs[:, xInterval - 1]
+                a = coeffs[xInterval - 1]
                 x = x - xData[xInterval - 1]
                 y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
             else:
@@ -712,7 +1543,7 @@ class Function:
                 if extrapolation == 0:  # Extrapolation == zero
                     y = 0
                 elif extrapolation == 1:  # Extrapolation == natural
-                    a = coeffs[:, 0] if x < xmin else coeffs[:, -1]
+                    a = coeffs[0] if x < xmin else coeffs[-1]
                     x = x - xData[0] if x < xmin else x - xData[-2]
                     y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
                 else:  # Extrapolation is set to constant
@@ -743,20 +1574,22 @@ class Function:
         # Akima
         elif self.__interpolation__ == "akima":
             x = args[0]
-            coeffs = np.array(self.__akimaCoefficients__)
+            coeffs = self.__akimaCoefficients__
             xInterval = np.searchsorted(xData, x)
             # Interval found... interpolate... or extrapolate
             if xmin <= x <= xmax:
                 # Interpolate
                 xInterval = xInterval if xInterval != 0 else 1
-                a = coeffs[4 * xInterval - 4 : 4 * xInterval]
+                a = coeffs[xInterval - 1]
+                x = x - xData[xInterval - 1]
                 y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
             else:
                 # Extrapolate
                 if extrapolation == 0:  # Extrapolation == zero
                     y = 0
                 elif extrapolation == 1:  # Extrapolation == natural
-                    a = coeffs[:4] if x < xmin else coeffs[-4:]
+                    a = coeffs[0] if x < xmin else coeffs[-1]
+                    x = x - xData[0] if x < xmin else x - xData[-2]
                     y = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
                 else:  # Extrapolation is set to constant
                     y = yData[0] if x < xmin else yData[-1]
@@ -851,10 +1684,10 @@ class Function:
                     x = yData[xInterval]
                 elif xmin < x < xmax or (self.__extrapolation__ == "natural"):
                     if not xmin < x < xmax:
-                        a = coeffs[:, 0] if x < xmin else coeffs[:, -1]
+                        a = coeffs[0] if x < xmin else coeffs[-1]
                         x = x - xData[0] if x < xmin else x - xData[-2]
                     else:
-                        a = coeffs[:, xInterval - 1]
+                        a = coeffs[xInterval - 1]
                         x = x - xData[xInterval - 1]
                     x = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
                 else:
@@ -888,10 +1721,12 @@ class Function:
                 if x == xmin or x == xmax:
                     x = yData[xInterval]
                 elif xmin < x < xmax:
-                    a = coeffs[4 * xInterval - 4 : 4 * xInterval]
+                    a = coeffs[xInterval - 1]
+                    x = x - xData[xInterval - 1]
                     x = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
                 elif self.__extrapolation__ == "natural":
-                    a = coeffs[:4] if x < xmin else coeffs[-4:]
+                    a = coeffs[0] if x < xmin else coeffs[-1]
+                    x = x - xData[0] if x < xmin else x - xData[-2]
                     x = a[3] * x**3 + a[2] * x**2 + a[1] * x + a[0]
                 else:
                     # Extrapolate
@@ -928,6 +1763,121 @@ class Function:
         """
         return len(self.source)
 
+    # Define all serialization methods
+    def __getstate__(self):
+        """Return the state of the Function for pickling. The getValueOpt
+        closure and the KD-tree of shepard interpolation are left out and
+        rebuilt when unpickling, see Function.__setstate__. Functions defined
+        by callables can only be pickled if their callables can."""
+        return {
+            name: getattr(self, name)
+            for name in Function.__slots__
+            if hasattr(self, name)
+            and name
+            not in [
+                "getValueOpt",
+                "__shepardTree__",
+                "__appendBuffers__",
+                "__kernelCache__",
+                "__dependents__",
+            ]
+        }
+
+    def __setstate__(self, state):
+        """Restore the state of a pickled Function and rebuild its fast
+        evaluators, without recalculating interpolation coefficients."""
+        for name, value in state.items():
+            setattr(self, name, value)
+        if isinstance(self.source, FunctionExpression):
+            self.getValueOpt = self.source.evaluate
+        elif callable(self.source):
+            self.getValueOpt = self.source
+        else:
+            if self.__interpolation__ == "shepard":
+                self.__shepardTree__ = spatial.cKDTree(self.source[:, :-1])
+            if "__gridSpacing__" not in state:
+                self.__detectGridSpacing__()
+            self.getValueOpt = self.__buildGetValueOpt__
+
+    def toNpz(self, fileName):
+        """Save a Function defined by array into a compressed numpy .npz
+        file, holding its data points, its metadata and its interpolation
+        coefficients. It can be loaded back with Function.fromNpz, which does
+        not need to recalculate the coefficients.
+
+        Parameters
+        ----------
+        fileName : string
+            Name of the file. The .npz extension is appended if missing.
+
+        Returns
+        -------
+        None
+        """
+        if callable(self.source):
+            raise ValueError("Only Functions defined by arrays can be saved.")
+        metadata = {
+            "inputs": self.__inputs__,
+            "outputs": self.__outputs__,
+            "interpolation": self.__interpolation__,
+            "extrapolation": self.__extrapolation__,
+            "shepardNeighbors": self.__shepardNeighbors__,
+            "shepardRadius": self.__shepardRadius__,
+        }
+        arrays = {"source": np.asarray(self.source)}
+        for name in [
+            "__splineCoefficients__",
+            "__akimaCoefficients__",
+            "__polynomialCoefficients__",
+            "__gridValues__",
+            "__gridDerivatives__",
+        ]:
+            if hasattr(self, name):
+                arrays[name] = getattr(self, name)
+        for k, axis in enumerate(getattr(self, "__gridAxes__", [])):
+            arrays["__gridAxis" + str(k) + "__"] = axis
+        np.savez_compressed(fileName, metadata=json.dumps(metadata), **arrays)
+        return None
+
+    @staticmethod
+    def fromNpz(fileName):
+        """Load a Function saved by Function.toNpz.
+
+        Parameters
+        ----------
+        fileName : string
+            Name of the .npz file.
+
+        Returns
+        -------
+        function : Function
+            The loaded Function.
+        """
+        with np.load(fileName) as data:
+            metadata = json.loads(str(data["metadata"]))
+            arrays = {name: data[name] for name in data.files if name != "metadata"}
+        state = {
+            "__inputs__": metadata["inputs"],
+            "__outputs__": metadata["outputs"],
+            "__domDim__": len(metadata["inputs"]),
+            "__imgDim__": len(metadata["outputs"]),
+            "__interpolation__": metadata["interpolation"],
+            "__extrapolation__": metadata["extrapolation"],
+            "__shepardNeighbors__": metadata["shepardNeighbors"],
+            "__shepardRadius__": metadata["shepardRadius"],
+            "last_interval": 0,
+            "source": arrays.pop("source"),
+        }
+        if "__gridAxis0__" in arrays:
+            state["__gridAxes__"] = [
+                arrays.pop("__gridAxis" + str(k) + "__")
+                for k in range(state["__domDim__"])
+            ]
+        state.update(arrays)
+        function = Function.__new__(Function)
+        function.__setstate__(state)
+        return function
+
     # Define all presentation methods
     def __call__(self, *args):
         """Plot the Function if no argument is given. If an
@@ -1025,7 +1975,10 @@ class Function:
         samples : int, optional
             The number of samples in which the function will be evaluated for
             plotting it, which draws lines between each evaluated point.
-            The default value is 1000.
+            The default value is 1000. Functions defined by datasets with
+            more points than samples in the interval are plotted through
+            samples of their data points instead, chosen to preserve the
+            shape of the curve, see Function.__plotPoints__.
         forceData : Boolean, optional
             If Function is given by an interpolated dataset, setting forceData
             to True will plot all points, as a scatter, in the dataset.
@@ -1053,16 +2006,12 @@ class Function:
             lower = xmin if lower is None else lower
             upper = xmax if upper is None else upper
             # Plot data points if forceData = True
-            tooLow = True if xmin >= lower else False
-            tooHigh = True if xmax <= upper else False
-            loInd = 0 if tooLow else np.where(xData >= lower)[0][0]
-            upInd = len(xData) - 1 if tooHigh else np.where(xData <= upper)[0][0]
-            points = self.source[loInd : (upInd + 1), :].T.tolist()
+            loInd = np.searchsorted(xData, lower, side="left")
+            upInd = np.searchsorted(xData, upper, side="right")
             if forceData:
-                plt.scatter(points[0], points[1], marker="o")
+                plt.scatter(xData[loInd:upInd], self.source[loInd:upInd, 1], marker="o")
         # Calculate function at mesh nodes
-        x = np.linspace(lower, upper, samples)
-        y = self.getValue(x.tolist())
+        x, y = self.__plotPoints__(lower, upper, samples)
         # Plots function
         if forcePoints:
             plt.scatter(x, y, marker="o")
@@ -1123,7 +2072,7 @@ class Function:
         """
         # Prepare plot
         figure = plt.figure()
-        axes = figure.gca(projection="3d")
+        axes = figure.add_subplot(projection="3d")
         # Define a mesh and f values at mesh nodes for plotting
         if callable(self.source):
             # Determine boundaries
@@ -1148,10 +2097,12 @@ class Function:
         x = np.linspace(lower[0], upper[0], samples[0])
         y = np.linspace(lower[1], upper[1], samples[1])
         meshX, meshY = np.meshgrid(x, y)
-        meshXFlat, meshYFlat = meshX.flatten(), meshY.flatten()
-        mesh = [[meshXFlat[i], meshYFlat[i]] for i in range(len(meshXFlat))]
-        # Evaluate function at all mesh nodes and convert it to matrix
-        z = np.array(self.getValue(mesh)).reshape(meshX.shape)
+        # Evaluate function at all mesh nodes, at once for datasets
+        if callable(self.source):
+            mesh = np.column_stack((meshX.ravel(), meshY.ravel())).tolist()
+            z = np.array(self.getValue(mesh)).reshape(meshX.shape)
+        else:
+            z = self.getValue(meshX, meshY)
         # Plot function
         if dispType == "surface":
             surf = axes.plot_surface(
@@ -1190,6 +2141,91 @@ class Function:
         axes.set_zlabel(self.__outputs__[0].title())
         plt.show()
 
+    def __plotPoints__(self, lower, upper, samples):
+        """Calculate the points through which a 1-D Function is plotted in
+        the interval from lower to upper. They are samples evenly spaced
+        points, unless the Function is defined by an array with more data
+        points than samples in the interval. In that case, samples of its
+        data points are chosen by the largest triangle three buckets method,
+        which preserves peaks and the overall shape of the curve, plus
+        evenly spaced points where the interval goes beyond the data.
+
+        Parameters
+        ----------
+        lower : scalar
+            Lower limit of the interval.
+        upper : scalar
+            Upper limit of the interval.
+        samples : int
+            Number of points to be plotted.
+
+        Returns
+        -------
+        x : ndarray
+            Abscissas of the points.
+        y : ndarray, list
+            Values of the Function at x.
+        """
+        x = np.linspace(lower, upper, samples)
+        if callable(self.source):
+            return x, self.getValue(x.tolist())
+        xData = self.source[:, 0]
+        loInd = np.searchsorted(xData, lower, side="left")
+        upInd = np.searchsorted(xData, upper, side="right")
+        if upInd - loInd > samples:
+            yData = self.source[loInd:upInd, 1]
+            indexes = Function.__largestTriangleThreeBuckets__(
+                xData[loInd:upInd], yData, samples
+            )
+            beyond = x[(x < xData[loInd]) | (x > xData[upInd - 1])]
+            x = np.sort(np.concatenate((xData[loInd:upInd][indexes], beyond)))
+        return x, self.getValue(x)
+
+    @staticmethod
+    def __largestTriangleThreeBuckets__(x, y, threshold):
+        """Choose threshold points of a curve which keep its visual shape,
+        using the largest triangle three buckets algorithm. The first and
+        last points are always kept, and the others are split into
+        threshold - 2 buckets. From each bucket, the point forming the
+        largest triangle with the point chosen in the previous bucket and the
+        average of the next bucket is chosen.
+
+        Parameters
+        ----------
+        x : ndarray
+            Increasing abscissas of the curve.
+        y : ndarray
+            Ordinates of the curve.
+        threshold : int
+            Number of points to be chosen.
+
+        Returns
+        -------
+        indexes : ndarray
+            Sorted indexes of the chosen points.
+        """
+        n = len(x)
+        if threshold >= n or threshold < 3:
+            return np.arange(n)
+        edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+        counts = np.diff(edges)
+        # Averages of each bucket, followed by the last point
+        averageX = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts, x[-1])
+        averageY = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts, y[-1])
+        indexes = np.empty(threshold, dtype=int)
+        indexes[0], indexes[-1] = 0, n - 1
+        a = 0
+        for k in range(threshold - 2):
+            start, end = edges[k], edges[k + 1]
+            nextX, nextY = averageX[k + 1], averageY[k + 1]
+            areas = np.abs(
+                (x[a] - nextX) * (y[start:end] - y[a])
+                - (x[a] - x[start:end]) * (nextY - y[a])
+            )
+            a = start + np.argmax(areas)
+            indexes[k + 1] = a
+        return indexes
+
     @staticmethod
     def comparePlots(
         plot_list,
@@ -1280,18 +2316,21 @@ class Function:
                     # Determine boundaries
                     xmax = plot[0].source[-1, 0]
                     upper = xmax if xmax > upper else upper
-        x = np.linspace(lower, upper, samples)
 
         # Iterate to plot all plots
         for plot in plots:
             # Deal with discrete data sets when no range is given
             if noRangeSpecified and not callable(plot[0].source):
-                ax.plot(plot[0][:, 0], plot[0][:, 1], label=plot[1])
+                xData, yData = plot[0][:, 0], plot[0][:, 1]
+                indexes = Function.__largestTriangleThreeBuckets__(
+                    xData, yData, samples
+                )
+                ax.plot(xData[indexes], yData[indexes], label=plot[1])
                 if forcePoints:
-                    ax.scatter(plot[0][:, 0], plot[0][:, 1], marker="o")
+                    ax.scatter(xData[indexes], yData[indexes], marker="o")
             else:
                 # Calculate function at mesh nodes
-                y = plot[0].getValue(x.tolist())
+                x, y = plot[0].__plotPoints__(lower, upper, samples)
                 # Plots function
                 ax.plot(x, y, label=plot[1])
                 if forcePoints:
@@ -1302,15 +2341,10 @@ class Function:
             for plot in plots:
                 if not callable(plot[0].source):
                     xData = plot[0].source[:, 0]
-                    xmin, xmax = xData[0], xData[-1]
-                    tooLow = True if xmin >= lower else False
-                    tooHigh = True if xmax <= upper else False
-                    loInd = 0 if tooLow else np.where(xData >= lower)[0][0]
-                    upInd = (
-                        len(xData) - 1 if tooHigh else np.where(xData <= upper)[0][0]
-                    )
-                    points = plot[0].source[loInd : (upInd + 1), :].T.tolist()
-                    ax.scatter(points[0], points[1], marker="o")
+                    loInd = np.searchsorted(xData, lower, side="left")
+                    upInd = np.searchsorted(xData, upper, side="right")
+                    points = plot[0].source[loInd:upInd, :]
+                    ax.scatter(points[:, 0], points[:, 1], marker="o")
 
         # Setup legend
         ax.legend(loc="best", shadow=True)
@@ -1350,80 +2384,231 @@ class Function:
         # Solve the system and store the resultant coefficients
         self.__polynomialCoefficients__ = np.linalg.solve(A, y)
 
-    def __interpolateSpline__(self):
-        """Calculate natural spline coefficients that fit the data exactly."""
+    def __interpolateSpline__(self, start=0):
+        """Calculate natural spline coefficients that fit the data exactly.
+        Coefficients are stored as an array of shape (n - 1, 4), whose row i
+        holds a0, a1, a2 and a3 such that the spline is given by
+        a0 + a1*dx + a2*dx**2 + a3*dx**3 in interval i, where dx = x - x[i].
+        If start is given, only the coefficients of the intervals from start
+        on are recalculated, keeping the second derivative at x[start]."""
         # Get x and y values for all supplied points
-        x = self.source[:, 0]
-        y = self.source[:, 1]
-        mdim = len(x)
-        h = [x[i + 1] - x[i] for i in range(0, mdim - 1)]
-        # Initialize the matrix
-        Ab = np.zeros((3, mdim))
-        # Construct the Ab banded matrix and B vector
-        Ab[1, 0] = 1  # A[0, 0] = 1
-        B = [0]
-        for i in range(1, mdim - 1):
-            Ab[2, i - 1] = h[i - 1]  # A[i, i - 1] = h[i - 1]
-            Ab[1, i] = 2 * (h[i] + h[i - 1])  # A[i, i] = 2*(h[i] + h[i - 1])
-            Ab[0, i + 1] = h[i]  # A[i, i + 1] = h[i]
-            B.append(3 * ((y[i + 1] - y[i]) / (h[i]) - (y[i] - y[i - 1]) / (h[i - 1])))
-        Ab[1, mdim - 1] = 1  # A[-1, -1] = 1
-        B.append(0)
-        # Solve the system for c coefficients
-        c = linalg.solve_banded((1, 1), Ab, B, True, True)
+        x = self.source[start:, 0]
+        y = self.source[start:, 1]
+        h = np.diff(x)
+        slopes = np.diff(y) / h
+        c0 = self.__splineCoefficients__[start, 2] if start else 0
+        c = Function.__solveSpline__(x, y, c0)
         # Calculate other coefficients
-        b = [
-            ((y[i + 1] - y[i]) / h[i] - h[i] * (2 * c[i] + c[i + 1]) / 3)
-            for i in range(0, mdim - 1)
-        ]
-        d = [(c[i + 1] - c[i]) / (3 * h[i]) for i in range(0, mdim - 1)]
+        b = slopes - h * (2 * c[:-1] + c[1:]) / 3
+        d = (c[1:] - c[:-1]) / (3 * h)
         # Store coefficients
-        self.__splineCoefficients__ = np.array([y[0:-1], b, c[0:-1], d])
+        coeffs = np.column_stack((y[:-1], b, c[:-1], d))
+        if start:
+            self.__splineCoefficients__[start:] = coeffs
+        else:
+            self.__splineCoefficients__ = coeffs
 
-    def __interpolateAkima__(self):
-        """Calculate akima spline coefficients that fit the data exactly"""
-        # Get x and y values for all supplied points
-        x = self.source[:, 0]
-        y = self.source[:, 1]
+    @staticmethod
+    def __solveSpline__(x, y, c0=0):
+        """Solve the natural spline system for the second order coefficients
+        c, such that the spline second derivative at x[i] is 2*c[i].
+
+        Parameters
+        ----------
+        x : ndarray
+            Strictly increasing array of n floats.
+        y : ndarray
+            Array of shape (n,) or (n, m), each column being one data set.
+        c0 : float, optional
+            Value of c[0]. Default is 0, which makes the spline natural at
+            its start.
+
+        Returns
+        -------
+        c : ndarray
+            Array with the same shape as y.
+        """
+        mdim = len(x)
+        h = np.diff(x)
+        slopes = np.diff(y, axis=0) / h.reshape((-1,) + (1,) * (y.ndim - 1))
+        # Construct the Ab banded matrix and B vector
+        Ab = np.zeros((3, mdim))
+        Ab[0, 2:] = h[1:]  # A[i, i + 1] = h[i]
+        Ab[1, 0], Ab[1, -1] = 1, 1  # A[0, 0] = A[-1, -1] = 1
+        Ab[1, 1:-1] = 2 * (h[1:] + h[:-1])  # A[i, i] = 2*(h[i] + h[i - 1])
+        Ab[2, :-2] = h[:-1]  # A[i, i - 1] = h[i - 1]
+        B = np.zeros(y.shape)
+        B[0] = c0
+        B[1:-1] = 3 * (slopes[1:] - slopes[:-1])
+        # Solve the system for c coefficients
+        return linalg.solve_banded((1, 1), Ab, B, True, True)
+
+    def __interpolateGrid__(self):
+        """Arrange the points of a N-D source, which must form a rectilinear
+        grid, into the grid axes and an N-D array of values, stored in
+        Function.__gridAxes__ and Function.__gridValues__. For spline
+        interpolation, the derivatives of the tensor product natural spline
+        with respect to each subset of the inputs are also calculated at
+        every grid node. They are stored in Function.__gridDerivatives__, of
+        shape (2**N,) + Function.__gridValues__.shape, where the derivative
+        with respect to inputs j and k is at index 2**j + 2**k."""
+        inputs = self.source[:, :-1]
+        axes = [np.unique(inputs[:, k]) for k in range(self.__domDim__)]
+        shape = tuple(len(axis) for axis in axes)
+        indexes = [np.searchsorted(axes[k], inputs[:, k]) for k in range(len(axes))]
+        flatIndexes = np.ravel_multi_index(indexes, shape)
+        if (
+            min(shape) < 2
+            or np.prod(shape) != len(self.source)
+            or len(np.unique(flatIndexes)) != len(self.source)
+        ):
+            raise ValueError(
+                "Linear and spline interpolation of N-D Functions require the "
+                "source points to form a rectilinear grid, with each input "
+                "taking at least two values. Use shepard interpolation instead."
+            )
+        values = np.empty(len(self.source))
+        values[flatIndexes] = self.source[:, -1]
+        self.__gridAxes__ = axes
+        self.__gridValues__ = values.reshape(shape)
+        if self.__interpolation__ != "spline":
+            return None
+        # Differentiate the spline along each input, from lower to higher bits
+        derivatives = np.empty((2 ** len(axes),) + shape)
+        derivatives[0] = self.__gridValues__
+        for table in range(1, len(derivatives)):
+            k = (table & -table).bit_length() - 1
+            x = axes[k]
+            y = np.moveaxis(derivatives[table - (1 << k)], k, 0)
+            h = np.diff(x).reshape((-1,) + (1,) * (y.ndim - 1))
+            slopes = np.diff(y, axis=0) / h
+            c = Function.__solveSpline__(x, y.reshape(len(x), -1)).reshape(y.shape)
+            dy = np.empty(y.shape)
+            dy[:-1] = slopes - h * (2 * c[:-1] + c[1:]) / 3
+            dy[-1] = slopes[-1] + h[-1] * (c[-2] + 2 * c[-1]) / 3
+            derivatives[table] = np.moveaxis(dy, 0, k)
+        self.__gridDerivatives__ = derivatives
+
+    def __interpolateAkima__(self, start=0):
+        """Calculate akima spline coefficients that fit the data exactly.
+        Coefficients are stored in the same layout used for splines, see
+        Function.__interpolateSpline__. If start is given, only the
+        coefficients of the intervals from start on are recalculated."""
+        # Get x and y values for all supplied points, and the previous point
+        # of start, which sets the derivative at x[start]
+        x = self.source[max(start - 1, 0) :, 0]
+        y = self.source[max(start - 1, 0) :, 1]
+        h = np.diff(x)
+        slopes = np.diff(y) / h
         # Estimate derivatives at each point
-        d = [0] * len(x)
-        d[0] = (y[1] - y[0]) / (x[1] - x[0])
-        d[-1] = (y[-1] - y[-2]) / (x[-1] - x[-2])
-        for i in range(1, len(x) - 1):
-            w1, w2 = (x[i] - x[i - 1]), (x[i + 1] - x[i])
-            d1, d2 = ((y[i] - y[i - 1]) / w1), ((y[i + 1] - y[i]) / w2)
-            d[i] = (w1 * d2 + w2 * d1) / (w1 + w2)
-        # Calculate coefficients for each interval with system already solved
-        coeffs = [0] * 4 * (len(x) - 1)
-        for i in range(len(x) - 1):
-            xl, xr = x[i], x[i + 1]
-            yl, yr = y[i], y[i + 1]
-            dl, dr = d[i], d[i + 1]
-            A = np.array(
-                [
-                    [1, xl, xl**2, xl**3],
-                    [1, xr, xr**2, xr**3],
-                    [0, 1, 2 * xl, 3 * xl**2],
-                    [0, 1, 2 * xr, 3 * xr**2],
-                ]
+        d = np.empty(len(x))
+        d[0], d[-1] = slopes[0], slopes[-1]
+        d[1:-1] = (h[:-1] * slopes[1:] + h[1:] * slopes[:-1]) / (h[:-1] + h[1:])
+        # Calculate cubic Hermite coefficients of each interval in closed form
+        dl, dr = d[:-1], d[1:]
+        coeffs = np.column_stack(
+            (
+                y[:-1],
+                dl,
+                (3 * slopes - 2 * dl - dr) / h,
+                (dl + dr - 2 * slopes) / h**2,
             )
-            Y = np.array([yl, yr, dl, dr]).T
-            coeffs[4 * i : 4 * i + 4] = np.linalg.solve(A, Y)
-            """For some reason this doesn't always work!
-            coeffs[4*i] = (dr*xl**2*xr*(-xl + xr) + dl*xl*xr**2*(-xl + xr) +
-                           3*xl*xr**2*yl - xr**3*yl + xl**3*yr -
-                          3*xl**2*xr*yr)/(xl-xr)**3
-            coeffs[4*i+1] = (dr*xl*(xl**2 + xl*xr - 2*xr**2) -
-                             xr*(dl*(-2*xl**2 + xl*xr + xr**2) +
-                             6*xl*(yl - yr)))/(xl-xr)**3
-            coeffs[4*i+2] = (-dl*(xl**2 + xl*xr - 2*xr**2) +
-                             dr*(-2*xl**2 + xl*xr + xr**2) +
-                             3*(xl + xr)*(yl - yr))/(xl-xr)**3
-            coeffs[4*i+3] = (dl*(xl - xr) + dr*(xl - xr) -
-                             2*yl + 2*yr)/(xl-xr)**3"""
-        self.__akimaCoefficients__ = coeffs
+        )
+        if start:
+            self.__akimaCoefficients__[start:] = coeffs[1:]
+        else:
+            self.__akimaCoefficients__ = coeffs
+
+    def __cubicCoefficients__(self):
+        """Return the (n - 1, 4) interpolation coefficients of a 1-D Function
+        interpolated by spline, akima or linear methods, in the layout of
+        Function.__interpolateSpline__. Linear interpolation is written as a
+        degenerate cubic."""
+        if self.__interpolation__ == "spline":
+            return self.__splineCoefficients__
+        elif self.__interpolation__ == "akima":
+            return self.__akimaCoefficients__
+        xData, yData = self.source[:, 0], self.source[:, 1]
+        coeffs = np.zeros((len(xData) - 1, 4))
+        coeffs[:, 0] = yData[:-1]
+        coeffs[:, 1] = np.diff(yData) / np.diff(xData)
+        return coeffs
 
     # Define all possible algebraic operations
+    def __canUseUnionGrid__(self, other):
+        """Check if an operation between self and other must be performed on
+        the union of their grids. This requires both to be 1-D Functions
+        defined by arrays and Function.unionGrid to be True, and the
+        operation to not be possible directly on their data points, which
+        requires the same grid, interpolation method and inputs."""
+        return (
+            Function.unionGrid
+            and isinstance(other, Function)
+            and isinstance(self.source, np.ndarray)
+            and isinstance(other.source, np.ndarray)
+            and self.__domDim__ == other.__domDim__ == 1
+            and not (
+                self.__interpolation__ == other.__interpolation__
+                and self.__inputs__ == other.__inputs__
+                and np.array_equal(self.source[:, 0], other.source[:, 0])
+            )
+        )
+
+    def __operateOnUnionGrid__(self, other, operator):
+        """Perform an operation between two 1-D Functions defined by arrays
+        on different grids. Both are evaluated, using their own interpolation
+        and extrapolation methods, on the union of their grids and the
+        operation is applied to the resulting arrays. Grid points closer than
+        Function.unionGridTolerance to a previous point are dropped.
+
+        Parameters
+        ----------
+        other : Function
+            Second operand, defined by an array.
+        operator : string
+            One of '+', '-', '*', '/' or '**'.
+
+        Returns
+        -------
+        result : Function
+            A Function object defined on the union grid, using the
+            interpolation method of self. Its extrapolation is 'natural' if
+            both operands are natural, 'zero' if either of them is zero and
+            'constant' otherwise.
+        """
+        Xs = np.union1d(self.source[:, 0], other.source[:, 0])
+        if Function.unionGridTolerance > 0:
+            # Keep the first point of each interval of size tolerance
+            buckets = np.floor((Xs - Xs[0]) / Function.unionGridTolerance)
+            _, indexes = np.unique(buckets, return_index=True)
+            Xs = np.union1d(Xs[indexes], Xs[-1])
+        # Evaluate both operands at once on all grid points
+        Y1 = np.asarray(self.getValue(Xs), dtype=np.float64)
+        Y2 = np.asarray(other.getValue(Xs), dtype=np.float64)
+        operations = {
+            "+": (np.add, " + "),
+            "-": (np.subtract, " - "),
+            "*": (np.multiply, "*"),
+            "/": (np.divide, "/"),
+            "**": (np.power, "**"),
+        }
+        operation, symbol = operations[operator]
+        source = np.column_stack((Xs, operation(Y1, Y2)))
+        # Retrieve inputs, outputs and interpolation
+        inputs = self.__inputs__[:]
+        outputs = "(" + self.__outputs__[0] + symbol + other.__outputs__[0] + ")"
+        interpolation = self.__interpolation__
+        # Combine extrapolation methods of both operands
+        extrapolations = {self.__extrapolation__, other.__extrapolation__}
+        if "zero" in extrapolations:
+            extrapolation = "zero"
+        elif extrapolations == {"natural"}:
+            extrapolation = "natural"
+        else:
+            extrapolation = "constant"
+        # Create new Function object
+        return Function(source, inputs, outputs, interpolation, extrapolation)
+
     def __truediv__(self, other):
         """Devides a Function object and returns a new Function object
         which gives the result of the division. Only implemented for 1D
@@ -1445,6 +2630,10 @@ class Function:
         result : Function
             A Function object which gives the result of self(x)/other(x).
         """
+        # Functions defined by arrays on different grids are combined on the
+        # union of their grids, outside of the handler of scalar operands
+        if self.__canUseUnionGrid__(other):
+            return self.__operateOnUnionGrid__(other, "/")
         # If other is Function try...
         try:
             # Check if Function objects source is array or callable
@@ -1454,7 +2643,7 @@ class Function:
                 and isinstance(self.source, np.ndarray)
                 and self.__interpolation__ == other.__interpolation__
                 and self.__inputs__ == other.__inputs__
-                and np.any(self.source[:, 0] - other.source[:, 0]) == False
+                and np.array_equal(self.source[:, 0], other.source[:, 0])
             ):
                 # Operate on grid values
                 Ys = self.source[:, 1] / other.source[:, 1]
@@ -1468,7 +2657,7 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (self.getValueOpt2(x) / other(x)))
+                return Function(FunctionExpression("/", self, other))
         # If other is Float except...
         except:
             if isinstance(other, (float, int, complex)):
@@ -1486,10 +2675,10 @@ class Function:
                     # Create new Function object
                     return Function(source, inputs, outputs, interpolation)
                 else:
-                    return Function(lambda x: (self.getValueOpt2(x) / other))
+                    return Function(FunctionExpression("/", self, other))
             # Or if it is just a callable
             elif callable(other):
-                return Function(lambda x: (self.getValueOpt2(x) / other(x)))
+                return Function(FunctionExpression("/", self, other))
 
     def __rtruediv__(self, other):
         """Devides 'other' by a Function object and returns a new Function
@@ -1521,10 +2710,10 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (other / self.getValueOpt2(x)))
+                return Function(FunctionExpression("/", other, self))
         # Or if it is just a callable
         elif callable(other):
-            return Function(lambda x: (other(x) / self.getValueOpt2(x)))
+            return Function(FunctionExpression("/", other, self))
 
     def __pow__(self, other):
         """Raises a Function object to the power of 'other' and
@@ -1547,6 +2736,10 @@ class Function:
         result : Function
             A Function object which gives the result of self(x)**other(x).
         """
+        # Functions defined by arrays on different grids are combined on the
+        # union of their grids, outside of the handler of scalar operands
+        if self.__canUseUnionGrid__(other):
+            return self.__operateOnUnionGrid__(other, "**")
         # If other is Function try...
         try:
             # Check if Function objects source is array or callable
@@ -1556,7 +2749,7 @@ class Function:
                 and isinstance(self.source, np.ndarray)
                 and self.__interpolation__ == other.__interpolation__
                 and self.__inputs__ == other.__inputs__
-                and np.any(self.source[:, 0] - other.source[:, 0]) == False
+                and np.array_equal(self.source[:, 0], other.source[:, 0])
             ):
                 # Operate on grid values
                 Ys = self.source[:, 1] ** other.source[:, 1]
@@ -1570,7 +2763,7 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (self.getValueOpt2(x) ** other(x)))
+                return Function(FunctionExpression("**", self, other))
         # If other is Float except...
         except:
             if isinstance(other, (float, int, complex)):
@@ -1588,10 +2781,10 @@ class Function:
                     # Create new Function object
                     return Function(source, inputs, outputs, interpolation)
                 else:
-                    return Function(lambda x: (self.getValue(x) ** other))
+                    return Function(FunctionExpression("**", self, other))
             # Or if it is just a callable
             elif callable(other):
-                return Function(lambda x: (self.getValue(x) ** other(x)))
+                return Function(FunctionExpression("**", self, other))
 
     def __rpow__(self, other):
         """Raises 'other' to the power of a Function object and returns
@@ -1623,10 +2816,10 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (other ** self.getValue(x)))
+                return Function(FunctionExpression("**", other, self))
         # Or if it is just a callable
         elif callable(other):
-            return Function(lambda x: (other(x) ** self.getValue(x)))
+            return Function(FunctionExpression("**", other, self))
 
     def __mul__(self, other):
         """Multiplies a Function object and returns a new Function object
@@ -1649,6 +2842,10 @@ class Function:
         result : Function
             A Function object which gives the result of self(x)*other(x).
         """
+        # Functions defined by arrays on different grids are combined on the
+        # union of their grids, outside of the handler of scalar operands
+        if self.__canUseUnionGrid__(other):
+            return self.__operateOnUnionGrid__(other, "*")
         # If other is Function try...
         try:
             # Check if Function objects source is array or callable
@@ -1658,7 +2855,7 @@ class Function:
                 and isinstance(self.source, np.ndarray)
                 and self.__interpolation__ == other.__interpolation__
                 and self.__inputs__ == other.__inputs__
-                and np.any(self.source[:, 0] - other.source[:, 0]) == False
+                and np.array_equal(self.source[:, 0], other.source[:, 0])
             ):
                 # Operate on grid values
                 Ys = self.source[:, 1] * other.source[:, 1]
@@ -1672,7 +2869,7 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (self.getValue(x) * other(x)))
+                return Function(FunctionExpression("*", self, other))
         # If other is Float except...
         except:
             if isinstance(other, (float, int, complex)):
@@ -1690,10 +2887,10 @@ class Function:
                     # Create new Function object
                     return Function(source, inputs, outputs, interpolation)
                 else:
-                    return Function(lambda x: (self.getValue(x) * other))
+                    return Function(FunctionExpression("*", self, other))
             # Or if it is just a callable
             elif callable(other):
-                return Function(lambda x: (self.getValue(x) * other(x)))
+                return Function(FunctionExpression("*", self, other))
 
     def __rmul__(self, other):
         """Multiplies 'other' by a Function object and returns a new Function
@@ -1725,10 +2922,10 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (other * self.getValue(x)))
+                return Function(FunctionExpression("*", other, self))
         # Or if it is just a callable
         elif callable(other):
-            return Function(lambda x: (other(x) * self.getValue(x)))
+            return Function(FunctionExpression("*", other, self))
 
     def __add__(self, other):
         """Sums a Function object and 'other', returns a new Function
@@ -1751,6 +2948,10 @@ class Function:
         result : Function
             A Function object which gives the result of self(x)+other(x).
         """
+        # Functions defined by arrays on different grids are combined on the
+        # union of their grids, outside of the handler of scalar operands
+        if self.__canUseUnionGrid__(other):
+            return self.__operateOnUnionGrid__(other, "+")
         # If other is Function try...
         try:
             # Check if Function objects source is array or callable
@@ -1760,7 +2961,7 @@ class Function:
                 and isinstance(self.source, np.ndarray)
                 and self.__interpolation__ == other.__interpolation__
                 and self.__inputs__ == other.__inputs__
-                and np.any(self.source[:, 0] - other.source[:, 0]) == False
+                and np.array_equal(self.source[:, 0], other.source[:, 0])
             ):
                 # Operate on grid values
                 Ys = self.source[:, 1] + other.source[:, 1]
@@ -1774,7 +2975,7 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (self.getValue(x) + other(x)))
+                return Function(FunctionExpression("+", self, other))
         # If other is Float except...
         except:
             if isinstance(other, (float, int, complex)):
@@ -1792,10 +2993,10 @@ class Function:
                     # Create new Function object
                     return Function(source, inputs, outputs, interpolation)
                 else:
-                    return Function(lambda x: (self.getValue(x) + other))
+                    return Function(FunctionExpression("+", self, other))
             # Or if it is just a callable
             elif callable(other):
-                return Function(lambda x: (self.getValue(x) + other(x)))
+                return Function(FunctionExpression("+", self, other))
 
     def __radd__(self, other):
         """Sums 'other' and a Function object and returns a new Function
@@ -1827,10 +3028,10 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (other + self.getValue(x)))
+                return Function(FunctionExpression("+", other, self))
         # Or if it is just a callable
         elif callable(other):
-            return Function(lambda x: (other(x) + self.getValue(x)))
+            return Function(FunctionExpression("+", other, self))
 
     def __sub__(self, other):
         """Subtracts from a Function object and returns a new Function object
@@ -1853,6 +3054,10 @@ class Function:
         result : Function
             A Function object which gives the result of self(x)-other(x).
         """
+        # Functions defined by arrays on different grids are combined on the
+        # union of their grids, outside of the handler of scalar operands
+        if self.__canUseUnionGrid__(other):
+            return self.__operateOnUnionGrid__(other, "-")
         # If other is Function try...
         try:
             # Check if Function objects source is array or callable
@@ -1862,7 +3067,7 @@ class Function:
                 and isinstance(self.source, np.ndarray)
                 and self.__interpolation__ == other.__interpolation__
                 and self.__inputs__ == other.__inputs__
-                and np.any(self.source[:, 0] - other.source[:, 0]) == False
+                and np.array_equal(self.source[:, 0], other.source[:, 0])
             ):
                 # Operate on grid values
                 Ys = self.source[:, 1] - other.source[:, 1]
@@ -1876,7 +3081,7 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (self.getValue(x) * other(x)))
+                return Function(FunctionExpression("-", self, other))
         # If other is Float except...
         except:
             if isinstance(other, (float, int, complex)):
@@ -1894,10 +3099,10 @@ class Function:
                     # Create new Function object
                     return Function(source, inputs, outputs, interpolation)
                 else:
-                    return Function(lambda x: (self.getValue(x) - other))
+                    return Function(FunctionExpression("-", self, other))
             # Or if it is just a callable
             elif callable(other):
-                return Function(lambda x: (self.getValue(x) - other(x)))
+                return Function(FunctionExpression("-", self, other))
 
     def __rsub__(self, other):
         """Subtracts a Function object from 'other' and returns a new Function
@@ -1929,104 +3134,975 @@ class Function:
                 # Create new Function object
                 return Function(source, inputs, outputs, interpolation)
             else:
-                return Function(lambda x: (other - self.getValue(x)))
+                return Function(FunctionExpression("-", other, self))
         # Or if it is just a callable
         elif callable(other):
-            return Function(lambda x: (other(x) - self.getValue(x)))
+            return Function(FunctionExpression("-", other, self))
 
-    def integral(self, a, b, numerical=False):
+    def integral(self, a, b, numerical=False, atol=1e-10, rtol=1e-10):
         """Evaluate a definite integral of a 1-D Function in the interval
         from a to b.
 
         Parameters
         ----------
-        a : float
+        a : float, ndarray
             Lower limit of integration.
-        b : float
-            Upper limit of integration.
+        b : float, ndarray
+            Upper limit of integration. If a or b are arrays, the integral is
+            evaluated for each pair of limits, broadcasting them together.
         numerical : bool
-            If True, forces the definite integral to be evaluated numerically.
-            The current numerical method used is scipy.integrate.quad.
-            If False, try to calculate using interpolation information.
-            Currently, only available for spline and linear interpolation. If
-            unavailable, calculate numerically anyways.
+            If True, forces the definite integral to be evaluated numerically,
+            by adaptive Gauss-Legendre quadrature, see
+            Function.__integrateGaussLegendre__, or by scipy.integrate.quad
+            if a limit is infinite. If False, try to calculate using
+            interpolation information. Currently, only available for spline,
+            akima, linear and polynomial interpolation. If unavailable,
+            calculate numerically anyways.
+        atol : float, optional
+            Absolute tolerance of numerical integration. Default is 1e-10.
+        rtol : float, optional
+            Tolerance of numerical integration relative to the integral of
+            the absolute value of the Function. Default is 1e-10.
 
         Returns
         -------
-        ans : float
+        ans : float, ndarray
             Evaluated integral.
         """
-        if self.__interpolation__ == "spline" and numerical is False:
-            # Integrate using spline coefficients
-            xData = self.source[:, 0]
-            yData = self.source[:, 1]
-            coeffs = self.__splineCoefficients__
-            ans = 0
-            # Check to see if interval starts before point data
-            if a < xData[0]:
-                if self.__extrapolation__ == "constant":
-                    ans += yData[0] * (xData[0] - a)
-                elif self.__extrapolation__ == "natural":
-                    c = coeffs[:, 0]
-                    subB = a - xData[0]  # subA = 0
-                    ans -= (
-                        (c[3] * subB**4) / 4
-                        + (c[2] * subB**3 / 3)
-                        + (c[1] * subB**2 / 2)
-                        + c[0] * subB
-                    )
-                else:
-                    # self.__extrapolation__ = 'zero'
-                    pass
-            # Integrate in subintervals between Xs of given data up to b
-            i = 0
-            while i < len(xData) - 1 and xData[i] < b:
-                if b < xData[i + 1]:
-                    subB = b - xData[i]  # subA = 0
-                else:
-                    subB = xData[i + 1] - xData[i]  # subA = 0
-                c = coeffs[:, i]
-                subB = xData[i + 1] - xData[i]  # subA = 0
-                ans += (
-                    (c[3] * subB**4) / 4
-                    + (c[2] * subB**3 / 3)
-                    + (c[1] * subB**2 / 2)
-                    + c[0] * subB
-                )
-                i += 1
-            # Check to see if interval ends after point data
-            if b > xData[-1]:
-                if self.__extrapolation__ == "constant":
-                    ans += yData[-1] * (b - xData[-1])
-                elif self.__extrapolation__ == "natural":
-                    c = coeffs[:, -1]
-                    subA = xData[-1] - xData[-2]
-                    subB = b - xData[-2]
-                    ans -= (
-                        (c[3] * subA**4) / 4
-                        + (c[2] * subA**3 / 3)
-                        + (c[1] * subA**2 / 2)
-                        + c[0] * subA
-                    )
-                    ans += (
-                        (c[3] * subB**4) / 4
-                        + (c[2] * subB**3 / 3)
-                        + (c[1] * subB**2 / 2)
-                        + c[0] * subB
-                    )
-                else:
-                    # self.__extrapolation__ = 'zero'
-                    pass
-        elif self.__interpolation__ == "linear" and numerical is False:
-            return np.trapz(self.source[:, 1], x=self.source[:, 0])
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        if self.__hasAntiderivative__() and numerical is False:
+            # Integrate in closed form using interpolation coefficients
+            antiderivative = self.__makeAntiderivative__()
+            ans = antiderivative(b) - antiderivative(a)
+            return ans if ans.ndim else ans[()]
+        a, b = np.broadcast_arrays(a, b)
+        if np.all(np.isfinite(a) & np.isfinite(b)):
+            # Integrate all pairs of limits at once
+            ans = self.__integrateGaussLegendre__(a.ravel(), b.ravel(), atol, rtol)
+            ans = ans.reshape(a.shape)
         else:
-            # Integrate numerically
-            ans, _ = integrate.quad(self, a, b, epsabs=0.1, limit=10000)
+            # Infinite limits are left to scipy
+            ans = np.array(
+                [
+                    integrate.quad(self, ai, bi, epsabs=atol, limit=10000)[0]
+                    for ai, bi in zip(a.flat, b.flat)
+                ]
+            ).reshape(a.shape)
+        return ans if ans.ndim else ans[()]
+
+    def __integrateGaussLegendre__(self, a, b, atol, rtol, order=8, maxLevels=50):
+        """Integrate a 1-D Function over many intervals at once, by adaptive
+        Gauss-Legendre quadrature. Every panel is integrated as a whole and
+        as two halves, and the difference between both results estimates the
+        error. Panels whose error is larger than their share of
+        max(atol, rtol * integral of abs(Function)) are split, and their
+        halves, whose integrals are already known, become the next panels.
+        The Function is evaluated at the nodes of all panels of all intervals
+        in a single call, if it accepts arrays, or else at each node.
+
+        Parameters
+        ----------
+        a : ndarray
+            Lower limits of the intervals.
+        b : ndarray
+            Upper limits of the intervals.
+        atol : float
+            Absolute tolerance.
+        rtol : float
+            Tolerance relative to the integral of abs(Function).
+        order : int, optional
+            Number of Gauss-Legendre nodes of each panel. Default is 8.
+        maxLevels : int, optional
+            Maximum number of times a panel is split. Default is 50.
+
+        Returns
+        -------
+        ans : ndarray
+            Integral over each interval.
+        """
+        nodes, weights = np.polynomial.legendre.leggauss(order)
+        vectorized = [True]
+
+        def evaluate(x):
+            if vectorized[0]:
+                try:
+                    y = np.asarray(self.getValue(x), dtype=np.float64)
+                    if y.shape == x.shape:
+                        return y
+                except (TypeError, ValueError):
+                    pass
+                vectorized[0] = False
+            y = self.getValue(x.ravel().tolist())
+            return np.array(y, dtype=np.float64).reshape(x.shape)
+
+        def gauss(lower, upper):
+            """Return the integrals of the Function and of its absolute value
+            over each panel."""
+            half = (upper - lower) / 2
+            y = evaluate(((lower + upper) / 2)[:, np.newaxis] + np.outer(half, nodes))
+            return half * (y @ weights), np.abs(half) * (np.abs(y) @ weights)
+
+        owners = np.arange(len(a))
+        lower, upper = a, b
+        whole, _ = gauss(lower, upper)
+        widths = np.abs(b - a)
+        widths[widths == 0] = 1
+        ans = np.zeros(len(a))
+        for level in range(maxLevels):
+            mid = (lower + upper) / 2
+            halves, absHalves = gauss(
+                np.concatenate((lower, mid)), np.concatenate((mid, upper))
+            )
+            left, right = halves[: len(mid)], halves[len(mid) :]
+            refined = left + right
+            if level == 0:
+                scale = absHalves[: len(mid)] + absHalves[len(mid) :]
+            allowed = np.fmax(atol, rtol * scale[owners])
+            allowed = allowed * np.abs(upper - lower) / widths[owners]
+            done = np.abs(refined - whole) <= allowed
+            # Stop splitting panels of integrals which do not converge
+            if level == maxLevels - 1 or 2 * np.sum(~done) > max(2**17, 8 * len(a)):
+                done[:] = True
+            np.add.at(ans, owners[done], refined[done])
+            split = ~done
+            if not np.any(split):
+                break
+            owners = np.concatenate((owners[split], owners[split]))
+            lower = np.concatenate((lower[split], mid[split]))
+            upper = np.concatenate((mid[split], upper[split]))
+            whole = np.concatenate((left[split], right[split]))
         return ans
 
-    # Not implemented
+    def antiderivative(self):
+        """Return the antiderivative of a 1-D Function, as a new Function F
+        defined by F(x) = integral of self from the first data point up to x.
+        It is calculated in closed form from the interpolation coefficients,
+        and honours the extrapolation method, so it is exact everywhere.
+        Available for spline, akima, linear and polynomial interpolation.
+
+        Returns
+        -------
+        result : Function
+            Antiderivative of the Function, defined by a callable.
+        """
+        if not self.__hasAntiderivative__():
+            raise ValueError(
+                "The antiderivative is only available for 1-D Functions "
+                "interpolated by spline, akima, linear or polynomial methods."
+            )
+        antiderivative = self.__makeAntiderivative__()
+
+        def source(x):
+            ans = antiderivative(np.asarray(x, dtype=np.float64))
+            return ans if ans.ndim else ans[()]
+
+        return Function(source, self.__inputs__, self.__outputs__)
+
+    def cumulativeIntegral(self, initialValue=0):
+        """Return the running integral of a 1-D Function, as a new Function
+        defined by array at the same data points. Its value at each point is
+        initialValue plus the integral of self from the first data point,
+        calculated in closed form from the interpolation coefficients. Its
+        interpolation is the same as self, and its extrapolation is constant
+        if self extrapolates to zero and natural otherwise.
+
+        Parameters
+        ----------
+        initialValue : float, optional
+            Value of the result at the first data point. Default is 0.
+
+        Returns
+        -------
+        result : Function
+            Running integral of the Function, defined by array.
+        """
+        if not self.__hasAntiderivative__():
+            raise ValueError(
+                "The cumulative integral is only available for 1-D Functions "
+                "interpolated by spline, akima, linear or polynomial methods."
+            )
+        xData = self.source[:, 0]
+        yData = initialValue + self.__makeAntiderivative__()(xData)
+        extrapolation = "constant" if self.__extrapolation__ == "zero" else "natural"
+        return Function(
+            np.column_stack((xData, yData)),
+            self.__inputs__,
+            self.__outputs__,
+            self.__interpolation__,
+            extrapolation,
+        )
+
+    def __hasAntiderivative__(self):
+        """Check if the antiderivative of the Function can be calculated in
+        closed form."""
+        return isinstance(self.source, np.ndarray) and self.__interpolation__ in [
+            "spline",
+            "akima",
+            "linear",
+            "polynomial",
+        ]
+
+    def __makeAntiderivative__(self):
+        """Create a function which evaluates, at all points of an array at
+        once, the integral of a 1-D Function from its first data point, in
+        closed form. For piecewise cubic interpolations, the integrals of all
+        intervals are accumulated once, so that each point only requires the
+        integral of the cubic of its own interval.
+
+        Returns
+        -------
+        antiderivative : function
+            Function of an ndarray x returning an ndarray of the same shape.
+        """
+        xData = self.source[:, 0].copy()
+        yData = self.source[:, 1].copy()
+        xmin, xmax = xData[0], xData[-1]
+        extrapolation = self.__extrapolation__
+        if self.__interpolation__ == "polynomial":
+            # Integrate the polynomial term by term
+            coeffs = self.__polynomialCoefficients__
+            integralCoeffs = coeffs / np.arange(1, len(coeffs) + 1)
+            integralCoeffs = np.append(integralCoeffs[::-1], 0)
+
+            def naturalAntiderivative(x):
+                return np.polyval(integralCoeffs, x) - np.polyval(integralCoeffs, xmin)
+
+        else:
+            # Integrate the cubic of each interval and accumulate them
+            coeffs = self.__cubicCoefficients__().copy()
+            h = np.diff(xData)
+            intervalIntegrals = np.sum(
+                coeffs / [1, 2, 3, 4] * np.power.outer(h, [1, 2, 3, 4]), axis=1
+            )
+            cumulative = np.concatenate(([0], np.cumsum(intervalIntegrals)))
+
+            def naturalAntiderivative(x):
+                i = np.clip(np.searchsorted(xData, x), 1, len(xData) - 1) - 1
+                a = coeffs[i].T
+                dx = x - xData[i]
+                return (
+                    cumulative[i]
+                    + (((a[3] * dx / 4 + a[2] / 3) * dx + a[1] / 2) * dx + a[0]) * dx
+                )
+
+        def antiderivative(x):
+            if extrapolation == "natural":
+                return naturalAntiderivative(x)
+            clippedX = np.clip(x, xmin, xmax)
+            y = naturalAntiderivative(clippedX)
+            if extrapolation != "zero":
+                # Constant extrapolation integrates as a rectangle
+                y = y + np.where(x < xmin, yData[0], yData[-1]) * (x - clippedX)
+            return y
+
+        return antiderivative
+
     def differentiate(self, x, dx=1e-6):
-        return (self.getValue(x + dx) - self.getValue(x - dx)) / (2 * dx)
+        """Evaluate the derivative of a 1-D Function at x through a central
+        finite difference. See Function.derivative for the derivative of
+        Functions defined by arrays in closed form.
+
+        Parameters
+        ----------
+        x : float, list, ndarray
+            Point, or points, at which the derivative is evaluated. Lists and
+            arrays are evaluated at once.
+        dx : float, optional
+            Step of the finite difference. Default is 1e-6.
+
+        Returns
+        -------
+        ans : float, list, ndarray
+            Derivative at x, of the same type as x.
+        """
+        if np.ndim(x) == 0:
+            return (self.getValue(x + dx) - self.getValue(x - dx)) / (2 * dx)
+        points = np.array(x, dtype=np.float64)
+        ans = np.asarray(self.getValue(points + dx)) - self.getValue(points - dx)
+        ans = np.reshape(ans / (2 * dx), points.shape)
+        return ans if isinstance(x, np.ndarray) else ans.tolist()
         # h = (10)**-300
         # z = x + h*1j
         # return self(z).imag/h
+
+    def derivative(self):
+        """Return the derivative of a 1-D Function defined by an array, as a
+        new Function defined by array at the same data points. The derivative
+        at each data point is calculated in closed form from the interpolation
+        coefficients of spline, akima and polynomial interpolations. Linear
+        interpolation has no derivative at the data points, so the derivative
+        of the parabola through each point and its neighbors is used instead.
+        The result uses the same interpolation method. Its extrapolation is
+        natural if self extrapolates naturally and zero otherwise.
+
+        Except for polynomial interpolation, the result is exact only at the
+        data points. Between them it interpolates the derivatives at the data
+        points, which approximates, but is not equal to, the derivative of
+        the interpolant of self. Use Function.differentiate where the exact
+        derivative of the interpolant between data points is needed.
+
+        Returns
+        -------
+        result : Function
+            Derivative of the Function, defined by array.
+        """
+        if not self.__hasAntiderivative__():
+            raise ValueError(
+                "The derivative is only available for 1-D Functions "
+                "interpolated by spline, akima, linear or polynomial methods."
+            )
+        xData = self.source[:, 0]
+        yData = self.source[:, 1]
+        h = np.diff(xData)
+        if self.__interpolation__ == "polynomial":
+            coeffs = self.__polynomialCoefficients__
+            derivativeCoeffs = coeffs[1:] * np.arange(1, len(coeffs))
+            dydx = np.polyval(derivativeCoeffs[::-1], xData)
+        elif self.__interpolation__ == "linear":
+            slopes = np.diff(yData) / h
+            dydx = np.empty(len(xData))
+            dydx[0], dydx[-1] = slopes[0], slopes[-1]
+            dydx[1:-1] = (h[:-1] * slopes[1:] + h[1:] * slopes[:-1]) / (h[:-1] + h[1:])
+        else:
+            # First derivative of each cubic at the start of its interval,
+            # and of the last cubic at the last data point
+            a = self.__cubicCoefficients__()
+            lastDerivative = a[-1, 1] + (2 * a[-1, 2] + 3 * a[-1, 3] * h[-1]) * h[-1]
+            dydx = np.append(a[:, 1], lastDerivative)
+        extrapolation = "natural" if self.__extrapolation__ == "natural" else "zero"
+        return Function(
+            np.column_stack((xData, dydx)),
+            self.__inputs__,
+            self.__outputs__,
+            self.__interpolation__,
+            extrapolation,
+        )
+
+    def findRoots(self, level=0):
+        """Find all points of the domain of a 1-D Function defined by an
+        array, between its first and last data points, at which it equals
+        level. The roots of every interval are calculated at once, in closed
+        form, from the interpolation coefficients of spline, akima and linear
+        interpolations, and from the companion matrix of the polynomial of
+        polynomial interpolation.
+
+        Parameters
+        ----------
+        level : float, optional
+            Value whose preimages are searched. Default is 0.
+
+        Returns
+        -------
+        roots : ndarray
+            Sorted points at which the Function equals level.
+        """
+        if not self.__hasAntiderivative__():
+            raise ValueError(
+                "Roots are only available for 1-D Functions "
+                "interpolated by spline, akima, linear or polynomial methods."
+            )
+        xData = self.source[:, 0].astype(np.float64)
+        xmin, xmax = xData[0], xData[-1]
+        tolerance = 1e-9 * (xmax - xmin)
+        if self.__interpolation__ == "polynomial":
+            coeffs = self.__polynomialCoefficients__.astype(np.float64)
+            coeffs[0] -= level
+            roots = np.roots(coeffs[::-1])
+            roots = roots.real[np.abs(roots.imag) <= tolerance]
+            roots = np.clip(
+                roots[(roots >= xmin - tolerance) & (roots <= xmax + tolerance)],
+                xmin,
+                xmax,
+            )
+        else:
+            # Roots of each cubic in terms of s = dx / h, in [0, 1]
+            h = np.diff(xData)
+            a = self.__cubicCoefficients__() * np.power.outer(h, [0, 1, 2, 3])
+            a[:, 0] -= level
+            s = Function.__cubicRoots__(a)
+            inside = (s >= -1e-9) & (s <= 1 + 1e-9)
+            i = np.nonzero(inside)[0]
+            roots = xData[i] + np.clip(s[inside], 0, 1) * h[i]
+            # Intervals equal to level everywhere are represented by their ends
+            flat = np.all(a == 0, axis=1)
+            roots = np.concatenate((roots, xData[:-1][flat], xData[1:][flat]))
+        # Roots at data points are found in both of their intervals
+        roots = np.sort(roots)
+        return roots[np.diff(roots, prepend=-np.inf) > tolerance]
+
+    def crossings(self, level=0, direction=0):
+        """Find the points at which a 1-D Function defined by an array crosses
+        level, that is, the roots of Function.findRoots(level) across which
+        Function - level changes sign. Roots at which the Function only
+        touches level are discarded.
+
+        Parameters
+        ----------
+        level : float, optional
+            Value whose crossings are searched. Default is 0.
+        direction : int, optional
+            If 1, only upward crossings are returned, and if -1, only
+            downward crossings. Default is 0, which returns both.
+
+        Returns
+        -------
+        crossings : ndarray
+            Sorted points at which the Function crosses level.
+        """
+        roots = self.findRoots(level)
+        # Sign of the Function at the middle of the intervals between roots
+        bounds = np.concatenate(([self.source[0, 0]], roots, [self.source[-1, 0]]))
+        middles = (bounds[1:] + bounds[:-1]) / 2
+        signs = np.sign(np.asarray(self.getValue(middles)) - level)
+        change = signs[1:] - signs[:-1]
+        crossing = (signs[1:] * signs[:-1] < 0) & (direction * change >= 0)
+        return roots[crossing]
+
+    def inverse(self):
+        """Return the inverse of a 1-D Function defined by strictly monotonic
+        data, interpolated by spline, akima or linear methods, as a new
+        Function defined by a callable. Each value is inverted in closed form
+        by solving the interpolating cubic of its interval, so that
+        self(result(y)) == y. Values beyond the data of self are inverted
+        through the first or last cubic if self extrapolates naturally, and
+        return the first or last data point otherwise.
+
+        Returns
+        -------
+        result : Function
+            Inverse of the Function, defined by a callable.
+        """
+        if not self.__hasAntiderivative__() or self.__interpolation__ == "polynomial":
+            raise ValueError(
+                "The inverse is only available for 1-D Functions "
+                "interpolated by spline, akima or linear methods."
+            )
+        xData = self.source[:, 0].astype(np.float64)
+        yData = self.source[:, 1].astype(np.float64)
+        sign = np.sign(yData[-1] - yData[0])
+        if not np.all(sign * np.diff(yData) > 0):
+            raise ValueError("Only strictly monotonic Functions can be inverted.")
+        h = np.diff(xData)
+        coeffs = self.__cubicCoefficients__() * np.power.outer(h, [0, 1, 2, 3])
+        ymin, ymax = np.sort(yData[[0, -1]])
+        natural = self.__extrapolation__ == "natural"
+
+        def source(y):
+            y = np.asarray(y, dtype=np.float64)
+            values = y.ravel() if natural else np.clip(y.ravel(), ymin, ymax)
+            i = np.searchsorted(sign * yData, sign * values)
+            i = np.clip(i, 1, len(xData) - 1) - 1
+            a = coeffs[i].copy()
+            a[:, 0] -= values
+            # Root of each cubic closest to its own interval
+            s = Function.__cubicRoots__(a)
+            distances = np.abs(s - np.clip(s, 0, 1))
+            j = np.argmin(np.where(np.isnan(s), np.inf, distances), axis=1)
+            s = s[np.arange(len(s)), j]
+            ans = np.reshape(xData[i] + s * h[i], y.shape)
+            return ans if ans.ndim else ans[()]
+
+        return Function(source, self.__outputs__, self.__inputs__)
+
+    @staticmethod
+    def __cubicRoots__(a):
+        """Calculate the real roots of the cubics a0 + a1*s + a2*s**2 +
+        a3*s**3 whose coefficients are the rows of an (n, 4) array, all at
+        once. Cubics are solved through the eigenvalues of their companion
+        matrices, and quadratic and linear rows in closed form. Roots are
+        refined by a Newton step.
+
+        Parameters
+        ----------
+        a : ndarray
+            Array of shape (n, 4) of polynomial coefficients, in increasing
+            order of degree.
+
+        Returns
+        -------
+        roots : ndarray
+            Array of shape (n, 3) of real roots, padded with nan.
+        """
+        roots = np.full((len(a), 3), np.nan)
+        scale = np.max(np.abs(a), axis=1)
+        cubic = np.abs(a[:, 3]) > 1e-12 * scale
+        quadratic = ~cubic & (np.abs(a[:, 2]) > 1e-12 * scale)
+        linear = ~cubic & ~quadratic & (np.abs(a[:, 1]) > 1e-12 * scale)
+        if np.any(cubic):
+            b = a[cubic, :3] / a[cubic, 3:]
+            companion = np.zeros((len(b), 3, 3))
+            companion[:, 1, 0] = companion[:, 2, 1] = 1
+            companion[:, :, 2] = -b
+            eigenvalues = np.linalg.eigvals(companion)
+            real = np.abs(eigenvalues.imag) <= 1e-7 * (1 + np.abs(eigenvalues.real))
+            roots[cubic] = np.where(real, eigenvalues.real, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a0, a1, a2 = a[quadratic, :3].T
+            discriminant = a1**2 - 4 * a2 * a0
+            q = -(a1 + np.copysign(np.sqrt(discriminant), a1)) / 2
+            roots[quadratic, 0] = q / a2
+            roots[quadratic, 1] = a0 / q
+            roots[linear, 0] = -a[linear, 0] / a[linear, 1]
+            # Newton step
+            a0, a1, a2, a3 = a.T[:, :, None]
+            value = ((a3 * roots + a2) * roots + a1) * roots + a0
+            slope = (3 * a3 * roots + 2 * a2) * roots + a1
+            step = np.where(slope != 0, value / slope, 0)
+        return roots - np.where(np.isfinite(step), step, 0)
+
+
+class FunctionExpression:
+    """Lazy algebraic expression of Functions, callables and numbers. It is
+    used as the source of Functions which result from arithmetic operations
+    that can not be performed directly on data points, such as operations
+    between callable Functions.
+
+    The expression is stored as a tree, which is simplified as it is built:
+    sums and products of sums and products are flattened into a single node,
+    their numerical constants are folded together and Functions defined by
+    expressions are expanded into their own trees. The whole tree is then
+    fused into a single Python expression, compiled once for scalar inputs
+    and once for arrays. Evaluating a chain of operations therefore costs a
+    single call, plus one call per leaf Function, instead of one nested call
+    per operation.
+
+    Expanded Functions are still referenced by the expression. If the source
+    of any of them is changed, for example by Function.setSource or
+    Function.setDiscrete, the expression is built again from its original
+    operands when next evaluated, as a plain callable operand would be.
+    """
+
+    def __init__(self, operator, *operands):
+        """Build and fuse the expression 'operand operator operand ...'.
+
+        Parameters
+        ----------
+        operator : string
+            One of '+', '-', '*', '/' or '**'. Sums and products may have
+            more than two operands.
+        operands : Function, FunctionExpression, callable, int, float
+            Operands of the expression. Callables must take a single
+            argument.
+
+        Returns
+        -------
+        None
+        """
+        self.original = (operator, list(operands))
+        self.__build__(operator, operands)
+
+    def __build__(self, operator, operands):
+        """Simplify the expression tree and compile its evaluators. See
+        FunctionExpression.__init__."""
+        # Functions defined by expressions are replaced by their expressions.
+        # Each one is kept as a guard, together with the expression expanded,
+        # and so are the guards of expanded expressions.
+        self.guards = []
+        expanded = []
+        for operand in operands:
+            if isinstance(operand, Function) and isinstance(
+                operand.source, FunctionExpression
+            ):
+                self.guards.append((operand, operand.source))
+                operand = operand.source
+            if isinstance(operand, FunctionExpression):
+                operand.__update__()
+                self.guards += operand.guards
+            expanded.append(operand)
+        operands = expanded
+        # Subtracting a constant is the same as adding its opposite
+        if operator == "-" and isinstance(operands[1], (int, float, complex)):
+            operator, operands = "+", [operands[0], -operands[1]]
+        # Flatten sums and products and fold their constants
+        if operator in ["+", "*"]:
+            flat = []
+            for operand in operands:
+                if (
+                    isinstance(operand, FunctionExpression)
+                    and operand.operator == operator
+                ):
+                    flat += operand.operands
+                else:
+                    flat.append(operand)
+            identity = 0 if operator == "+" else 1
+            terms, constant = [], identity
+            for operand in flat:
+                if not isinstance(operand, (int, float, complex)):
+                    terms.append(operand)
+                elif operator == "+":
+                    constant += operand
+                else:
+                    constant *= operand
+            # Identity elements do not need to be evaluated
+            if constant != identity or len(terms) == 0:
+                terms.append(constant)
+            operands = terms
+        self.operator = operator
+        self.operands = operands
+        # Fuse the expression into scalar and vectorized evaluators
+        self.evaluate = self.__compile__(vectorized=False)
+        self.evaluateArray = self.__compile__(vectorized=True)
+
+    def __code__(self, namespace, vectorized):
+        """Write the expression as Python code of variable x, storing every
+        leaf operand in namespace under the name used in the code."""
+        terms = []
+        for operand in self.operands:
+            if isinstance(operand, FunctionExpression):
+                terms.append(operand.__code__(namespace, vectorized))
+                continue
+            name = "leaf" + str(len(namespace))
+            namespace[name] = operand
+            if isinstance(operand, Function) and vectorized:
+                terms.append("asarray(" + name + ".getValue(x))")
+            elif isinstance(operand, Function):
+                terms.append(name + ".getValueOpt(x)")
+            elif callable(operand):
+                terms.append(name + "(x)")
+            else:
+                terms.append(name)
+        return "(" + (" " + self.operator + " ").join(terms) + ")"
+
+    def __compile__(self, vectorized):
+        """Compile the fused expression into a function of a single x. If
+        the source of an expanded Function has changed, it rebuilds the
+        expression instead, see FunctionExpression.__refresh__."""
+        namespace = {}
+        code = "lambda x: " + self.__code__(namespace, vectorized)
+        if len(self.guards) > 0:
+            checks = []
+            for i, (function, expression) in enumerate(self.guards):
+                namespace["guard" + str(i)] = function
+                namespace["expression" + str(i)] = expression
+                checks.append("guard{0}.source is expression{0}".format(i))
+            code += " if " + " and ".join(checks) + " else refresh(x)"
+            namespace["refresh"] = lambda x: self.__refresh__(x, vectorized)
+        namespace["asarray"] = np.asarray
+        return eval(code, namespace)
+
+    def __update__(self):
+        """Build the expression again from its original operands if the
+        source of an expanded Function has changed."""
+        if any(function.source is not source for function, source in self.guards):
+            self.__build__(*self.original)
+
+    def __refresh__(self, x, vectorized):
+        """Update the expression and evaluate it at x."""
+        self.__update__()
+        return self.evaluateArray(x) if vectorized else self.evaluate(x)
+
+    def __getstate__(self):
+        """Return the original operands of the expression for pickling. The
+        tree and its compiled evaluators are rebuilt by
+        FunctionExpression.__setstate__."""
+        return {"original": self.original}
+
+    def __setstate__(self, state):
+        """Restore a pickled expression, rebuilding its tree and compiling
+        its evaluators."""
+        self.original = state["original"]
+        self.__build__(*self.original)
+
+    def __call__(self, x):
+        """Evaluate the expression at x, which may be a scalar or an array.
+        If some leaf callable does not accept arrays, arrays are evaluated
+        one element at a time."""
+        if isinstance(x, np.ndarray):
+            try:
+                return self.evaluateArray(x)
+            except Exception:
+                ans = [self.evaluate(xi) for xi in x.ravel().tolist()]
+                return np.reshape(ans, x.shape)
+        return self.evaluate(x)
+
+
+class FunctionSet:
+    """Set of 1-D Functions of the same input which are always evaluated
+    together at the same point, such as the quantities of a motor as a
+    function of time or of the atmosphere as a function of height.
+
+    Functions defined by arrays on the same grid, interpolated by spline,
+    akima or linear methods, are merged into a single table with one output
+    column per Function. All of its columns are evaluated with a single
+    interval lookup. Any other Function in the set, such as callables or
+    Functions defined on other grids, is evaluated on its own.
+
+    The set keeps references to its Functions, which tell it when they are
+    changed by methods such as Function.setSource, Function.setExtrapolation
+    or Function.append. The table is then built again when the set is next
+    evaluated, so the set always evaluates its Functions as they currently
+    are.
+    """
+
+    def __init__(
+        self,
+        source,
+        inputs=["Scalar"],
+        outputs=None,
+        interpolation="spline",
+        extrapolation="constant",
+    ):
+        """Create a set of Functions evaluated together.
+
+        Parameters
+        ----------
+        source : list of Function, ndarray
+            The Functions of the set. If ndarray, it should be as
+            [(x0, y0, z0), (x1, y1, z1), ...], where x is the input and y, z,
+            ... are the outputs, each one converted into a Function.
+        inputs : string, optional
+            Name of the input, used only if source is an ndarray.
+        outputs : list of strings, optional
+            Names of the outputs, used only if source is an ndarray.
+        interpolation : string, optional
+            Interpolation method, used only if source is an ndarray. Spline,
+            akima and linear are supported. Default is spline.
+        extrapolation : string, optional
+            Extrapolation method, used only if source is an ndarray. Default
+            is constant.
+
+        Returns
+        -------
+        None
+        """
+        if isinstance(source, np.ndarray):
+            outputs = outputs or (source.shape[1] - 1) * ["Scalar"]
+            source = [
+                Function(
+                    source[:, [0, i + 1]], inputs, output, interpolation, extrapolation
+                )
+                for i, output in enumerate(outputs)
+            ]
+        self.functions = list(source)
+        self.__build__()
+
+    def __build__(self):
+        """Merge the tabulated Functions of the set which share a grid into
+        a single table and create FunctionSet.getValueOpt. The set registers
+        itself in its Functions, which call FunctionSet.__invalidate__ when
+        they change."""
+        for function in self.functions:
+            dependents = getattr(function, "__dependents__", None)
+            if dependents is None:
+                function.__dependents__ = dependents = []
+            # Drop sets which no longer exist
+            dependents[:] = [
+                reference
+                for reference in dependents
+                if reference() is not None and reference() is not self
+            ]
+            dependents.append(weakref.ref(self))
+        self.outdated = False
+        self.__kernelCache__ = None
+        # Find Functions which share the grid of the first tabulated one
+        self.tableIndexes, self.otherIndexes = [], []
+        grid = None
+        for i, function in enumerate(self.functions):
+            if FunctionSet.__isTabulated__(function) and (
+                grid is None or np.array_equal(function.source[:, 0], grid.source[:, 0])
+            ):
+                grid = function if grid is None else grid
+                self.tableIndexes.append(i)
+            else:
+                self.otherIndexes.append(i)
+        self.grid = grid
+        if grid is not None:
+            # Store all columns as cubics in the local coordinate x - x[i]
+            tableFunctions = [self.functions[i] for i in self.tableIndexes]
+            self.coefficients = np.stack(
+                [f.__cubicCoefficients__() for f in tableFunctions], axis=1
+            )
+            self.extrapolations = [f.__extrapolation__ for f in tableFunctions]
+        self.setGetValueOpt()
+        return self
+
+    def __invalidate__(self):
+        """Mark the table of the set as outdated, after one of its Functions
+        has changed. It is built again when the set is next evaluated."""
+        self.outdated = True
+        self.getValueOpt = self.__buildGetValueOpt__
+
+    def __buildGetValueOpt__(self, x):
+        """Build the table of the set again and evaluate it at x. It takes
+        the place of getValueOpt while the table is outdated."""
+        return self.__build__().getValueOpt(x)
+
+    @staticmethod
+    def __isTabulated__(function):
+        """Check if a Function can be merged into the table of a set."""
+        return (
+            isinstance(function, Function)
+            and isinstance(function.source, np.ndarray)
+            and function.__domDim__ == 1
+            and function.__interpolation__ in ["spline", "akima", "linear"]
+        )
+
+    def setGetValueOpt(self):
+        """Create the method which evaluates all Functions of the set at a
+        scalar point. See FunctionSet.getValueOpt.
+
+        Returns
+        -------
+        self : FunctionSet
+        """
+        others = [(i, self.functions[i]) for i in self.otherIndexes]
+        if self.grid is None:
+
+            def getValueOpt(x):
+                return [function.getValueOpt(x) for _, function in others]
+
+            self.getValueOpt = getValueOpt
+            return self
+
+        if Function.jitKernels and has_numba:
+            kernel = self.__kernelArguments__()
+            out = np.empty(len(self.tableIndexes))
+
+            def getValueOpt(x):
+                evaluateCubicTablePoint(x, *kernel, out)
+                values = out.tolist()
+                for j, function in others:
+                    values.insert(j, function.getValueOpt(x))
+                return values
+
+            self.getValueOpt = getValueOpt
+            return self
+
+        xList = self.grid.source[:, 0].tolist()
+        xmin, xmax = xList[0], xList[-1]
+        lastInterval = len(xList) - 2
+        findInterval = self.grid.__intervalFinder__()
+        coeffs = self.coefficients.tolist()
+        extrapolations = self.extrapolations
+        yFirst = self.coefficients[0, :, 0].tolist()
+        yLast = [self.functions[i].source[-1, 1] for i in self.tableIndexes]
+
+        def getValueOpt(x):
+            if xmin <= x <= xmax:
+                i = findInterval(x)
+                dx = x - xList[i]
+                values = [
+                    ((a3 * dx + a2) * dx + a1) * dx + a0 for a0, a1, a2, a3 in coeffs[i]
+                ]
+            else:
+                i, edge = (0, yFirst) if x < xmin else (lastInterval, yLast)
+                dx = x - xList[i]
+                values = [
+                    (
+                        ((a[3] * dx + a[2]) * dx + a[1]) * dx + a[0]
+                        if method == "natural"
+                        else (0 if method == "zero" else y)
+                    )
+                    for a, method, y in zip(coeffs[i], extrapolations, edge)
+                ]
+            for j, function in others:
+                values.insert(j, function.getValueOpt(x))
+            return values
+
+        self.getValueOpt = getValueOpt
+        return self
+
+    def getValueOpt(self, x):
+        """Evaluate all Functions of the set at a single point. The code
+        below is here for documentation purposes only, it is replaced for all
+        instances by FunctionSet.setGetValueOpt.
+
+        Parameters
+        ----------
+        x : scalar
+            Point where the Functions are to be evaluated.
+
+        Returns
+        -------
+        values : list
+            Value of each Function of the set, in order.
+        """
+        return [function.getValueOpt(x) for function in self.functions]
+
+    def getValue(self, x):
+        """Evaluate all Functions of the set at a point or at each point of
+        an array. The intervals of all points are found only once for all
+        Functions which share the table of the set.
+
+        Parameters
+        ----------
+        x : scalar, list, ndarray
+            Point or points where the Functions are to be evaluated.
+
+        Returns
+        -------
+        values : list, ndarray
+            If x is a scalar, list with the value of each Function. Otherwise,
+            array of shape (len(functions),) + shape of x, whose first index
+            selects the Function.
+        """
+        if np.ndim(x) == 0:
+            return self.getValueOpt(x)
+        if self.outdated:
+            self.__build__()
+        x = np.asarray(x, dtype=np.float64)
+        values = np.empty((len(self.functions),) + x.shape)
+        if self.grid is not None and Function.jitKernels and has_numba:
+            y = np.empty((x.size, len(self.tableIndexes)))
+            evaluateCubicTable(x.reshape(-1), *self.__kernelArguments__(), y)
+            values[self.tableIndexes] = y.T.reshape((-1,) + x.shape)
+        elif self.grid is not None:
+            xData = self.grid.source[:, 0]
+            xIntervals = self.grid.__findIntervals__(x)
+            # Gather coefficients of all columns with shape (4, columns, ...)
+            a = np.moveaxis(self.coefficients[xIntervals], -1, 0)
+            a = np.moveaxis(a, -1, 1)
+            dx = x - xData[xIntervals]
+            y = ((a[3] * dx + a[2]) * dx + a[1]) * dx + a[0]
+            # Extrapolate each column with its own method
+            below, above = x < xData[0], x > xData[-1]
+            for column, method in enumerate(self.extrapolations):
+                function = self.functions[self.tableIndexes[column]]
+                if method == "zero":
+                    y[column][below | above] = 0
+                elif method != "natural":
+                    y[column][below] = function.source[0, 1]
+                    y[column][above] = function.source[-1, 1]
+            values[self.tableIndexes] = y
+        for i in self.otherIndexes:
+            values[i] = np.asarray(self.functions[i].getValue(x), dtype=np.float64)
+        return values
+
+    def __kernelArguments__(self):
+        """Return the data arguments of evaluateCubicTablePoint and
+        evaluateCubicTable for the Functions which share the table of the
+        set. They are built once and cached until the table is built
+        again."""
+        if getattr(self, "__kernelCache__", None) is None:
+            tables = [self.functions[i] for i in self.tableIndexes]
+            codes = {"zero": 0, "natural": 1}
+            self.__kernelCache__ = (
+                np.ascontiguousarray(self.grid.source[:, 0], dtype=np.float64),
+                np.ascontiguousarray(self.coefficients, dtype=np.float64),
+                np.array([codes.get(method, 2) for method in self.extrapolations]),
+                np.array([f.source[0, 1] for f in tables], dtype=np.float64),
+                np.array([f.source[-1, 1] for f in tables], dtype=np.float64),
+            )
+        return self.__kernelCache__
+
+    def __call__(self, x):
+        """Evaluate all Functions of the set. See FunctionSet.getValue."""
+        return self.getValue(x)
+
+    def __getitem__(self, index):
+        """Return the Function of the set at index."""
+        return self.functions[index]
+
+    def __len__(self):
+        """Return the number of Functions in the set."""
+        return len(self.functions)
+
+    def __getstate__(self):
+        """Return the Functions of the set for pickling. Its table and
+        getValueOpt closure are rebuilt by FunctionSet.__setstate__."""
+        return {"functions": self.functions}
+
+    def __setstate__(self, state):
+        """Restore the Functions of a pickled set and build its table."""
+        self.functions = state["functions"]
+        self.__build__()
@@ -345,11 +345,11 @@ class Motor(ABC):
 
     def evaluateMass(self):
         """Calculates and returns the total propellant mass curve by
-        numerically integrating the MassDot curve, calculated in
-        evaluateMassDot. Numerical integration is done with the
-        Trapezoidal Rule, giving the same result as scipy.integrate.
-        odeint but 100x faster. The result is a function of time,
-        object of the class Function, which is stored in self.mass.
+        integrating the MassDot curve, calculated in evaluateMassDot.
+        Integration is done in closed form, from the interpolation
+        coefficients of the MassDot curve, at all of its data points at
+        once. The result is a function of time, object of the class
+        Function, which is stored in self.mass.
 
         Parameters
         ----------
@@ -360,22 +360,12 @@ class Motor(ABC):
         self.mass : Function
             Total propellant mass as a function of time.
         """
-        # Retrieve mass dot curve data
-        t = self.massDot.source[:, 0]
-        ydot = self.massDot.source[:, 1]
-
-        # Set initial conditions
-        T = [0]
-        y = [self.propellantInitialMass]
-
-        # Solve for each time point
-        for i in range(1, len(t)):
-            T += [t[i]]
-            y += [y[i - 1] + 0.5 * (t[i] - t[i - 1]) * (ydot[i] + ydot[i - 1])]
+        # Integrate mass dot curve from the initial propellant mass
+        mass = self.massDot.cumulativeIntegral(self.propellantInitialMass)
 
         # Create Function
         self.mass = Function(
-            np.concatenate(([T], [y])).transpose(),
+            mass.source,
             "Time (s)",
             "Propellant Total Mass (kg)",
             self.interpolate,
@@ -313,15 +313,11 @@ class Rocket:
         # Calculate total lift coefficient derivative and center of pressure
         if len(self.aerodynamicSurfaces) > 0:
             for aerodynamicSurface in self.aerodynamicSurfaces:
-                self.totalLiftCoeffDer += Function(
+                liftCoeffDer = Function(
                     lambda alpha: aerodynamicSurface["cl"](alpha, 0)
                 ).differentiate(x=1e-2, dx=1e-3)
-                self.cpPosition += (
-                    Function(
-                        lambda alpha: aerodynamicSurface["cl"](alpha, 0)
-                    ).differentiate(x=1e-2, dx=1e-3)
-                    * aerodynamicSurface["cp"][2]
-                )
+                self.totalLiftCoeffDer += liftCoeffDer
+                self.cpPosition += liftCoeffDer * aerodynamicSurface["cp"][2]
             self.cpPosition /= self.totalLiftCoeffDer
 
         # Calculate static margin
@@ -23,8 +23,9 @@ __status__ = "Production"
 
 from .Environment import Environment
 from .EnvironmentAnalysis import EnvironmentAnalysis
+from .Event import Event
 from .Flight import Flight
-from .Function import Function
+from .Function import Function, FunctionSet
 from .Motor import HybridMotor, SolidMotor
 from .Rocket import Rocket
 from .utilities import *
@@ -1,6 +1,8 @@
 import pytest
 from rocketpy import SolidMotor
 from rocketpy import Rocket
+from rocketpy import Environment
+from rocketpy import Flight
 import numericalunits
 
 
@@ -48,6 +50,20 @@ def rocket(solid_motor):
     return example_rocket
 
 
+@pytest.fixture
+def flight(rocket):
+    rocket.setRailButtons([0.2, -0.5])
+    rocket.addNose(length=0.55829, kind="vonKarman", distanceToCM=0.71971)
+    rocket.addTrapezoidalFins(
+        4, span=0.100, rootChord=0.120, tipChord=0.040, distanceToCM=-1.04956
+    )
+    example_env = Environment(railLength=5.2, latitude=0, longitude=0, elevation=1400)
+    example_flight = Flight(
+        rocket=rocket, environment=example_env, inclination=85, heading=0
+    )
+    return example_flight
+
+
 @pytest.fixture
 def m():
     return numericalunits.m
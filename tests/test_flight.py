@@ -6,7 +6,7 @@ import numpy as np
 import pytest
 from scipy import optimize
 
-from rocketpy import Environment, Flight, Function, Rocket, SolidMotor
+from rocketpy import Environment, Event, Flight, Function, Rocket, SolidMotor
 
 plt.rcParams.update({"figure.max_open_warning": 0})
 
@@ -749,3 +749,162 @@ def test_latlon_conversions2(mock_show):
 
     assert test_flight.longitude(test_flight.tFinal) == 0
     assert test_flight.latitude(test_flight.tFinal) > 0
+
+
+def test_post_process_records_every_step(flight):
+    flight.postProcess()
+
+    solution = np.array(flight.solution)
+    assert np.array_equal(flight.R1.source[:, 0], solution[:, 0])
+    assert np.array_equal(flight.pressure.source[:, 0], solution[:, 0])
+    assert np.array_equal(flight.ax.source[:, 0], solution[1:, 0])
+    # Rail accelerations come from the rail derivative
+    step = solution[1]
+    assert flight.az.source[0, 1] == flight.uDotRail1(step[0], step[1:])[5]
+    assert flight.pressure.source[0, 1] == flight.env.pressure(solution[0, 3])
+
+
+def test_post_process_outputs_are_lazy(flight):
+    flight.postProcess()
+    assert "MachNumber" in flight.lazyOutputs
+    assert "MachNumber" not in vars(flight)
+
+    # Speed only needs the state vector
+    speed = np.linalg.norm(np.array(flight.solution)[:, 4:7], axis=1)
+    assert flight.maxSpeed == pytest.approx(np.max(speed))
+    assert "x" not in flight.lazyOutputs
+    assert "R1" in flight.lazyOutputs
+
+    # Dependencies are calculated on demand
+    assert flight.maxMachNumber == pytest.approx(np.max(flight.MachNumber[:, 1]))
+    assert "R1" not in flight.lazyOutputs
+    assert "angleOfAttack" in flight.lazyOutputs
+
+    # Post processing again discards calculated outputs
+    flight.postProcess(interpolation="linear")
+    assert flight.MachNumber.__interpolation__ == "linear"
+
+
+def test_lazy_output_errors_are_raised_again(flight):
+    flight.postProcess()
+
+    def fail():
+        raise ZeroDivisionError("failed calculation")
+
+    calculate = flight.lazyOutputs["latitude"]
+    flight.lazyOutputs["latitude"] = flight.lazyOutputs["longitude"] = fail
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            flight.longitude
+    assert flight.lazyOutputs["latitude"] is fail
+
+    flight.lazyOutputs["latitude"] = flight.lazyOutputs["longitude"] = calculate
+    assert flight.latitude(0) == pytest.approx(0)
+    assert "longitude" not in flight.lazyOutputs
+
+
+def test_post_process_follows_changed_functions(flight):
+    # Tabulated and callable Functions are read as they are when post processed
+    flight.env.density.setSource(lambda z: 0.5)
+    flight.rocket.motor.thrust.setSource(lambda t: 0)
+    flight.postProcess()
+
+    assert np.all(flight.density.source[:, 1] == 0.5)
+    assert np.all(flight.thrustPower.source[:, 1] == 0)
+
+
+def test_solution_array(flight):
+    assert isinstance(flight.solution, np.ndarray)
+    assert flight.solution.shape == (len(flight.timeSteps) + 1, 14)
+    assert len(flight.functionEvaluationsPerTimeStep) == len(flight.timeSteps)
+    # Finished flights do not keep the spare capacity of the buffers
+    assert flight.solution.base is None
+    assert flight.timeSteps.base is None
+    assert np.all(np.diff(flight.solution[:, 0]) > 0)
+    # Events roll back the last row of their step in place
+    assert flight.outOfRailTime in flight.solution[:, 0]
+    assert flight.solution[-1, 0] == flight.tFinal
+    assert flight.solution[-1, 3] == pytest.approx(flight.env.elevation)
+
+
+def test_user_defined_events(flight):
+    names = [event.name for t, event in flight.triggeredEvents]
+    assert names == ["Out of Rail", "Apogee", "Impact"]
+
+    rocket, env = flight.rocket, flight.env
+    altitudes = []
+    crossing = Event(
+        lambda t, u: u[2] - env.elevation - 1000,
+        callback=lambda flight, t, u: altitudes.append(u[2]),
+        name="1 km",
+    )
+    flight = Flight(
+        rocket=rocket, environment=env, inclination=85, heading=0, events=[crossing]
+    )
+
+    names = [event.name for t, event in flight.triggeredEvents]
+    assert names == ["Out of Rail", "1 km", "Apogee", "1 km", "Impact"]
+    assert np.allclose(altitudes, env.elevation + 1000)
+    times = [t for t, event in flight.triggeredEvents]
+    assert times == sorted(times)
+    assert flight.apogeeState[5] == pytest.approx(0, abs=1e-8)
+    assert flight.impactState[2] == pytest.approx(env.elevation)
+
+    # Repeatable events which start a new flight phase trigger once per crossing
+    flights, times = [], []
+
+    def record(flight, t, u):
+        flights.append(flight)
+        times.append(t)
+
+    crossing = Event(
+        lambda t, u: u[2] - env.elevation - 1000,
+        callback=record,
+        derivative=lambda t, u: flights[0].uDot(t, u),
+        name="1 km",
+    )
+    flight = Flight(
+        rocket=rocket, environment=env, inclination=85, heading=0, events=[crossing]
+    )
+    names = [event.name for t, event in flight.triggeredEvents]
+    assert names == ["Out of Rail", "1 km", "Apogee", "1 km", "Impact"]
+    assert len(times) == 2
+    # Rolled back states are already past the crossing
+    assert np.all(np.diff(flight.solution[:, 0]) > 0)
+    rows = flight.solution[np.isin(flight.solution[:, 0], times)]
+    assert len(rows) == 2
+    assert rows[0, 3] >= env.elevation + 1000
+    assert rows[1, 3] < env.elevation + 1000
+
+    # Terminal events end the simulation
+    crossing = Event(
+        lambda t, u: u[2] - env.elevation - 1000,
+        direction=1,
+        terminal=True,
+        name="1 km",
+    )
+    flight = Flight(
+        rocket=rocket, environment=env, inclination=85, heading=0, events=[crossing]
+    )
+    assert flight.triggeredEvents[-1] == [flight.tFinal, crossing]
+    assert flight.solution[-1, 0] == flight.tFinal
+    assert flight.solution[-1, 3] == pytest.approx(env.elevation + 1000)
+    assert flight.apogee == 0
+
+
+def test_flight_starting_below_ground(flight):
+    # Impact happens at the start time, without a zero width last step
+    initialSolution = flight.solution[-1].copy()
+    initialSolution[3] = flight.env.elevation - 10
+    below = Flight(
+        rocket=flight.rocket,
+        environment=flight.env,
+        inclination=85,
+        heading=0,
+        initialSolution=initialSolution,
+    )
+    assert below.triggeredEvents == [[below.tInitial, below.events[1]]]
+    assert below.tFinal == below.tInitial
+    assert np.array_equal(below.solution, [initialSolution])
+    assert len(below.timeSteps) == 0
+    assert below.impactState[2] == pytest.approx(flight.env.elevation - 10)
@@ -0,0 +1,734 @@
+import pickle
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from scipy import integrate
+
+from rocketpy import Function, FunctionSet
+
+xData = np.linspace(0, 10, 25) ** 1.2
+yData = np.sin(xData)
+
+
+def square_root(x):
+    return np.sqrt(x)
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+@pytest.mark.parametrize("extrapolation", ["zero", "constant", "natural"])
+def test_get_value_array_matches_get_value_opt(interpolation, extrapolation):
+    func = Function(
+        np.column_stack((xData, yData)),
+        interpolation=interpolation,
+        extrapolation=extrapolation,
+    )
+    x = np.concatenate((np.linspace(-5, 20, 301), xData))
+
+    ans = func.getValue(x)
+
+    assert isinstance(ans, np.ndarray)
+    assert ans.shape == x.shape
+    assert np.allclose(ans, [func.getValueOpt(xi) for xi in x], atol=1e-9)
+
+
+def test_get_value_keeps_input_type():
+    func = Function(np.column_stack((xData, yData)), interpolation="spline")
+
+    assert isinstance(func.getValue([1, 2, 3]), list)
+    assert np.isscalar(func.getValue(2.5))
+    assert func.getValue(xData[-1]) == yData[-1]
+    assert func.getValue(100) == yData[-1]
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+def test_get_value_complex(interpolation):
+    func = Function(np.column_stack((xData, yData)), interpolation=interpolation)
+    x = np.linspace(-1, 17, 50)
+
+    ans = func.getValue(x + 0j)
+
+    assert np.iscomplexobj(ans)
+    assert np.allclose(ans, func.getValue(x))
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+def test_get_value_opt_interval_hint(interpolation):
+    func = Function(
+        np.column_stack((xData, yData)),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+    # Sweep forwards, backwards and jump around to exercise the hint search
+    x = np.concatenate(
+        (np.linspace(-1, 17, 500), np.linspace(17, -1, 500), xData[::-3])
+    )
+    np.random.default_rng(42).shuffle(x[-50:])
+
+    ans = [func.getValueOpt(xi) for xi in x]
+
+    assert np.allclose(ans, func.getValue(x), atol=1e-9)
+
+
+@pytest.mark.parametrize(
+    "x, spacing",
+    [
+        (np.linspace(-2, 3, 200), "uniform"),
+        (np.logspace(-2, 3, 200), "logarithmic"),
+        (np.linspace(-2, 3, 200) ** 3, None),
+    ],
+)
+def test_grid_spacing_interval_lookup(x, spacing):
+    func = Function(np.column_stack((x, np.cos(x))), extrapolation="natural")
+    searched = Function(np.column_stack((x, np.cos(x))), extrapolation="natural")
+    searched.__gridSpacing__ = None
+    searched.setGetValueOpt()
+    points = np.concatenate((x, np.linspace(x[0] - 1, x[-1] + 1, 1001)))
+
+    assert func.__gridSpacing__ == spacing
+    assert np.allclose(func.getValue(points), searched.getValue(points))
+    assert np.allclose([func.getValueOpt(p) for p in points], searched.getValue(points))
+
+
+def test_grid_spacing_rejects_drifting_grid():
+    # Every step is within 1e-6 of the mean step, but the points drift away
+    # from the uniform grid by many steps in the middle
+    m = 2000000
+    steps = np.concatenate((np.full(m, 1 + 0.9e-6), np.full(m, 1 - 0.9e-6)))
+    x = np.concatenate(([0], np.cumsum(steps)))
+    func = Function(np.column_stack((x, np.arange(len(x)) % 2)), interpolation="linear")
+    point = x[m] + 0.25 * (x[m + 1] - x[m])
+
+    assert func.__gridSpacing__ is None
+    assert np.isclose(func.getValueOpt(point), 0.25)
+    assert np.isclose(func.getValue(point), 0.25)
+
+
+def test_arithmetic_expression_is_flattened_and_fused():
+    func = Function(lambda x: x**2)
+    table = Function(np.column_stack((xData, yData)))
+
+    result = 2 * ((func + 1) * 3 + table) - func / 4 - 1
+
+    x = np.linspace(0, 15, 50)
+    expected = 2 * ((x**2 + 1) * 3 + table.getValue(x)) - x**2 / 4 - 1
+    assert np.allclose(result.getValue(x), expected)
+    assert np.allclose([result.getValueOpt(xi) for xi in x], expected)
+    # Nested sums and products collapse into single nodes with folded constants
+    assert (func * 2 * 3).source.operands == [func, 6]
+    assert len(((func + 1) + (func + 2)).source.operands) == 3
+
+
+def test_arithmetic_expression_follows_changed_operands():
+    a = Function(lambda x: x)
+    b = Function(lambda x: 2 * x)
+    c = a + b
+    d = c * Function(lambda x: 1.0)
+    e = (c + 1) / 2
+
+    c.setSource(lambda x: 100.0)
+
+    assert c(1) == 100
+    assert d(1) == 100 and d.getValueOpt(1) == 100
+    assert np.allclose(d.getValue(np.array([1.0, 2.0])), 100)
+    assert e(1) == pytest.approx(50.5)
+    c.setDiscrete(0, 10, 11, interpolation="linear")
+    assert d(2.5) == pytest.approx(100)
+
+
+def test_callable_subtraction():
+    func = Function(lambda x: 3 * x)
+    other = Function(lambda x: x)
+
+    assert (func - other)(2) == 4
+
+
+@pytest.mark.parametrize("operator", ["+", "-", "*", "/", "**"])
+def test_union_grid_arithmetic(operator):
+    first = Function(np.column_stack((xData, yData + 2)), interpolation="linear")
+    x = np.linspace(1, 14, 7)
+    second = Function(np.column_stack((x, x**0.5)), interpolation="linear")
+    operations = {
+        "+": lambda a, b: a + b,
+        "-": lambda a, b: a - b,
+        "*": lambda a, b: a * b,
+        "/": lambda a, b: a / b,
+        "**": lambda a, b: a**b,
+    }
+
+    result = operations[operator](first, second)
+
+    grid = np.union1d(xData, x)
+    assert isinstance(result.source, np.ndarray)
+    assert np.array_equal(result.source[:, 0], grid)
+    assert np.allclose(
+        result.source[:, 1],
+        operations[operator](first.getValue(grid), second.getValue(grid)),
+    )
+
+
+@pytest.mark.parametrize(
+    "extrapolations, expected, value",
+    [
+        (("natural", "natural"), "natural", 4.5),
+        (("natural", "constant"), "constant", 3.0),
+        (("zero", "natural"), "zero", 0.0),
+    ],
+)
+def test_union_grid_extrapolation(extrapolations, expected, value):
+    first = Function(
+        [[0, 0], [1, 1]], interpolation="linear", extrapolation=extrapolations[0]
+    )
+    second = Function(
+        [[0, 0], [2, 1]], interpolation="linear", extrapolation=extrapolations[1]
+    )
+
+    result = first + second
+
+    assert result.__extrapolation__ == expected
+    assert np.isclose(result(3), value)
+    if expected == "natural":
+        assert np.isclose(result(3), first(3) + second(3))
+
+
+def test_union_grid_errors_are_raised():
+    first = Function(np.column_stack((xData, yData)))
+    second = Function(np.column_stack((xData + 1, yData)))
+
+    with patch.object(
+        Function, "__operateOnUnionGrid__", side_effect=ValueError("union grid")
+    ):
+        with pytest.raises(ValueError, match="union grid"):
+            first + second
+
+
+def test_union_grid_tolerance():
+    first = Function(np.column_stack((xData, yData)))
+    second = Function(np.column_stack((xData + 1e-3, yData)))
+
+    Function.unionGridTolerance = 1e-2
+    try:
+        result = first + second
+    finally:
+        Function.unionGridTolerance = 0
+
+    grid = np.union1d(first.source[:, 0], second.source[:, 0])
+    distances = np.abs(grid[:, None] - result.source[:, 0]).min(axis=1)
+    assert len(result.source) < len(grid)
+    assert np.all(distances <= 1e-2)
+    assert result.source[-1, 0] == grid[-1]
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima"])
+def test_cubic_coefficients_layout(interpolation):
+    func = Function(np.column_stack((xData, yData)), interpolation=interpolation)
+    coeffs = getattr(func, "__" + interpolation + "Coefficients__")
+    h = np.diff(xData)
+
+    assert coeffs.shape == (len(xData) - 1, 4)
+    assert coeffs.flags["C_CONTIGUOUS"]
+    # Each cubic starts at y[i], ends at y[i + 1] and the first derivative
+    # is continuous at the inner knots
+    ends = coeffs[:, 0] + coeffs[:, 1] * h + coeffs[:, 2] * h**2 + coeffs[:, 3] * h**3
+    slopes = coeffs[:, 1] + 2 * coeffs[:, 2] * h + 3 * coeffs[:, 3] * h**2
+    assert np.allclose(coeffs[:, 0], yData[:-1])
+    assert np.allclose(ends, yData[1:])
+    assert np.allclose(slopes[:-1], coeffs[1:, 1])
+
+
+def test_function_set_matches_functions():
+    x = np.linspace(0, 10, 40)
+    functions = [
+        Function(np.column_stack((x, np.sin(x))), extrapolation="natural"),
+        Function(np.column_stack((x, x**2)), interpolation="linear"),
+        Function(lambda t: 2 * t),
+        Function(np.column_stack((x, np.cos(x))), interpolation="akima"),
+        Function(np.column_stack((xData, yData)), extrapolation="zero"),
+    ]
+    functionSet = FunctionSet(functions)
+    points = np.linspace(-2, 16, 101)
+
+    expected = [f.getValue(points) for f in functions]
+
+    assert functionSet.tableIndexes == [0, 1, 3]
+    assert np.allclose(functionSet.getValue(points), expected)
+    assert np.allclose(
+        [functionSet.getValueOpt(p) for p in points], np.transpose(expected)
+    )
+
+
+def test_function_set_follows_changed_functions():
+    x = np.linspace(0, 10, 40)
+    functions = [
+        Function(np.column_stack((x, np.sin(x)))),
+        Function(np.column_stack((x, x**2))),
+        Function(lambda t: 2 * t),
+    ]
+    functionSet = FunctionSet(functions)
+    points = np.linspace(0, 16, 101)
+    functionSet.getValueOpt(1)
+
+    functions[0].setExtrapolation("zero")
+    functions[1].setSource(square_root)
+    functions[2].setSource(np.column_stack((x, np.cos(x))))
+
+    expected = [f.getValue(points) for f in functions]
+    assert np.allclose(
+        [functionSet.getValueOpt(p) for p in points], np.transpose(expected)
+    )
+    assert functionSet.tableIndexes == [0, 2]
+    functions[0].append((11, 0.5))
+    assert np.isclose(functionSet.getValue([10.5])[0, 0], functions[0](10.5))
+    assert pickle.loads(pickle.dumps(functionSet)).getValueOpt(10.5)[0] == (
+        functionSet.getValueOpt(10.5)[0]
+    )
+
+
+@pytest.mark.parametrize("interpolation", ["linear", "spline"])
+@pytest.mark.parametrize("extrapolation", ["zero", "constant", "natural"])
+def test_rectilinear_grid_interpolation(interpolation, extrapolation):
+    axes = np.linspace(0, 2, 5), np.array([-1, 0, 0.5, 2]), np.linspace(1, 3, 3)
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+    # Multilinear functions are reproduced exactly by both methods
+    values = 1 + grid[:, 0] * grid[:, 1] - 2 * grid[:, 1] * grid[:, 2]
+    source = np.column_stack((grid, values))
+    func = Function(
+        source[::-1], interpolation=interpolation, extrapolation=extrapolation
+    )
+    points = np.random.default_rng(42).uniform([-1, -2, 0], [3, 3, 4], (200, 3))
+
+    ans = func.getValue(points)
+
+    inside = np.all((points >= [0, -1, 1]) & (points <= [2, 2, 3]), axis=1)
+    expected = 1 + points[:, 0] * points[:, 1] - 2 * points[:, 1] * points[:, 2]
+    assert np.allclose(ans[inside], expected[inside])
+    assert np.allclose(ans, [func.getValueOpt(*p) for p in points])
+    assert np.allclose(func.getValue(source[:, :-1]), values)
+    if extrapolation == "zero":
+        assert np.all(ans[~inside] == 0)
+    elif extrapolation == "natural":
+        assert np.allclose(ans, expected)
+
+
+def test_rectilinear_grid_spline():
+    x, y = np.linspace(0, 3, 7) ** 1.5, np.linspace(-1, 1, 5)
+    X, Y = np.meshgrid(x, y, indexing="ij")
+    Z = np.sin(X) * Y**2
+    func = Function(
+        np.column_stack((X.ravel(), Y.ravel(), Z.ravel())), interpolation="spline"
+    )
+    tensorSpline = Function(np.column_stack((x, x)), interpolation="spline")
+
+    # Tensor product natural spline, interpolating along y and then along x
+    column = [Function(np.column_stack((y, z))).getValue(0.3) for z in Z]
+    tensorSpline.setSource(np.column_stack((x, column)))
+
+    assert np.isclose(func(2.1, 0.3), tensorSpline(2.1))
+    assert np.isclose(func.getValueOpt(2.1, 0.3), tensorSpline(2.1))
+
+
+def test_scattered_points_require_shepard():
+    source = np.random.default_rng(42).uniform(0, 1, (20, 3))
+
+    with pytest.raises(ValueError):
+        Function(source, interpolation="linear")
+    assert Function(source).getInterpolationMethod() == "shepard"
+
+
+def test_shepard_interpolation():
+    source = np.random.default_rng(42).uniform(0, 1, (100, 3))
+    func = Function(source)
+    points = np.vstack((source[:5, :2], [[0.3, 0.4], [1.5, -0.5]]))
+
+    ans = func.getValue(points)
+
+    distances = np.linalg.norm(source[:, :2] - points[-2], axis=1)
+    weights = distances ** (-3.0)
+    assert np.allclose(ans[:5], source[:5, 2])
+    assert np.isclose(ans[-2], np.sum(weights * source[:, 2]) / np.sum(weights))
+    assert np.allclose(ans, [func.getValueOpt(*p) for p in points])
+    assert func.getValue(0.3, 0.4) == ans[-2]
+
+
+def test_shepard_neighbors():
+    source = np.random.default_rng(42).uniform(0, 1, (100, 3))
+    func = Function(source).setShepardNeighbors(5)
+    points = np.array([[0.3, 0.4], [1.5, -0.5]])
+
+    ans = func.getValue(points)
+
+    distances = np.linalg.norm(source[:, :2] - points[0], axis=1)
+    nearest = np.argsort(distances)[:5]
+    weights = distances[nearest] ** (-3.0)
+    assert np.isclose(ans[0], np.sum(weights * source[nearest, 2]) / np.sum(weights))
+    # Points without data within radius take the value of the nearest one
+    func.setShepardNeighbors(radius=0.1)
+    nearest = np.argmin(np.linalg.norm(source[:, :2] - points[1], axis=1))
+    assert func.getValueOpt(*points[1]) == source[nearest, 2]
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+@pytest.mark.parametrize("extrapolation", ["zero", "constant", "natural"])
+def test_integral_in_closed_form(interpolation, extrapolation):
+    func = Function(
+        np.column_stack((xData, yData)),
+        interpolation=interpolation,
+        extrapolation=extrapolation,
+    )
+    a, b = np.array([-2, 0.5, 3]), np.array([1, 2.2, 20])
+
+    ans = func.integral(a, b)
+
+    for ai, bi, ansi in zip(a, b, ans):
+        points = xData[(xData > ai) & (xData < bi)]
+        expected, _ = integrate.quad(func.getValue, ai, bi, points=points, limit=200)
+        assert np.isclose(ansi, expected)
+    assert np.allclose(ans, [func.integral(ai, bi) for ai, bi in zip(a, b)])
+    assert np.allclose(ans, func.antiderivative()(b) - func.antiderivative()(a))
+
+
+def test_cumulative_integral():
+    func = Function(np.column_stack((xData, yData)), interpolation="linear")
+
+    cumulative = func.cumulativeIntegral(initialValue=2)
+
+    steps = np.diff(xData) * (yData[1:] + yData[:-1]) / 2
+    assert np.allclose(
+        cumulative.source[:, 1], 2 + np.concatenate(([0], np.cumsum(steps)))
+    )
+    assert cumulative.getExtrapolationMethod() == "natural"
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "polynomial"])
+def test_derivative(interpolation):
+    x = np.linspace(0, 3, 8)
+    func = Function(
+        np.column_stack((x, np.sin(x))),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+
+    derivative = func.derivative()
+
+    assert np.array_equal(derivative.source[:, 0], x)
+    assert np.allclose(derivative.source[:, 1], func.differentiate(x), atol=1e-6)
+    if interpolation == "polynomial":
+        # The derivative polynomial is interpolated exactly
+        points = np.linspace(0, 3, 50)
+        assert np.allclose(derivative.getValue(points), func.differentiate(points))
+
+
+def test_differentiate_arrays():
+    func = Function(lambda x: x**3)
+    x = [0.5, 1, 2]
+
+    ans = func.differentiate(x)
+
+    assert isinstance(ans, list)
+    assert np.allclose(ans, 3 * np.array(x) ** 2)
+    assert np.allclose(func.differentiate(np.array(x)), ans)
+
+
+def test_set_discrete_adaptive():
+    func = Function(lambda x: np.tanh(20 * (x - 5)))
+
+    func.setDiscreteAdaptive(0, 10, atol=1e-5, rtol=0, oneByOne=False)
+
+    x = np.linspace(0, 10, 10001)
+    assert isinstance(func.source, np.ndarray)
+    assert len(func.source) < 500
+    assert np.allclose(func.getValue(x), np.tanh(20 * (x - 5)), atol=1e-4)
+    # Samples concentrate where the curvature is large
+    assert np.sum(np.abs(func.source[:, 0] - 5) < 1) > len(func.source) / 2
+
+
+def test_source_cache(tmp_path):
+    path = str(tmp_path / "source.csv")
+    np.savetxt(path, np.column_stack((xData, yData)), delimiter=",")
+
+    Function.sourceCacheDirectory = str(tmp_path / "cache")
+    Function.memoryMapSources = True
+    try:
+        first = Function(path)
+        cached = Function(path)
+        # Changing the file invalidates its cached copy
+        np.savetxt(path, np.column_stack((xData, 2 * yData))[:-1], delimiter=",")
+        changed = Function(path)
+    finally:
+        Function.sourceCacheDirectory = None
+        Function.memoryMapSources = False
+
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    assert isinstance(cached.source, np.memmap)
+    assert np.array_equal(first.source, cached.source)
+    assert np.allclose(changed.source, np.column_stack((xData, 2 * yData))[:-1])
+
+
+@pytest.mark.parametrize(
+    "interpolation", ["spline", "akima", "linear", "polynomial", "shepard"]
+)
+def test_pickle_and_npz(interpolation, tmp_path):
+    x = np.linspace(0, 3, 8)
+    func = Function(
+        np.column_stack((x, np.sin(x))),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+    points = np.linspace(-1, 4, 21)
+
+    pickled = pickle.loads(pickle.dumps(func))
+    func.toNpz(str(tmp_path / "func"))
+    loaded = Function.fromNpz(str(tmp_path / "func.npz"))
+
+    for copy in [pickled, loaded]:
+        assert copy.getInterpolationMethod() == interpolation
+        assert np.allclose(copy.getValue(points), func.getValue(points))
+        assert copy.getValueOpt(1.3) == func.getValueOpt(1.3)
+
+
+def test_pickle_grid_expression_and_set(tmp_path):
+    x, y = np.linspace(0, 1, 4), np.linspace(0, 2, 3)
+    grid = np.stack(np.meshgrid(x, y, indexing="ij"), axis=-1).reshape(-1, 2)
+    surface = Function(
+        np.column_stack((grid, grid[:, 0] * grid[:, 1])), interpolation="spline"
+    )
+    table = Function(np.column_stack((xData, yData)))
+    expression = table * Function(square_root) + 1
+    functionSet = FunctionSet([table, Function(np.column_stack((xData, xData)))])
+
+    surface.toNpz(str(tmp_path / "surface.npz"))
+    loaded = Function.fromNpz(str(tmp_path / "surface.npz"))
+    expression = pickle.loads(pickle.dumps(expression))
+    functionSet = pickle.loads(pickle.dumps(functionSet))
+
+    assert loaded.getValueOpt(0.5, 1.5) == surface.getValueOpt(0.5, 1.5)
+    assert np.isclose(expression.getValueOpt(4), table.getValueOpt(4) * 2 + 1)
+    assert np.allclose(functionSet.getValueOpt(4), [table.getValueOpt(4), 4])
+
+
+def test_compact_storage():
+    func = Function(np.column_stack((xData, yData)), interpolation="spline")
+    points = np.linspace(0, 15, 101)
+    expected = func.getValue(points)
+
+    assert not hasattr(func, "__dict__")
+    # getValueOpt is only built when first called
+    assert func.getValueOpt == func.__buildGetValueOpt__
+    assert func.getValueOpt(2.5) == func.getValue(2.5)
+    assert func.getValueOpt != func.__buildGetValueOpt__
+    func.setExtrapolation("zero")
+    assert func.getValueOpt(100) == 0
+
+    func.setDataType(np.float32)
+
+    assert func.source.dtype == np.float32
+    assert func.__splineCoefficients__.dtype == np.float32
+    assert np.allclose(func.getValue(points), expected, atol=1e-5)
+    assert func.setInterpolation("akima").__akimaCoefficients__.dtype == np.float32
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear", "polynomial"])
+def test_find_roots_and_crossings(interpolation):
+    x = np.linspace(0, 10, 30)
+    func = Function(np.column_stack((x, np.sin(x))), interpolation=interpolation)
+
+    roots = func.findRoots(0.2)
+
+    assert np.allclose(roots, [0.2014, 2.9402, 6.4845, 9.2236], atol=5e-3)
+    assert np.allclose(func.getValue(roots), 0.2)
+    assert np.array_equal(func.crossings(0.2), roots)
+    assert np.array_equal(func.crossings(0.2, direction=1), roots[::2])
+    assert np.array_equal(func.crossings(0.2, direction=-1), roots[1::2])
+
+
+def test_roots_at_data_points():
+    x = np.linspace(0, 10, 30)
+    func = Function(np.column_stack((x, np.abs(x - x[10]))), interpolation="linear")
+
+    assert np.array_equal(func.findRoots(), [x[10]])
+    assert len(func.crossings()) == 0
+    assert len(func.findRoots(-1)) == 0
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+def test_inverse(interpolation):
+    x = np.linspace(0, 10, 30)
+    func = Function(
+        np.column_stack((x, -(x**3) - x)),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+    y = np.linspace(-1100, 1, 50)
+
+    inverse = func.inverse()
+
+    assert np.allclose(func.getValue(inverse(y)), y)
+    assert np.isclose(func(inverse(-500.0)), -500)
+    with pytest.raises(ValueError):
+        Function(np.column_stack((x, np.sin(x)))).inverse()
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear", "polynomial"])
+def test_append(interpolation):
+    func = Function(
+        np.column_stack((xData[:3], yData[:3])),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+
+    for x, y in zip(xData[3:-4], yData[3:-4]):
+        func.append((x, y))
+    buffer = func.source.base
+    func.append(np.column_stack((xData[-4:], yData[-4:])))
+
+    expected = Function(
+        np.column_stack((xData, yData)),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+    points = np.linspace(-1, 18, 200)
+    assert func.source.base is buffer
+    assert np.array_equal(func.source, expected.source)
+    assert np.allclose(func.getValue(points), expected.getValue(points))
+    assert np.isclose(func.getValueOpt(7.7), expected.getValueOpt(7.7))
+    with pytest.raises(ValueError):
+        func.append((xData[-1], 0))
+
+
+def test_append_keeps_grid_spacing():
+    func = Function([[0, 0], [1, 1], [2, 4]])
+
+    func.append([[3, 9], [4, 16]])
+
+    assert func.__gridSpacing__ == "uniform"
+    assert func(3.5) == Function([[0, 0], [1, 1], [2, 4], [3, 9], [4, 16]])(3.5)
+    func.append((4.5, 20))
+    assert func.__gridSpacing__ is None
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+def test_simplify(interpolation):
+    x = np.linspace(0, 20, 2001)
+    func = Function(
+        np.column_stack((x, np.sin(x) * np.exp(-x / 10))),
+        interpolation=interpolation,
+        extrapolation="natural",
+    )
+
+    simplified = func.simplify(atol=1e-3, rtol=0)
+
+    points = np.linspace(0, 20, 20001)
+    assert len(simplified.source) < len(x) / 5
+    assert simplified.getExtrapolationMethod() == "natural"
+    assert np.all(np.isin(simplified.source[:, 0], x))
+    assert np.allclose(simplified.getValue(points), func.getValue(points), atol=1e-3)
+
+
+def test_simplify_removes_collinear_points():
+    func = Function(np.column_stack((xData, 2 * xData + 1)), interpolation="linear")
+
+    simplified = func.simplify(atol=0, rtol=0)
+
+    assert np.array_equal(simplified.source, func.source[[0, -1]])
+
+
+def test_largest_triangle_three_buckets():
+    x = np.linspace(0, 100, 100001)
+    y = np.sin(x)
+    y[54321] = 5
+
+    indexes = Function.__largestTriangleThreeBuckets__(x, y, 500)
+
+    assert len(indexes) == 500
+    assert indexes[0] == 0 and indexes[-1] == len(x) - 1
+    assert np.all(np.diff(indexes) > 0)
+    assert 54321 in indexes
+
+
+@patch("matplotlib.pyplot.show")
+def test_plot_dense_source(mock_show):
+    x = np.linspace(0, 100, 100001)
+    y = np.sin(x)
+    y[54321] = 5
+    func = Function(np.column_stack((x, y)), interpolation="linear")
+
+    fig, _ = func.plot1D(lower=-10, samples=500, returnObject=True)
+
+    xPlot, yPlot = fig.axes[0].lines[0].get_data()
+    assert len(xPlot) < 600 and xPlot[0] == -10
+    assert np.max(yPlot) == 5
+    assert np.allclose(yPlot, func.getValue(xPlot))
+
+
+@pytest.mark.parametrize("interpolation", ["spline", "akima", "linear"])
+def test_jit_kernels_match_python(interpolation, monkeypatch):
+    functionModule = sys.modules["rocketpy.Function"]
+    x = np.linspace(0, 10, 40)
+    functions = [
+        Function(
+            np.column_stack((x, np.sin(x))),
+            interpolation=interpolation,
+            extrapolation=extrapolation,
+        )
+        for extrapolation in ["zero", "natural", "constant"]
+    ]
+    functions.append(Function(lambda t: 2 * t))
+    points = np.concatenate((np.linspace(-2, 12, 301), x))
+    expected = [f.getValue(points) for f in functions]
+    expectedOpt = [[f.getValueOpt(p) for f in functions] for p in points]
+
+    # Without numba, the kernels run as Python code
+    monkeypatch.setattr(functionModule, "has_numba", True)
+    monkeypatch.setattr(Function, "jitKernels", True)
+    for f in functions[:3]:
+        f.setInterpolation(interpolation)
+    functionSet = FunctionSet(functions)
+
+    assert np.allclose([f.getValue(points) for f in functions], expected)
+    assert np.allclose(
+        [[f.getValueOpt(p) for f in functions] for p in points], expectedOpt
+    )
+    assert np.allclose(functionSet.getValue(points), expected)
+    assert np.allclose([functionSet.getValueOpt(p) for p in points], expectedOpt)
+
+
+def test_jit_kernels_compiled(monkeypatch):
+    pytest.importorskip("numba")
+    functionModule = sys.modules["rocketpy.Function"]
+    assert hasattr(functionModule.evaluateCubicTable, "py_func")
+    x = np.linspace(0, 10, 40)
+    func = Function(np.column_stack((x, np.sin(x))), extrapolation="natural")
+    functionSet = FunctionSet([func, Function(np.column_stack((x, np.cos(x))))])
+    points = np.linspace(-2, 12, 301)
+    expected = func.getValue(points)
+    expectedSet = functionSet.getValue(points)
+
+    monkeypatch.setattr(Function, "jitKernels", True)
+    func.setInterpolation("spline")
+    compiledSet = FunctionSet(functionSet.functions)
+
+    assert np.allclose(func.getValue(points), expected)
+    assert np.allclose(compiledSet.getValue(points), expectedSet)
+    assert np.allclose([compiledSet.getValueOpt(p) for p in points], expectedSet.T)
+    # Cached kernel arguments are rebuilt when the Function changes
+    func.setExtrapolation("zero")
+    assert np.all(func.getValue(points)[points > 10] == 0)
+    func.append([[11, 0.5]])
+    assert np.isclose(func.getValue(np.array([11.0]))[0], 0.5)
+
+
+def test_integral_of_callables():
+    func = Function(lambda x: np.sin(x) * np.exp(-x / 5))
+    a = np.linspace(0, 10, 100)
+
+    ans = func.integral(a, a + 3)
+
+    for ai, ansi in zip(a, ans):
+        expected, _ = integrate.quad(func.source, ai, ai + 3, epsabs=1e-13)
+        assert np.isclose(ansi, expected, rtol=0, atol=1e-12)
+    # Callables which only accept scalars are evaluated point by point
+    cusp = Function(lambda x: abs(x - 1.3) ** 0.5 if x > 0 else 0)
+    assert np.isclose(cusp.integral(0, 3), 2 / 3 * (1.3**1.5 + 1.7**1.5))
+    gaussian = Function(lambda x: np.exp(-(x**2)))
+    assert np.isclose(gaussian.integral(-np.inf, np.inf), np.pi**0.5)